@@ -1,26 +1,47 @@
 """
 Constants for AI services including scorecard thresholds.
 """
+from enum import Enum
+from types import MappingProxyType
+from typing import Union
 
 # Scorecard pass/fail thresholds
 # A score >= threshold is considered a "pass", < threshold is a "fail"
 # Note: legal uses boolean field (legal_issues_detected), not numeric score
-SCORECARD_THRESHOLDS = {
+# Read-only: this is the single source of truth for pass thresholds
+SCORECARD_THRESHOLDS = MappingProxyType({
     'compliance': 40,     # Compliance scorecard must score 40 or above to pass
     'servicing': 40,      # Servicing scorecard must score 40 or above to pass
     'collections': 40,    # Collections scorecard must score 40 or above to pass
     'legal': 0,           # Legal uses boolean field (added for consistency)
-}
+})
 
 
-def get_pass_threshold(category: str) -> int:
+class ScorecardCategory(str, Enum):
+    """Scorecard categories with their pass thresholds."""
+
+    COMPLIANCE = 'compliance'
+    SERVICING = 'servicing'
+    COLLECTIONS = 'collections'
+    LEGAL = 'legal'
+
+    @property
+    def threshold(self) -> int:
+        """The score required to pass this category."""
+        return SCORECARD_THRESHOLDS[self.value]
+
+
+def get_pass_threshold(category: Union[str, ScorecardCategory]) -> int:
     """
     Get the pass threshold for a specific scorecard category.
 
     Args:
-        category: The scorecard category ('compliance', 'servicing', 'collections')
+        category: The scorecard category ('compliance', 'servicing', 'collections', 'legal')
 
     Returns:
         int: The threshold score for passing
+
+    Raises:
+        ValueError: If the category is unknown
     """
-    return SCORECARD_THRESHOLDS.get(category, 70)  # Default to 70 if unknown category
+    return ScorecardCategory(category).threshold
@@ -0,0 +1,61 @@
+"""
+Structured output schemas for OpenAI responses.
+"""
+from typing import Any, Dict, List, Literal
+
+from pydantic import BaseModel, ConfigDict
+
+
+class SummarySchema(BaseModel):
+    """Call summary structure returned by the model (see summary_user.txt)."""
+
+    model_config = ConfigDict(extra='forbid')
+
+    title: str
+    summary: str
+    direction: Literal['inbound', 'outbound']
+    action_codes: List[str]
+    result_codes: List[str]
+    intent_tags: List[str]
+    keywords: List[str]
+    notes: str
+
+
+class LenientSummarySchema(SummarySchema):
+    """
+    Summary structure for plain JSON mode responses (the combined call).
+
+    JSON mode does not hold the model to the schema, so extra keys are
+    ignored, direction is free text, and only the fields the summary has
+    always required are mandatory.
+    """
+
+    model_config = ConfigDict(extra='ignore')
+
+    direction: str
+    intent_tags: List[str] = []
+    keywords: List[str] = []
+    notes: str = ''
+
+
+def json_schema_response_format(model: type[BaseModel]) -> Dict[str, Any]:
+    """
+    Build a strict json_schema response_format for a pydantic model.
+
+    Args:
+        model: Pydantic model with extra='forbid' and only required fields
+
+    Returns:
+        Dict to pass as response_format to chat.completions.create
+    """
+    return {
+        'type': 'json_schema',
+        'json_schema': {
+            'name': model.__name__,
+            'schema': model.model_json_schema(),
+            'strict': True,
+        },
+    }
+
+
+SUMMARY_RESPONSE_FORMAT = json_schema_response_format(SummarySchema)
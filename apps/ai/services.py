@@ -2,49 +2,157 @@
 AI Services for generating call summaries and scorecards using OpenAI.
 """
 
+import asyncio
+import hashlib
 import json
 import logging
-import os
-from typing import Dict, List, Optional, Any
-from openai import OpenAI
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from asgiref.sync import async_to_sync, sync_to_async
+from openai import AsyncOpenAI, OpenAI
 from django.conf import settings
+from django.core.cache import cache
 from apps.core.services.supabase import get_supabase_client
-from apps.ai.constants import SCORECARD_THRESHOLDS
+from apps.ai.constants import get_pass_threshold
+from apps.ai.schemas import SUMMARY_RESPONSE_FORMAT, LenientSummarySchema, SummarySchema
 
 logger = logging.getLogger(__name__)
 
+# Prefer orjson for parsing large scorecard payloads, fall back to stdlib json
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Get the directory where this file is located
-_AI_APP_DIR = os.path.dirname(os.path.abspath(__file__))
-_PROMPTS_DIR = os.path.join(_AI_APP_DIR, "system_prompts")
+_PROMPTS_DIR = Path(__file__).resolve().parent / "system_prompts"
+
+# All prompt files are read once at import time
+_PROMPT_CACHE: Dict[str, str] = {
+    path.name: path.read_text(encoding="utf-8").strip()
+    for path in _PROMPTS_DIR.glob("*.txt")
+}
+
+# Completions are a pure function of model + prompts, so identical requests
+# (retries, re-runs, regenerations) are served from cache for a week
+_RESPONSE_CACHE_PREFIX = "ai_response"
+_RESPONSE_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Plain JSON mode, used where a strict schema does not fit (the scorecard
+# structure is large and uses nullable N/A answers)
+_JSON_OBJECT_FORMAT = {"type": "json_object"}
+
+# Only the event columns the prompt builders read
+_TRANSCRIPT_COLUMNS = "id,speaker,text,received_at"
+
+
+# Matches a single-brace str.format placeholder such as {transcript}
+# (escaped JSON braces in the templates are written as {{ and }})
+_PLACEHOLDER_RE = re.compile(r"(?<!\{)\{[a-z_]+\}")
+
+
+def _split_prompt_template(template: str) -> Tuple[str, str]:
+    """
+    Split a prompt template into its static prefix and dynamic remainder.
+
+    Keeping every placeholder at the end of the template lets the static
+    instructions form an identical prefix across requests, which OpenAI's
+    automatic prompt caching can reuse.
+
+    Args:
+        template: str.format template with placeholders at the end
+
+    Returns:
+        Tuple of (rendered static prefix, format template for the remainder)
+    """
+    match = _PLACEHOLDER_RE.search(template)
+    if not match:
+        return template.replace("{{", "{").replace("}}", "}"), ""
+    prefix = template[:match.start()].replace("{{", "{").replace("}}", "}")
+    return prefix, template[match.start():]
 
 
 class CallSummaryService:
     """Service for generating AI-powered call summaries and scorecards."""
 
+    # (max transcript words, summary length guidance, expected summary tokens);
+    # the last bucket is unbounded
+    _SUMMARY_LENGTH_BUCKETS = (
+        (200, "Write 2-3 sharp, direct sentences that capture the essential points", 100),
+        (500, "Write 1 concise paragraph (4-6 short sentences) covering all key points - no fluff", 200),
+        (1000, "Write 2 focused paragraphs covering the conversation flow and important details - be direct and clear", 400),
+        (2000, "Write 3-4 concise paragraphs with full detail on major topics, actions, and outcomes - use short sentences", 700),
+        (None, "Write 4-5 thorough but concise paragraphs capturing all aspects of this conversation - be sharp and direct throughout", 1000),
+    )
+
+    # Completion token budgeting (max_completion_tokens includes reasoning tokens)
+    _SUMMARY_FIXED_FIELD_TOKENS = 250  # title, codes, intents, keywords, notes
+    _SCORECARD_FIXED_TOKENS = 3000  # agent_score questions, intents, keywords
+    _SCORECARD_TOKENS_PER_TURN = 40  # one transcript_sentiments entry (with UUID)
+    _SCORECARD_MAX_TOKENS = 16000
+    _OUTPUT_TOKEN_SAFETY_FACTOR = 1.3
+    _REASONING_TOKEN_ALLOWANCE = 2500
+
+    # (category, feedback) pairs in scorecard order
+    _SCORECARD_CATEGORIES = (
+        ("compliance", "Compliance evaluation completed"),
+        ("servicing", "Servicing evaluation completed"),
+        ("collections", "Collections evaluation completed"),
+    )
+
     def __init__(self):
         config = settings.APP_SETTINGS.ai
         if not config.openai_api_key:
             raise ValueError("OpenAI API key not configured")
 
         self.client = OpenAI(api_key=config.openai_api_key)
+        # Async client for running independent completions concurrently;
+        # created lazily per event loop (see _async_client)
+        self._api_key = config.openai_api_key
+        self.aclient: Optional[AsyncOpenAI] = None
+        self._aclient_loop: Optional[asyncio.AbstractEventLoop] = None
         self.model = "gpt-5.2"  # GPT-5.2 Thinking - released Dec 11, 2025
         self.temperature = 0.3
 
-        # Load system prompts from files
+        # Resolve the Supabase client and events table once per service instance
+        self._supabase = get_supabase_client()
+        if not self._supabase:
+            raise ValueError("Supabase client not available")
+        self._events_table = settings.APP_SETTINGS.supabase.events_table
+
+        # Load system prompts and user prompt templates from files once,
+        # instead of re-reading the templates on every generation
         self._summary_system_prompt = self._load_prompt("summary_system.txt")
         self._scorecard_system_prompt = self._load_prompt("scorecard_system.txt")
+        self._summary_user_template = self._load_prompt("summary_user.txt")
+        self._scorecard_user_template = self._load_prompt("scorecard_user.txt")
+
+        # Precompute the static part of each user prompt so only the
+        # transcript-dependent tail varies between requests (prompt caching)
+        self._summary_prefix, self._summary_dynamic_template = _split_prompt_template(
+            self._summary_user_template
+        )
+        self._scorecard_prefix, self._scorecard_dynamic_template = _split_prompt_template(
+            self._scorecard_user_template
+        )
+
+        # Merged system prompt for generating summary and scorecard in one call
+        self._combined_system_prompt = "\n\n".join([
+            self._summary_system_prompt,
+            self._scorecard_system_prompt,
+            self._load_prompt("combined_system.txt"),
+        ])
 
     def _load_prompt(self, filename: str) -> str:
-        """Load a prompt template from a text file."""
-        filepath = os.path.join(_PROMPTS_DIR, filename)
+        """Load a prompt template from the import-time prompt cache."""
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                return f.read().strip()
-        except FileNotFoundError:
-            logger.error(f"Prompt file not found: {filepath}")
-            raise
-        except Exception as e:
-            logger.error(f"Error loading prompt file {filepath}: {e}")
+            return _PROMPT_CACHE[filename]
+        except KeyError:
+            logger.error(f"Prompt file not found: {_PROMPTS_DIR / filename}")
             raise
 
     def generate_summary(self, session_id: str) -> Dict[str, Any]:
@@ -65,33 +173,23 @@ class CallSummaryService:
             raise ValueError("No transcripts found for session")
 
         # Format transcript
-        formatted_transcript = self._format_transcripts(transcripts)
-        word_count = len(formatted_transcript.split())
+        formatted_transcript, word_count = self._format_transcripts(transcripts)
 
         logger.info(f"Transcript has {word_count} words")
 
         # Build prompt
         prompt = self._build_summary_prompt(formatted_transcript, word_count)
 
-        # Call OpenAI
+        # Call OpenAI (or reuse a cached response for an identical prompt)
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._summary_system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-                max_completion_tokens=self._calculate_max_tokens(word_count),
-                response_format={"type": "json_object"},
+            summary_data = self._complete_json(
+                self._summary_system_prompt,
+                prompt,
+                self._calculate_max_tokens(word_count),
+                validator=self._validate_summary_data,
+                response_format=SUMMARY_RESPONSE_FORMAT,
             )
 
-            # Parse response
-            content = response.choices[0].message.content
-            summary_data = json.loads(content)
-
-            # Validate
-            self._validate_summary_data(summary_data)
-
             logger.info(f"Summary generated successfully for session {session_id}")
             return summary_data
 
@@ -119,49 +217,21 @@ class CallSummaryService:
         if not transcripts:
             raise ValueError("No transcripts found for session")
 
-        # Format transcript
-        formatted_transcript = self._format_transcripts(transcripts)
-
         # Build prompt
-        prompt = self._build_scorecard_prompt(formatted_transcript, transcripts)
+        prompt = self._build_scorecard_prompt(transcripts)
 
-        # Call OpenAI
+        # Call OpenAI (or reuse a cached response for an identical prompt)
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._scorecard_system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-                max_completion_tokens=self._calculate_scorecard_max_tokens(len(transcripts)),
-                response_format={"type": "json_object"},
+            raw_scorecard = self._complete_json(
+                self._scorecard_system_prompt,
+                prompt,
+                self._calculate_scorecard_max_tokens(len(transcripts)),
             )
 
-            # Parse response
-            message = response.choices[0].message
-            content = message.content
-
-            # Debug logging
-            logger.info(f"OpenAI response - finish_reason: {response.choices[0].finish_reason}")
-            logger.info(f"OpenAI response - content length: {len(content) if content else 0}")
-            logger.info(f"OpenAI response - has refusal: {hasattr(message, 'refusal') and message.refusal is not None}")
-            if hasattr(message, 'refusal') and message.refusal:
-                logger.error(f"OpenAI refused to generate scorecard: {message.refusal}")
-                raise ValueError(f"OpenAI refused: {message.refusal}")
-            if not content:
-                logger.error("OpenAI returned empty content")
-                raise ValueError("OpenAI returned empty content")
-
-            raw_scorecard = json.loads(content)
-
             # Transform to match expected structure (pass transcripts for ID mapping)
+            # (also calculates the overall weighted score)
             scorecard_data = self._transform_scorecard_data(raw_scorecard, transcripts)
 
-            # Calculate overall weighted score
-            scorecard_data["overall_weighted_score"] = (
-                self._calculate_overall_weighted_score(scorecard_data)
-            )
-
             logger.info(f"Scorecard generated successfully for session {session_id}")
             return scorecard_data
 
@@ -172,128 +242,403 @@ class CallSummaryService:
             )
             raise
 
-    def _fetch_transcripts(self, session_id: str) -> List[Dict[str, Any]]:
-        """Fetch transcription events from Supabase."""
-        supabase = get_supabase_client()
-        if not supabase:
-            raise ValueError("Supabase client not available")
+    def generate_summary_and_scorecard(self, session_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate AI summary and scorecard for a call session with one OpenAI call.
 
-        config = settings.APP_SETTINGS.supabase
-        table_name = config.events_table
+        Fetches the transcript once and asks the model for a combined JSON object,
+        which is then split and run through the same validation/transformation
+        as generate_summary() and generate_scorecard().
+
+        Args:
+            session_id: The transcription session ID
+
+        Returns:
+            Dictionary with "summary" and "scorecard" data
+        """
+        logger.info(f"Starting combined summary and scorecard generation for session {session_id}")
+
+        # Fetch transcripts
+        transcripts = self._fetch_transcripts(session_id)
+        if not transcripts:
+            raise ValueError("No transcripts found for session")
 
+        # Format transcript
+        formatted_transcript, word_count = self._format_transcripts(transcripts)
+
+        logger.info(f"Transcript has {word_count} words")
+
+        # Build one user message containing both task prompts
+        prompt = (
+            "=== TASK 1: SUMMARY ===\n"
+            f"{self._build_summary_prompt(formatted_transcript, word_count)}\n\n"
+            "=== TASK 2: SCORECARD ===\n"
+            f"{self._build_scorecard_prompt(transcripts)}"
+        )
+
+        def validate_combined(combined: Dict[str, Any]) -> None:
+            if not isinstance(combined.get("summary"), dict) or not isinstance(combined.get("scorecard"), dict):
+                raise ValueError("Combined response missing summary or scorecard object")
+            # JSON mode, not the strict schema: tolerate extra keys and free-text
+            # direction rather than failing over to separate completions
+            LenientSummarySchema.model_validate(combined["summary"])
+
+        # Call OpenAI (or reuse a cached response for an identical prompt)
+        try:
+            combined = self._complete_json(
+                self._combined_system_prompt,
+                prompt,
+                self._calculate_max_tokens(word_count)
+                + self._calculate_scorecard_max_tokens(len(transcripts)),
+                validator=validate_combined,
+            )
+            summary_data = combined["summary"]
+            raw_scorecard = combined["scorecard"]
+
+            # Transform scorecard to match expected structure
+            scorecard_data = self._transform_scorecard_data(raw_scorecard, transcripts)
+
+            logger.info(f"Summary and scorecard generated successfully for session {session_id}")
+            return {"summary": summary_data, "scorecard": scorecard_data}
+
+        except Exception as e:
+            logger.error(
+                f"Failed to generate combined analysis for session {session_id}: {e}",
+                exc_info=True,
+            )
+            raise
+
+    def _response_cache_key(
+        self, system_prompt: str, user_prompt: str, response_format: Dict[str, Any]
+    ) -> str:
+        """Build the response cache key from everything that determines the output."""
+        digest = hashlib.sha256()
+        response_format_key = json.dumps(response_format, sort_keys=True)
+        for part in (self.model, str(self.temperature), response_format_key, system_prompt, user_prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return f"{_RESPONSE_CACHE_PREFIX}:{digest.hexdigest()}"
+
+    def _get_cached_response(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached parsed response, or None on miss/cache error."""
+        try:
+            cached = cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+        if cached is not None:
+            logger.info(f"Using cached OpenAI response ({cache_key[-12:]})")
+        return cached
+
+    def _completion_kwargs(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        response_format: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Build chat completion arguments shared by the sync and async clients."""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "max_completion_tokens": max_tokens,
+            "response_format": response_format,
+        }
+
+    def _parse_completion(
+        self,
+        response: Any,
+        cache_key: str,
+        validator: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Parse, validate and cache a JSON-mode chat completion response."""
+        message = response.choices[0].message
+        content = message.content
+
+        # Debug logging
+        logger.info(f"OpenAI response - finish_reason: {response.choices[0].finish_reason}")
+        logger.info(f"OpenAI response - content length: {len(content) if content else 0}")
+        if hasattr(message, 'refusal') and message.refusal:
+            logger.error(f"OpenAI refused to generate response: {message.refusal}")
+            raise ValueError(f"OpenAI refused: {message.refusal}")
+        if not content:
+            logger.error("OpenAI returned empty content")
+            raise ValueError("OpenAI returned empty content")
+
+        data = _json_loads(content)
+        if validator:
+            validator(data)
+
+        try:
+            cache.set(cache_key, data, timeout=_RESPONSE_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+        return data
+
+    def _complete_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        validator: Optional[Callable[[Dict[str, Any]], None]] = None,
+        response_format: Dict[str, Any] = _JSON_OBJECT_FORMAT,
+    ) -> Dict[str, Any]:
+        """
+        Run a JSON-mode chat completion, serving identical prompts from cache.
+
+        Args:
+            system_prompt: System message content
+            user_prompt: User message content
+            max_tokens: Completion token budget
+            validator: Optional callable raising on invalid data; only validated
+                responses are cached
+            response_format: OpenAI response_format (JSON mode by default)
+
+        Returns:
+            Parsed JSON response
+        """
+        cache_key = self._response_cache_key(system_prompt, user_prompt, response_format)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        response = self.client.chat.completions.create(
+            **self._completion_kwargs(system_prompt, user_prompt, max_tokens, response_format)
+        )
+        return self._parse_completion(response, cache_key, validator)
+
+    def _async_client(self) -> AsyncOpenAI:
+        """
+        Return an AsyncOpenAI client bound to the running event loop.
+
+        async_to_sync() runs each call on a fresh event loop, and pooled
+        async connections cannot be reused across loops.
+        """
+        loop = asyncio.get_running_loop()
+        if self.aclient is None or self._aclient_loop is not loop:
+            self.aclient = AsyncOpenAI(api_key=self._api_key)
+            self._aclient_loop = loop
+        return self.aclient
+
+    async def _acomplete_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        validator: Optional[Callable[[Dict[str, Any]], None]] = None,
+        response_format: Dict[str, Any] = _JSON_OBJECT_FORMAT,
+    ) -> Dict[str, Any]:
+        """Async variant of _complete_json() using the AsyncOpenAI client."""
+        cache_key = self._response_cache_key(system_prompt, user_prompt, response_format)
+        cached = await sync_to_async(self._get_cached_response)(cache_key)
+        if cached is not None:
+            return cached
+
+        response = await self._async_client().chat.completions.create(
+            **self._completion_kwargs(system_prompt, user_prompt, max_tokens, response_format)
+        )
+        return await sync_to_async(self._parse_completion)(response, cache_key, validator)
+
+    async def agenerate_summary(
+        self, session_id: str, transcripts: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Async variant of generate_summary().
+
+        Args:
+            session_id: The transcription session ID
+            transcripts: Already-fetched transcription events (fetched if omitted)
+
+        Returns:
+            Dictionary with summary data
+        """
+        if transcripts is None:
+            transcripts = await sync_to_async(self._fetch_transcripts)(session_id)
+        if not transcripts:
+            raise ValueError("No transcripts found for session")
+
+        formatted_transcript, word_count = self._format_transcripts(transcripts)
+        prompt = self._build_summary_prompt(formatted_transcript, word_count)
+
+        summary_data = await self._acomplete_json(
+            self._summary_system_prompt,
+            prompt,
+            self._calculate_max_tokens(word_count),
+            validator=self._validate_summary_data,
+            response_format=SUMMARY_RESPONSE_FORMAT,
+        )
+        logger.info(f"Summary generated successfully for session {session_id}")
+        return summary_data
+
+    async def agenerate_scorecard(
+        self, session_id: str, transcripts: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Async variant of generate_scorecard().
+
+        Args:
+            session_id: The transcription session ID
+            transcripts: Already-fetched transcription events (fetched if omitted)
+
+        Returns:
+            Dictionary with scorecard data
+        """
+        if transcripts is None:
+            transcripts = await sync_to_async(self._fetch_transcripts)(session_id)
+        if not transcripts:
+            raise ValueError("No transcripts found for session")
+
+        prompt = self._build_scorecard_prompt(transcripts)
+
+        raw_scorecard = await self._acomplete_json(
+            self._scorecard_system_prompt,
+            prompt,
+            self._calculate_scorecard_max_tokens(len(transcripts)),
+        )
+        scorecard_data = self._transform_scorecard_data(raw_scorecard, transcripts)
+        logger.info(f"Scorecard generated successfully for session {session_id}")
+        return scorecard_data
+
+    async def agenerate_all(self, session_id: str) -> Dict[str, Any]:
+        """
+        Generate summary and scorecard concurrently from one transcript fetch.
+
+        Args:
+            session_id: The transcription session ID
+
+        Returns:
+            Dictionary with "summary" and "scorecard" keys. Each value is the
+            generated data, or the exception raised while generating it.
+        """
+        transcripts = await sync_to_async(self._fetch_transcripts)(session_id)
+        if not transcripts:
+            raise ValueError("No transcripts found for session")
+
+        summary, scorecard = await asyncio.gather(
+            self.agenerate_summary(session_id, transcripts),
+            self.agenerate_scorecard(session_id, transcripts),
+            return_exceptions=True,
+        )
+        for name, result in (("summary", summary), ("scorecard", scorecard)):
+            if isinstance(result, Exception):
+                logger.error(
+                    f"Failed to generate {name} for session {session_id}: {result}",
+                    exc_info=result,
+                )
+        return {"summary": summary, "scorecard": scorecard}
+
+    def generate_all(self, session_id: str) -> Dict[str, Any]:
+        """Synchronous wrapper around agenerate_all() for sync callers."""
+        return async_to_sync(self.agenerate_all)(session_id)
+
+    def _fetch_transcripts(self, session_id: str) -> List[Dict[str, Any]]:
+        """Fetch transcription events from Supabase."""
         try:
-            # Try ordering by timestamp first, fallback to received_at
             response = (
-                supabase.table(table_name)
-                .select("*")
+                self._supabase.table(self._events_table)
+                .select(_TRANSCRIPT_COLUMNS)
                 .eq("session_id", session_id)
                 .order("received_at", desc=False)
                 .execute()
             )
 
-            return response.data if response.data else []
+            return response.data or []
         except Exception as e:
             logger.error(f"Failed to fetch transcripts: {e}", exc_info=True)
             return []
 
-    def _format_transcripts(self, transcripts: List[Dict[str, Any]]) -> str:
-        """Format transcripts for AI processing."""
+    def _format_transcripts(self, transcripts: List[Dict[str, Any]]) -> Tuple[str, int]:
+        """
+        Format transcripts for AI processing.
+
+        Returns:
+            Tuple of (formatted transcript, word count of the spoken text),
+            built in a single pass over the events
+        """
         formatted = []
+        word_count = 0
         for event in transcripts:
             speaker = event.get("speaker", "Unknown")
             text = event.get("text", "")
-            # Use received_at if available, otherwise timestamp
-            timestamp = event.get("received_at") or event.get("timestamp", "")
+            # Events have no timestamp column; received_at is the event time
+            timestamp = event.get("received_at") or ""
 
             # Format: [Speaker] (timestamp): text
             formatted.append(f"[{speaker}] ({timestamp}): {text}")
+            if text:
+                word_count += text.count(" ") + 1
 
-        return "\n".join(formatted)
+        return "\n".join(formatted), word_count
+
+    def _get_summary_length_bucket(self, word_count: int) -> Tuple[str, int]:
+        """Get (length guidance, expected summary tokens) for a transcript size."""
+        for max_words, guidance, expected_tokens in self._SUMMARY_LENGTH_BUCKETS:
+            if max_words is None or word_count < max_words:
+                return guidance, expected_tokens
+        raise AssertionError("unreachable: last summary length bucket is unbounded")
 
     def _get_summary_length_guidance(self, word_count: int) -> str:
         """Get summary length guidance based on transcript size."""
-        if word_count < 200:
-            return "Write 2-3 sharp, direct sentences that capture the essential points"
-        elif word_count < 500:
-            return "Write 1 concise paragraph (4-6 short sentences) covering all key points - no fluff"
-        elif word_count < 1000:
-            return "Write 2 focused paragraphs covering the conversation flow and important details - be direct and clear"
-        elif word_count < 2000:
-            return "Write 3-4 concise paragraphs with full detail on major topics, actions, and outcomes - use short sentences"
-        else:
-            return "Write 4-5 thorough but concise paragraphs capturing all aspects of this conversation - be sharp and direct throughout"
+        return self._get_summary_length_bucket(word_count)[0]
 
     def _build_summary_prompt(self, transcript: str, word_count: int) -> str:
         """Build professional summary prompt."""
         length_instruction = self._get_summary_length_guidance(word_count)
 
-        # Load prompt template from file
-        template = self._load_prompt("summary_user.txt")
-
-        # Format the template with dynamic values
-        return template.format(
+        # Static instructions first, transcript-dependent values last
+        return self._summary_prefix + self._summary_dynamic_template.format(
             word_count=word_count,
             length_instruction=length_instruction,
             transcript=transcript,
         )
 
-    def _build_scorecard_prompt(
-        self, transcript: str, transcripts: List[Dict[str, Any]]
-    ) -> str:
+    def _build_scorecard_prompt(self, transcripts: List[Dict[str, Any]]) -> str:
         """Build scorecard prompt."""
-        # Build transcript list with IDs for sentiment scoring
-        transcript_list = []
-        for i, t in enumerate(transcripts):
-            transcript_id = t.get("id", f"transcript-{i}")
-            timestamp = t.get("timestamp", t.get("received_at", ""))
-            speaker = t.get("speaker", "Unknown")
-            text = t.get("text", "")
-            transcript_list.append(
-                f"[ID: {transcript_id}] [{timestamp}] {speaker}: {text}"
-            )
-
-        transcript_with_ids = "\n".join(transcript_list)
-
-        # Load prompt template from file
-        template = self._load_prompt("scorecard_user.txt")
+        # Build transcript lines with IDs for sentiment scoring in one pass
+        transcript_with_ids = "\n".join(
+            f"[ID: {t.get('id') or f'transcript-{i}'}] "
+            f"[{t.get('received_at') or ''}] "
+            f"{t.get('speaker', 'Unknown')}: {t.get('text', '')}"
+            for i, t in enumerate(transcripts)
+        )
 
-        # Format the template with dynamic values
-        return template.format(transcript_with_ids=transcript_with_ids)
+        # Static instructions first, transcript last
+        return self._scorecard_prefix + self._scorecard_dynamic_template.format(
+            transcript_with_ids=transcript_with_ids
+        )
 
     def _calculate_max_tokens(self, word_count: int) -> int:
-        """Calculate max tokens based on word count."""
-        # Rough estimate: 1 token ≈ 0.75 words
-        # Reserve tokens for response (summary is typically 20-30% of input)
-        base_tokens = 3000  # Increased from 2000 to prevent truncation
-        if word_count > 2000:
-            base_tokens = 5000  # Increased from 4000 to prevent truncation
-        return base_tokens
+        """
+        Calculate the summary completion budget from its expected size.
+
+        max_completion_tokens also covers GPT-5.2 reasoning tokens, so a fixed
+        reasoning allowance is added on top of the padded output estimate.
+        """
+        expected_summary_tokens = self._get_summary_length_bucket(word_count)[1]
+        expected_output = expected_summary_tokens + self._SUMMARY_FIXED_FIELD_TOKENS
+        return int(expected_output * self._OUTPUT_TOKEN_SAFETY_FACTOR) + self._REASONING_TOKEN_ALLOWANCE
 
     def _calculate_scorecard_max_tokens(self, transcript_count: int) -> int:
-        """Calculate max tokens for scorecard."""
-        # Scorecard responses can be large with sentiment analysis for each turn
-        # GPT-5.2 has 128K context window, be more generous with output tokens
-        if transcript_count > 100:
-            return 16000  # Very long calls
-        elif transcript_count > 50:
-            return 12000  # Long calls with many turns
-        elif transcript_count > 30:
-            return 8000  # Medium-length calls
-        else:
-            return 6000  # Short calls
+        """
+        Calculate the scorecard completion budget from the number of turns.
+
+        The scorecard has a fixed question/answer section plus one
+        transcript_sentiments entry per turn.
+        """
+        expected_output = (
+            self._SCORECARD_FIXED_TOKENS
+            + transcript_count * self._SCORECARD_TOKENS_PER_TURN
+        )
+        budget = int(expected_output * self._OUTPUT_TOKEN_SAFETY_FACTOR) + self._REASONING_TOKEN_ALLOWANCE
+        return min(budget, self._SCORECARD_MAX_TOKENS)
 
     def _validate_summary_data(self, data: Dict[str, Any]) -> None:
-        """Validate summary data structure."""
-        required_fields = [
-            "title",
-            "summary",
-            "direction",
-            "action_codes",
-            "result_codes",
-        ]
-        for field in required_fields:
-            if field not in data:
-                raise ValueError(f"Missing required field: {field}")
+        """Validate summary data against SummarySchema (raises ValueError)."""
+        SummarySchema.model_validate(data)
 
     def _calculate_sentiment_shift(self, transcript_sentiments: List[Dict[str, Any]]) -> str:
         """
@@ -361,48 +706,41 @@ class CallSummaryService:
         Returns:
             bool: True if pass (score >= threshold), False if fail
         """
-        threshold = SCORECARD_THRESHOLDS.get(category, 70)
-        return score >= threshold
+        return score >= get_pass_threshold(category)
 
     def _transform_scorecard_data(self, raw_data: Dict[str, Any], transcripts: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
-        """Transform OpenAI response to match expected scorecard structure."""
+        """Transform OpenAI response to the expected scorecard structure, including the overall weighted score."""
         agent_score = raw_data.get("agent_score", {})
 
-        # Transform categories structure
+        # Build categories and their scores in a single pass
         categories = {}
-
-        # Compliance
-        compliance = agent_score.get("compliance", {})
-        if compliance:
-            compliance_score = compliance.get("overall_score", 0.0)
-            categories["compliance"] = {
-                "score": compliance_score,
-                "pass": self._calculate_pass_fail_status("compliance", compliance_score),
-                "feedback": "Compliance evaluation completed",
+        scores = {}
+        for name, feedback in self._SCORECARD_CATEGORIES:
+            score = (agent_score.get(name) or {}).get("overall_score")
+            if score is None:
+                continue
+            scores[name] = score
+            categories[name] = {
+                "score": score,
+                "pass": self._calculate_pass_fail_status(name, score),
+                "feedback": feedback,
                 "issues": [],
             }
 
-        # Servicing
-        servicing = agent_score.get("servicing", {})
-        if servicing:
-            servicing_score = servicing.get("overall_score", 0.0)
-            categories["servicing"] = {
-                "score": servicing_score,
-                "pass": self._calculate_pass_fail_status("servicing", servicing_score),
-                "feedback": "Servicing evaluation completed",
-                "issues": [],
-            }
-
-        # Collections
-        collections = agent_score.get("collections", {})
-        if collections and collections.get("overall_score") is not None:
-            collections_score = collections.get("overall_score", 0.0)
-            categories["collections"] = {
-                "score": collections_score,
-                "pass": self._calculate_pass_fail_status("collections", collections_score),
-                "feedback": "Collections evaluation completed",
-                "issues": [],
-            }
+        # Weighting depends on whether this is a collections call (has collections activity)
+        compliance_score = scores.get("compliance", 0.0)
+        servicing_score = scores.get("servicing", 0.0)
+        collections_score = scores.get("collections", 0.0)
+        if collections_score > 0:
+            # Collections call: 10% compliance + 50% servicing + 40% collections
+            weighted_score = (
+                (compliance_score * 0.10)
+                + (servicing_score * 0.50)
+                + (collections_score * 0.40)
+            )
+        else:
+            # Non-collections call: 17% compliance + 83% servicing
+            weighted_score = (compliance_score * 0.17) + (servicing_score * 0.83)
 
         # Map transcript sentiments from sequential IDs to actual UUIDs
         transcript_sentiments = raw_data.get("transcript_sentiments", [])
@@ -432,37 +770,37 @@ class CallSummaryService:
             "legal_issues_detected": raw_data.get("legal_issues_detected", False),
             "agent_score": agent_score,  # Keep original for detailed view
             "sentiment_shift_category": sentiment_shift_category,
+            "overall_weighted_score": round(weighted_score, 1),
         }
 
         return transformed
 
-    def _calculate_overall_weighted_score(
-        self, scorecard_data: Dict[str, Any]
-    ) -> float:
-        """Calculate overall weighted score."""
-        categories = scorecard_data.get("categories", {})
-
-        compliance_score = categories.get("compliance", {}).get("score", 0.0)
-        servicing_score = categories.get("servicing", {}).get("score", 0.0)
-        collections_score = (
-            categories.get("collections", {}).get("score", 0.0)
-            if categories.get("collections")
-            else 0.0
-        )
 
-        # Check if this is a collections call (has collections activity)
-        is_collections_call = collections_score > 0
+_summary_service: Optional[CallSummaryService] = None
+_summary_service_lock = threading.Lock()
 
-        if is_collections_call:
-            # Collections call: 10% compliance + 50% servicing + 40% collections
-            weighted_score = (
-                (compliance_score * 0.10)
-                + (servicing_score * 0.50)
-                + (collections_score * 0.40)
-            )
-        else:
-            # Non-collections call: 17% compliance + 83% servicing
-            weighted_score = (compliance_score * 0.17) + (servicing_score * 0.83)
 
-        # Round to 1 decimal place
-        return round(weighted_score, 1)
+def get_summary_service() -> CallSummaryService:
+    """
+    Get or create the process-wide CallSummaryService singleton.
+
+    Reusing one instance keeps the OpenAI client's HTTP connection pool and
+    the loaded prompt templates alive across requests.
+
+    Returns:
+        CallSummaryService: Shared service instance
+
+    Raises:
+        ValueError: If the OpenAI API key is not configured
+    """
+    global _summary_service
+
+    if _summary_service is not None:
+        return _summary_service
+
+    with _summary_service_lock:
+        if _summary_service is None:
+            # Only cache a successfully constructed service so a missing key
+            # is re-checked on the next call
+            _summary_service = CallSummaryService()
+    return _summary_service
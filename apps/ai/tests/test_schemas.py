@@ -0,0 +1,40 @@
+"""
+Tests for the summary response schemas.
+"""
+import pytest
+from pydantic import ValidationError
+
+from apps.ai.schemas import LenientSummarySchema, SummarySchema
+
+SUMMARY = {
+    "title": "Payment arrangement",
+    "summary": "Customer agreed to a payment plan.",
+    "direction": "inbound",
+    "action_codes": ["PAYMENT_PLAN"],
+    "result_codes": ["PROMISE_TO_PAY"],
+    "intent_tags": ["payment"],
+    "keywords": ["plan"],
+    "notes": "",
+}
+
+
+def test_strict_schema_rejects_extra_keys_and_unknown_direction():
+    with pytest.raises(ValidationError):
+        SummarySchema.model_validate({**SUMMARY, "sentiment": "positive"})
+    with pytest.raises(ValidationError):
+        SummarySchema.model_validate({**SUMMARY, "direction": "internal"})
+
+
+def test_lenient_schema_accepts_json_mode_variations():
+    data = {**SUMMARY, "sentiment": "positive", "direction": "internal"}
+    del data["intent_tags"], data["keywords"], data["notes"]
+
+    LenientSummarySchema.model_validate(data)
+
+
+def test_lenient_schema_still_requires_core_fields():
+    data = dict(SUMMARY)
+    del data["action_codes"]
+
+    with pytest.raises(ValidationError):
+        LenientSummarySchema.model_validate(data)
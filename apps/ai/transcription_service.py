@@ -1,13 +1,54 @@
 """
 Transcription service using AssemblyAI for audio transcription with speaker diarization.
 """
+import functools
 import logging
+from bisect import bisect_right
+from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
 from django.conf import settings
 import assemblyai as aai
 
 logger = logging.getLogger(__name__)
 
+# PII policies for debt collection compliance
+# Using only valid AssemblyAI policy names from their supported list
+# Excludes 'money_amount' per requirement (keep debt amounts visible)
+# Same as old backend implementation
+_PII_POLICIES = (
+    'person_name',
+    'phone_number',
+    'email_address',
+    'credit_card_number',
+    'credit_card_cvv',
+    'banking_information',
+    'us_social_security_number',
+    'date_of_birth',
+    'drivers_license',
+    'medical_condition',
+    'drug',
+    'passport_number',
+    'location',  # Changed from 'location_address' - see docs
+    'account_number',
+)
+
+
+@dataclass(slots=True)
+class ConversationTurn:
+    """A single diarized utterance from a transcription."""
+    speaker: str
+    text: str
+    start_time_ms: Optional[int]
+    end_time_ms: Optional[int]
+    duration_ms: Optional[int]
+    confidence: Optional[float]
+    sentiment: Optional[str]
+    pii_redacted: bool
+    pii_entities_detected: Optional[List[str]]
+    metadata: Dict[str, Any]  # speaker_label, transcript_id
+    timestamp: Optional[str] = None  # Will be set based on start_time_ms in the view
+    redacted_audio_url: Optional[str] = None
+
 
 class AssemblyAIProvider:
     """
@@ -29,22 +70,155 @@ class AssemblyAIProvider:
         self.pii_substitution = config.assemblyai_pii_substitution
         self.generate_redacted_audio = config.assemblyai_generate_redacted_audio
         
-        logger.info(
-            f'AssemblyAI provider initialized: '
-            f'pii_redaction={self.pii_redaction_enabled}, '
-            f'pii_substitution={self.pii_substitution}, '
-            f'generate_redacted_audio={self.generate_redacted_audio}'
+        # Sentiment analysis is always requested; kept as a flag so the
+        # converter can skip segment alignment if it is ever turned off
+        self._sentiment_enabled = True
+        
+        # Webhook configuration (submit + callback instead of blocking poll)
+        self.webhook_url = config.assemblyai_webhook_url
+        self.webhook_auth_header_name = config.assemblyai_webhook_auth_header_name
+        self.webhook_auth_header_value = config.assemblyai_webhook_auth_header_value
+        
+        # Reuse one transcriber (and its HTTP client) across transcriptions
+        self._transcriber = aai.Transcriber()
+        
+        logger.debug(
+            'AssemblyAI provider initialized: '
+            'pii_redaction=%s, pii_substitution=%s, generate_redacted_audio=%s',
+            self.pii_redaction_enabled,
+            self.pii_substitution,
+            self.generate_redacted_audio,
         )
     
     def is_ready(self) -> bool:
         """Check if provider is ready to use."""
         return aai.settings.api_key is not None
     
+    @property
+    def webhook_enabled(self) -> bool:
+        """Whether transcriptions are completed via webhook instead of polling."""
+        return bool(self.webhook_url)
+    
+    def _build_transcription_config(self, use_webhook: bool = False) -> aai.TranscriptionConfig:
+        """
+        Build the AssemblyAI transcription config.
+        
+        Args:
+            use_webhook: Attach the configured webhook URL and auth header
+            
+        Returns:
+            TranscriptionConfig with diarization, sentiment and PII options
+        """
+        # Build transcription options dict - similar to old backend's approach
+        # Old backend uses: this.client.transcripts.transcribe({ audio, speaker_labels, ... })
+        # Python SDK uses: transcriber.transcribe(url, config=TranscriptionConfig(...))
+        config_kwargs = {
+            'speaker_labels': True,
+            'sentiment_analysis': self._sentiment_enabled,
+        }
+        
+        # Add PII redaction parameters only if enabled (same as old backend)
+        if self.pii_redaction_enabled:
+            config_kwargs['redact_pii'] = True
+            config_kwargs['redact_pii_policies'] = list(_PII_POLICIES)  # List of strings
+            if self.pii_substitution:
+                config_kwargs['redact_pii_sub'] = self.pii_substitution
+            if self.generate_redacted_audio:
+                config_kwargs['redact_pii_audio'] = True
+        
+        if use_webhook:
+            config_kwargs['webhook_url'] = self.webhook_url
+            if self.webhook_auth_header_name and self.webhook_auth_header_value:
+                config_kwargs['webhook_auth_header_name'] = self.webhook_auth_header_name
+                config_kwargs['webhook_auth_header_value'] = self.webhook_auth_header_value
+        
+        return aai.TranscriptionConfig(**config_kwargs)
+    
+    def _check_transcript_status(self, transcript: Optional[aai.Transcript]) -> None:
+        """Raise if a transcript is missing, failed, or not yet completed."""
+        # Check if transcription completed successfully
+        if not transcript:
+            raise Exception("Transcription returned None - check audio URL accessibility")
+        
+        # Check status - old backend checks: transcript.status === 'error'
+        if transcript.status == aai.TranscriptStatus.error:
+            error_msg = getattr(transcript, 'error', 'Unknown error')
+            raise Exception(f"Transcription failed with error: {error_msg}")
+        elif transcript.status != aai.TranscriptStatus.completed:
+            raise Exception(f"Transcription did not complete. Status: {transcript.status}")
+    
+    def submit_transcription(self, audio_url: str) -> str:
+        """
+        Submit audio for transcription without waiting for it to complete.
+        
+        AssemblyAI calls the configured webhook when the transcript is ready;
+        the result is then loaded with fetch_transcription().
+        
+        Args:
+            audio_url: URL to the audio file (can be signed URL from Supabase Storage)
+            
+        Returns:
+            AssemblyAI transcript ID
+        """
+        if not self.is_ready():
+            raise ValueError("AssemblyAI provider not initialized")
+        if not self.webhook_enabled:
+            raise ValueError("AssemblyAI webhook URL not configured")
+        
+        logger.info('Submitting AssemblyAI transcription (webhook mode): audio_url=%.100s...', audio_url)
+        
+        try:
+            transcript = self._transcriber.submit(
+                audio_url,
+                config=self._build_transcription_config(use_webhook=True)
+            )
+        except Exception as submit_error:
+            logger.error('AssemblyAI submit() call failed: %s', submit_error, exc_info=True)
+            raise Exception(f"AssemblyAI transcription submission failed: {str(submit_error)}")
+        
+        if transcript.status == aai.TranscriptStatus.error:
+            raise Exception(f"Transcription failed with error: {getattr(transcript, 'error', 'Unknown error')}")
+        
+        logger.info('AssemblyAI transcription submitted: transcript_id=%s', transcript.id)
+        return transcript.id
+    
+    def fetch_transcription(
+        self,
+        transcript_id: str,
+        speaker_mapping: Optional[Dict[str, str]] = None
+    ) -> List[ConversationTurn]:
+        """
+        Load a completed transcript by ID and convert it to conversation turns.
+        
+        Args:
+            transcript_id: AssemblyAI transcript ID (from submit_transcription or a webhook)
+            speaker_mapping: Optional mapping of speaker labels (e.g., {'A': 'agent', 'B': 'customer'})
+            
+        Returns:
+            List of conversation turns with speaker, text, timestamps, etc.
+        """
+        if not self.is_ready():
+            raise ValueError("AssemblyAI provider not initialized")
+        
+        if not speaker_mapping:
+            speaker_mapping = {'A': 'agent', 'B': 'customer'}
+        
+        transcript = aai.Transcript.get_by_id(transcript_id)
+        self._check_transcript_status(transcript)
+        
+        logger.info(
+            'Fetched completed transcription: transcript_id=%s, utterances=%d',
+            transcript.id,
+            len(transcript.utterances) if transcript.utterances else 0,
+        )
+        
+        return self._convert_to_conversation_turns(transcript, speaker_mapping)
+    
     def transcribe_with_diarization(
         self,
         audio_url: str,
         speaker_mapping: Optional[Dict[str, str]] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[ConversationTurn]:
         """
         Transcribe audio with speaker diarization.
         
@@ -61,85 +235,37 @@ class AssemblyAIProvider:
         if not speaker_mapping:
             speaker_mapping = {'A': 'agent', 'B': 'customer'}
         
-        logger.info(f'Starting AssemblyAI transcription: audio_url={audio_url[:100]}...')
-        
-        # Define PII policies for debt collection compliance
-        # Using only valid AssemblyAI policy names from their supported list
-        # Excludes 'money_amount' per requirement (keep debt amounts visible)
-        # Same as old backend implementation
-        pii_policies = [
-            'person_name',
-            'phone_number',
-            'email_address',
-            'credit_card_number',
-            'credit_card_cvv',
-            'banking_information',
-            'us_social_security_number',
-            'date_of_birth',
-            'drivers_license',
-            'medical_condition',
-            'drug',
-            'passport_number',
-            'location',  # Changed from 'location_address' - see docs
-            'account_number'
-        ]
+        logger.info('Starting AssemblyAI transcription: audio_url=%.100s...', audio_url)
         
-        logger.info(
-            f'PII redaction configuration: enabled={self.pii_redaction_enabled}, '
-            f'substitution={self.pii_substitution}, '
-            f'generate_redacted_audio={self.generate_redacted_audio}, '
-            f'policies_count={len(pii_policies)}'
+        logger.debug(
+            'PII redaction configuration: enabled=%s, substitution=%s, '
+            'generate_redacted_audio=%s, policies_count=%d',
+            self.pii_redaction_enabled,
+            self.pii_substitution,
+            self.generate_redacted_audio,
+            len(_PII_POLICIES),
         )
         
         try:
-            # Create transcriber instance
-            transcriber = aai.Transcriber()
-            
-            # Build transcription options dict - similar to old backend's approach
-            # Old backend uses: this.client.transcripts.transcribe({ audio, speaker_labels, ... })
-            # Python SDK uses: transcriber.transcribe(url, config=TranscriptionConfig(...))
-            config_kwargs = {
-                'speaker_labels': True,
-                'sentiment_analysis': True,
-            }
-            
-            # Add PII redaction parameters only if enabled (same as old backend)
-            if self.pii_redaction_enabled:
-                config_kwargs['redact_pii'] = True
-                config_kwargs['redact_pii_policies'] = pii_policies  # List of strings
-                if self.pii_substitution:
-                    config_kwargs['redact_pii_sub'] = self.pii_substitution
-                if self.generate_redacted_audio:
-                    config_kwargs['redact_pii_audio'] = True
-            
             # Create config object
-            config = aai.TranscriptionConfig(**config_kwargs)
+            config = self._build_transcription_config()
             
-            logger.info(f'Starting AssemblyAI transcription for URL: {audio_url[:100]}...')
+            logger.debug('Starting AssemblyAI transcription for URL: %.100s...', audio_url)
             
             # Transcribe audio (this will poll until complete)
             # The transcribe method handles polling internally, similar to old backend's await
             try:
-                transcript = transcriber.transcribe(audio_url, config=config)
+                transcript = self._transcriber.transcribe(audio_url, config=config)
             except Exception as transcribe_error:
-                logger.error(f'AssemblyAI transcribe() call failed: {transcribe_error}', exc_info=True)
+                logger.error('AssemblyAI transcribe() call failed: %s', transcribe_error, exc_info=True)
                 raise Exception(f"AssemblyAI transcription submission failed: {str(transcribe_error)}")
             
-            # Check if transcription completed successfully
-            if not transcript:
-                raise Exception("Transcription returned None - check audio URL accessibility")
-            
-            # Check status - old backend checks: transcript.status === 'error'
-            if hasattr(transcript, 'status'):
-                if transcript.status == aai.TranscriptStatus.error:
-                    error_msg = getattr(transcript, 'error', 'Unknown error')
-                    raise Exception(f"Transcription failed with error: {error_msg}")
-                elif transcript.status != aai.TranscriptStatus.completed:
-                    raise Exception(f"Transcription did not complete. Status: {transcript.status}")
+            self._check_transcript_status(transcript)
             
             logger.info(
-                f'Transcription completed: transcript_id={transcript.id}, '
-                f'utterances={len(transcript.utterances) if transcript.utterances else 0}'
+                'Transcription completed: transcript_id=%s, utterances=%d',
+                transcript.id,
+                len(transcript.utterances) if transcript.utterances else 0,
             )
             
             # Convert to conversation turns
@@ -151,14 +277,14 @@ class AssemblyAIProvider:
             return turns
             
         except Exception as e:
-            logger.error(f'Failed to transcribe audio: {e}', exc_info=True)
+            logger.error('Failed to transcribe audio: %s', e, exc_info=True)
             raise
     
     def _convert_to_conversation_turns(
         self,
         transcript: aai.Transcript,
         speaker_mapping: Dict[str, str]
-    ) -> List[Dict[str, Any]]:
+    ) -> List[ConversationTurn]:
         """
         Convert AssemblyAI transcript to conversation turns format.
         
@@ -175,72 +301,125 @@ class AssemblyAIProvider:
         
         turns = []
         
-        # Get sentiment analysis results if available
-        sentiment_results = {}
-        if hasattr(transcript, 'sentiment_analysis_results') and transcript.sentiment_analysis_results:
-            for result in transcript.sentiment_analysis_results:
-                if hasattr(result, 'text') and hasattr(result, 'sentiment'):
-                    sentiment_results[result.text] = result.sentiment
+        # Sentiment results are segment-level and rarely match utterance text
+        # exactly, so align them by time: sort segments by start once and find
+        # the segment containing each utterance midpoint with a binary search
+        sentiment_segments = []
+        if self._sentiment_enabled:
+            sentiment_segments = sorted(
+                (
+                    (result.start, result.end, result.sentiment)
+                    for result in getattr(transcript, 'sentiment_analysis_results', None) or []
+                    if result.start is not None and result.end is not None
+                ),
+                key=lambda segment: segment[0]
+            )
+        segment_starts = [segment[0] for segment in sentiment_segments]
+        
+        # Extract PII entities once - they are transcript-scoped, not per utterance.
+        # AssemblyAI only reports them when redaction was requested.
+        transcript_pii_entities = None
+        if self.pii_redaction_enabled:
+            transcript_pii_entities = [
+                str(entity.entity_type)
+                for entity in getattr(transcript, 'entities', None) or []
+                if getattr(entity, 'entity_type', None) is not None
+            ] or None
+        
+        redacted_audio_url = (
+            getattr(transcript, 'redacted_audio_url', None) or None
+            if self.generate_redacted_audio else None
+        )
+        
+        # Values shared by every turn, bound once outside the loop
+        transcript_id = transcript.id
+        pii_redacted = self.pii_redaction_enabled
+        map_speaker = speaker_mapping.get
         
         for utterance in transcript.utterances:
-            # Map speaker label to role (utterance.speaker is typically 'A', 'B', etc.)
-            speaker_label = utterance.speaker if hasattr(utterance, 'speaker') else None
-            speaker_role = speaker_mapping.get(speaker_label, 'unknown') if speaker_label else 'unknown'
+            # Read each utterance attribute once
+            start, end = utterance.start, utterance.end
+            text, confidence, speaker_label = utterance.text, utterance.confidence, utterance.speaker
             
-            # Extract sentiment from utterance text
-            sentiment = None
-            if utterance.text and utterance.text in sentiment_results:
-                sentiment = sentiment_results[utterance.text]
-            elif hasattr(utterance, 'sentiment'):
-                sentiment = utterance.sentiment
+            # Map speaker label to role (speaker_label is typically 'A', 'B', etc.)
+            speaker_role = map_speaker(speaker_label, 'unknown') if speaker_label else 'unknown'
             
-            # Extract PII entities if available
-            pii_entities = []
-            if hasattr(transcript, 'entities') and transcript.entities:
-                for entity in transcript.entities:
-                    if hasattr(entity, 'entity_type'):
-                        pii_entities.append(str(entity.entity_type))
+            # Find the sentiment segment covering the utterance midpoint
+            sentiment = getattr(utterance, 'sentiment', None)
+            if segment_starts and start is not None and end is not None:
+                midpoint = (start + end) / 2
+                index = bisect_right(segment_starts, midpoint) - 1
+                if index >= 0 and midpoint <= sentiment_segments[index][1]:
+                    sentiment = sentiment_segments[index][2]
             
-            # Calculate timestamps (utterance.start and utterance.end are in seconds, convert to milliseconds)
-            start_time_ms = int(utterance.start * 1000) if hasattr(utterance, 'start') and utterance.start is not None else None
-            end_time_ms = int(utterance.end * 1000) if hasattr(utterance, 'end') and utterance.end is not None else None
+            # AssemblyAI reports utterance start/end as integer milliseconds
+            start_time_ms = start
+            end_time_ms = end
             
-            if start_time_ms and end_time_ms:
-                duration_ms = end_time_ms - start_time_ms
+            if start is not None and end is not None:
+                duration_ms = end - start
             else:
                 duration_ms = None
             
-            turn = {
-                'speaker': speaker_role,
-                'text': utterance.text if hasattr(utterance, 'text') else '',
-                'timestamp': None,  # Will be set based on start_time_ms in the view
-                'start_time_ms': start_time_ms,
-                'end_time_ms': end_time_ms,
-                'duration_ms': duration_ms,
-                'confidence': utterance.confidence if hasattr(utterance, 'confidence') else None,
-                'sentiment': sentiment,
-                'pii_redacted': self.pii_redaction_enabled,
-                'pii_entities_detected': pii_entities if pii_entities else None,
-                'metadata': {
+            turn = ConversationTurn(
+                speaker=speaker_role,
+                text=text or '',
+                start_time_ms=start_time_ms,
+                end_time_ms=end_time_ms,
+                duration_ms=duration_ms,
+                confidence=confidence,
+                sentiment=sentiment,
+                pii_redacted=pii_redacted,
+                pii_entities_detected=transcript_pii_entities,
+                metadata={
                     'speaker_label': speaker_label,
-                    'transcript_id': transcript.id
-                }
-            }
-            
-            # Add redacted audio URL if available
-            if self.generate_redacted_audio and hasattr(transcript, 'redacted_audio_url') and transcript.redacted_audio_url:
-                turn['redacted_audio_url'] = transcript.redacted_audio_url
+                    'transcript_id': transcript_id
+                },
+                # Add redacted audio URL if available
+                redacted_audio_url=redacted_audio_url,
+            )
             
             turns.append(turn)
         
-        logger.info(f'Converted {len(turns)} utterances to conversation turns')
+        logger.info('Converted %d utterances to conversation turns', len(turns))
         return turns
 
 
+@functools.lru_cache(maxsize=4)
+def _build_service(
+    api_key: str,
+    pii_redaction_enabled: bool,
+    pii_substitution: str,
+    generate_redacted_audio: bool,
+    webhook_url: str,
+    webhook_auth_header_name: str,
+    webhook_auth_header_value: str,
+) -> AssemblyAIProvider:
+    """
+    Build a provider for one configuration snapshot.
+    
+    The arguments only form the cache key; the provider reads the same
+    values from settings. A config change produces a new key and a new
+    provider instead of reusing a stale one.
+    """
+    provider = AssemblyAIProvider()
+    logger.info(
+        'AssemblyAI provider initialized: '
+        'pii_redaction=%s, pii_substitution=%s, generate_redacted_audio=%s',
+        pii_redaction_enabled,
+        pii_substitution,
+        generate_redacted_audio,
+    )
+    return provider
+
+
 def get_transcription_service() -> Optional[AssemblyAIProvider]:
     """
     Get transcription service instance.
     
+    The provider is cached per process, keyed on the AssemblyAI settings,
+    so repeated calls skip client setup and init logging.
+    
     Returns:
         AssemblyAIProvider instance if configured, None otherwise
     """
@@ -250,8 +429,15 @@ def get_transcription_service() -> Optional[AssemblyAIProvider]:
             logger.warning('AssemblyAI API key not configured')
             return None
         
-        return AssemblyAIProvider()
+        return _build_service(
+            config.assemblyai_api_key,
+            config.assemblyai_pii_redaction_enabled,
+            config.assemblyai_pii_substitution,
+            config.assemblyai_generate_redacted_audio,
+            config.assemblyai_webhook_url,
+            config.assemblyai_webhook_auth_header_name,
+            config.assemblyai_webhook_auth_header_value,
+        )
     except Exception as e:
-        logger.error(f'Failed to create transcription service: {e}')
+        logger.error('Failed to create transcription service: %s', e)
         return None
-
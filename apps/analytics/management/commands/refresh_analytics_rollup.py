@@ -0,0 +1,26 @@
+"""
+Django management command to refresh the pre-aggregated analytics rollup.
+
+Usage:
+    python manage.py refresh_analytics_rollup
+    python manage.py refresh_analytics_rollup --days 400  # backfill
+"""
+
+from django.core.management.base import BaseCommand
+from apps.analytics.services.queries import refresh_daily_rollup
+
+
+class Command(BaseCommand):
+    help = 'Recompute analytics_daily_rollup for recent days'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=2,
+            help='Number of days to refresh, ending today (default: 2)',
+        )
+
+    def handle(self, *args, **options):
+        rows = refresh_daily_rollup(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {rows} days of analytics rollup'))
@@ -3,28 +3,148 @@ Business logic for aggregating analytics data.
 Combines raw queries into meaningful business metrics.
 Updated: Added action_codes and result_codes support.
 """
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, Tuple
 from apps.analytics.services.queries import (
-    get_sessions_count,
-    get_acceptance_rate,
-    get_avg_handle_time,
-    get_total_call_time,
-    get_daily_metrics,
+    get_scorecard_aggregates,
+    get_daily_metrics_multi,
     get_period_dates,
     get_call_intents,
     get_action_codes,
     get_result_codes,
     get_sentiment_distribution,
-    get_compliance_scorecard_summary,
-    get_servicing_scorecard_summary,
-    get_collections_scorecard_summary,
-    get_legal_scorecard_summary,
-    _calculate_scorecard_delta,
+    get_scorecard_summary_with_delta,
+    get_scorecard_summaries_with_delta,
+    get_analytics_bundle,
 )
+from apps.analytics.services.cache import cache_get, cache_set, get_cached_bulk, get_data_version
+from apps.ai.constants import ScorecardCategory
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Cached aggregates are dropped by invalidate_analytics() whenever a session is
+# inserted or its duration, transcript or AI analysis is written, so the TTL
+# only bounds writes made outside this service
+_AGGREGATION_CACHE_TTL = 3600  # seconds
+
+# Empty periods (no calls) are the common case for new tenants and quiet
+# ranges, so they are kept longer. The "_empty" marker stores the data version
+# they were computed at and an entry from an older version is treated as a
+# miss, so any write that invalidates also retires them even if deleting its
+# key failed. A row written outside this service can stay hidden this long
+_EMPTY_AGGREGATION_CACHE_TTL = 6 * 3600  # seconds
+_EMPTY_MARKER = "_empty"
+
+
+# Shared pool for concurrent analytics queries; the worker count caps how many
+# Supabase requests one process has in flight (the connection pool is shared)
+_QUERY_CONCURRENCY = 8
+_QUERY_EXECUTOR = ThreadPoolExecutor(max_workers=_QUERY_CONCURRENCY, thread_name_prefix="analytics-query")
+
+
+def _run_concurrently(calls: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    Run independent query calls in parallel threads.
+
+    Each query is a Supabase HTTP round trip, so overlapping them makes the
+    total latency roughly that of the slowest call instead of the sum.
+    The query functions handle their own errors and return defaults. The
+    calls must not use _run_concurrently themselves (they would wait on
+    the same bounded pool).
+
+    Args:
+        calls: Mapping of result name to zero-argument callable
+
+    Returns:
+        dict: Mapping of result name to the callable's return value
+    """
+    futures = {name: _QUERY_EXECUTOR.submit(call) for name, call in calls.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def _aggregation_cache_key(name: str, user_id: Optional[Any], period: str, start_date: Optional[str], end_date: Optional[str]) -> str:
+    """Cache key of an aggregation result."""
+    return f"analytics:{name}:{user_id}:{period}:{start_date}:{end_date}"
+
+
+def _cached_aggregation(
+    name: str,
+    user_id: Optional[Any],
+    period: str,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    compute: Callable[[], Dict[str, Any]],
+    is_empty: Optional[Callable[[Dict[str, Any]], bool]] = None,
+) -> Dict[str, Any]:
+    """
+    Return a cached aggregation result, computing and storing it on a miss.
+
+    Uses the analytics Redis cache; when Redis is unavailable the result is
+    simply computed.
+
+    Args:
+        name: Aggregation name used in the cache key
+        user_id: Tenant user ID (or None)
+        period: Time period string
+        start_date: Optional ISO date string for custom range
+        end_date: Optional ISO date string for custom range
+        compute: Zero-argument callable producing the result
+        is_empty: Optional predicate marking a result as empty; empty
+            results are cached with _EMPTY_AGGREGATION_CACHE_TTL and an
+            "_empty" marker holding the data version
+
+    Returns:
+        dict: Aggregation result
+    """
+    cache_key = _aggregation_cache_key(name, user_id, period, start_date, end_date)
+    return _cached_or_compute(cache_key, cache_get(cache_key), compute, is_empty)
+
+
+def _cached_or_compute(
+    cache_key: str,
+    cached: Optional[Dict[str, Any]],
+    compute: Callable[[], Dict[str, Any]],
+    is_empty: Optional[Callable[[Dict[str, Any]], bool]] = None,
+) -> Dict[str, Any]:
+    """
+    Return an already-read cache entry, or compute and store the result.
+
+    Args:
+        cache_key: Cache key of the aggregation
+        cached: Value read for cache_key (None on a miss)
+        compute: Zero-argument callable producing the result
+        is_empty: Optional predicate marking a result as empty (see _cached_aggregation)
+
+    Returns:
+        dict: Aggregation result
+    """
+    if cached is not None:
+        empty_version = cached.pop(_EMPTY_MARKER, None)
+        if empty_version is None or empty_version == get_data_version():
+            return cached
+        # Empty result from before the last invalidation: recompute
+
+    # Read the version before computing so a write landing mid-compute
+    # leaves the entry marked stale rather than current
+    version = get_data_version() if is_empty is not None else None
+    result = compute()
+    if is_empty is not None and is_empty(result) and version is not None:
+        cache_set(cache_key, {**result, _EMPTY_MARKER: version}, ttl=_EMPTY_AGGREGATION_CACHE_TTL)
+    else:
+        cache_set(cache_key, result, ttl=_AGGREGATION_CACHE_TTL)
+    return result
+
+
+def _has_no_calls(metrics: Dict[str, Any]) -> bool:
+    """Whether a scorecard metrics result covers no calls."""
+    return metrics["metrics"]["total_calls"] == 0
+
+
+def _has_no_scored_calls(summaries: Dict[str, Any]) -> bool:
+    """Whether scorecard summaries cover no scored calls."""
+    return all(summary["total_count"] == 0 for summary in summaries.values())
+
 
 def get_scorecard_metrics(user, period: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -39,33 +159,54 @@ def get_scorecard_metrics(user, period: str, start_date: Optional[str] = None, e
     Returns:
         dict: Scorecard data with metrics and trends
     """
-    user_id = str(user.id) if user and hasattr(user, 'id') and user.id is not None else None
+    user_id = getattr(user, 'id', None)
 
-    # Get main metrics
-    total_calls = get_sessions_count(user_id, period, start_date, end_date)
-    acceptance_rate = get_acceptance_rate(user_id, period, start_date, end_date)
-    avg_handle_time_sec = get_avg_handle_time(user_id, period, start_date, end_date)
-    total_call_time_sec = get_total_call_time(user_id, period, start_date, end_date)
+    return _cached_aggregation(
+        "scorecard", user_id, period, start_date, end_date,
+        lambda: _compute_scorecard_metrics(user_id, period, start_date, end_date),
+        is_empty=_has_no_calls,
+    )
 
-    # Calculate conversion delta (placeholder - adjust based on your business logic)
-    # This compares current period to previous period
-    conversion_delta = 0.07  # Placeholder - implement actual comparison
+
+def _compute_scorecard_metrics(user_id: Optional[Any], period: str, start_date: Optional[str], end_date: Optional[str]) -> Dict[str, Any]:
+    """Run the scorecard metric queries (uncached)."""
+    # One round trip when the bundle RPC is available; otherwise the metric
+    # queries are independent, so run them in parallel
+    results = get_analytics_bundle(user_id, period, start_date, end_date) or _run_concurrently({
+        "aggregates": lambda: get_scorecard_aggregates(user_id, period, start_date, end_date),
+        "acceptance_trend": lambda: get_daily_metrics_multi(user_id, period, ["acceptance_rate"], start_date, end_date)["acceptance_rate"],
+        "call_intents": lambda: get_call_intents(user_id, period, start_date, end_date),
+        "action_codes": lambda: get_action_codes(user_id, period, start_date, end_date),
+        "result_codes": lambda: get_result_codes(user_id, period, start_date, end_date),
+        "sentiment_dist": lambda: get_sentiment_distribution(user_id, period, start_date, end_date),
+    })
+
+    # Get main metrics (computed together in one query)
+    aggregates = results["aggregates"]
+    total_calls = aggregates["total_calls"]
+    acceptance_rate = aggregates["acceptance_rate"]
+    avg_handle_time_sec = aggregates["avg_handle_time_sec"]
+    total_call_time_sec = aggregates["total_call_time_sec"]
+
+    # Change in acceptance rate versus the previous period of the same length
+    conversion_delta = aggregates["conversion_delta"]
 
     # Get trend data for acceptance rate
-    acceptance_trend = get_daily_metrics(user_id, period, "acceptance_rate", start_date, end_date)
+    acceptance_trend = results["acceptance_trend"]
 
     # Get call intents, action codes, result codes, and sentiment distribution
-    call_intents = get_call_intents(user_id, period, start_date, end_date)
-    action_codes = get_action_codes(user_id, period, start_date, end_date)
-    result_codes = get_result_codes(user_id, period, start_date, end_date)
-    sentiment_dist = get_sentiment_distribution(user_id, period, start_date, end_date)
+    call_intents = results["call_intents"]
+    action_codes = results["action_codes"]
+    result_codes = results["result_codes"]
+    sentiment_dist = results["sentiment_dist"]
 
     return {
         "period": period,
         "metrics": {
             "total_calls": total_calls,
             "acceptance_rate": round(acceptance_rate, 2),
-            "avg_handle_time_sec": round(avg_handle_time_sec, 0),
+            # Whole seconds as an int (durations are non-negative, so +0.5 rounds)
+            "avg_handle_time_sec": int(avg_handle_time_sec + 0.5),
             "total_call_time_sec": total_call_time_sec,
             "conversion_delta": conversion_delta,
         },
@@ -93,18 +234,24 @@ def get_trend_metrics(user, period: str, metric: Optional[str] = None, start_dat
     Returns:
         dict: Trend data with time series for requested metrics
     """
-    user_id = str(user.id) if user and hasattr(user, 'id') and user.id is not None else None
+    user_id = getattr(user, 'id', None)
     
+    return _cached_aggregation(
+        f"trends:{metric or 'all'}", user_id, period, start_date, end_date,
+        lambda: _compute_trend_metrics(user_id, period, metric, start_date, end_date),
+    )
+
+
+def _compute_trend_metrics(user_id: Optional[Any], period: str, metric: Optional[str], start_date: Optional[str], end_date: Optional[str]) -> Dict[str, Any]:
+    """Run the per-metric trend queries (uncached)."""
     metrics_to_fetch = [metric] if metric else ["acceptance_rate", "total_calls"]
     
+    # All metrics are derived from one per-day query
     trends_data = {
         "period": period,
-        "metrics": {}
+        "metrics": get_daily_metrics_multi(user_id, period, metrics_to_fetch, start_date, end_date)
     }
     
-    for m in metrics_to_fetch:
-        trends_data["metrics"][m] = get_daily_metrics(user_id, period, m, start_date, end_date)
-    
     return trends_data
 
 
@@ -119,7 +266,7 @@ def get_health_metrics(user, period: str) -> Dict[str, Any]:
     Returns:
         dict: Health metrics data
     """
-    user_id = str(user.id) if user and hasattr(user, 'id') and user.id is not None else None
+    user_id = getattr(user, 'id', None)
     
     # Placeholder metrics - implement based on your actual system monitoring
     # These would typically come from error logs, response time tracking, etc.
@@ -151,23 +298,60 @@ def get_scorecard_summaries(user, period: str, start_date: Optional[str] = None,
     Returns:
         dict: Scorecard summaries with pass/fail counts, percentages, and deltas
     """
-    user_id = str(user.id) if user and hasattr(user, 'id') and user.id is not None else None
+    user_id = getattr(user, 'id', None)
+
+    return _cached_aggregation(
+        "scorecard_summaries", user_id, period, start_date, end_date,
+        lambda: _compute_scorecard_summaries(user_id, period, start_date, end_date),
+        is_empty=_has_no_scored_calls,
+    )
+
+
+def get_scorecard_dashboard(user, period: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Get scorecard metrics and scorecard summaries for the dashboard.
+
+    Same results as get_scorecard_metrics() and get_scorecard_summaries(),
+    but both cache entries are read in one Redis round trip (MGET).
+
+    Args:
+        user: Django user object (for tenant filtering)
+        period: Time period string
+        start_date: Optional ISO date string for custom range
+        end_date: Optional ISO date string for custom range
+
+    Returns:
+        tuple: (scorecard metrics, scorecard summaries)
+    """
+    user_id = getattr(user, 'id', None)
+    metrics_key = _aggregation_cache_key("scorecard", user_id, period, start_date, end_date)
+    summaries_key = _aggregation_cache_key("scorecard_summaries", user_id, period, start_date, end_date)
+    cached = get_cached_bulk([metrics_key, summaries_key])
 
-    # Get summaries for each scorecard type
-    compliance_summary = get_compliance_scorecard_summary(user_id, period, start_date, end_date)
-    servicing_summary = get_servicing_scorecard_summary(user_id, period, start_date, end_date)
-    collections_summary = get_collections_scorecard_summary(user_id, period, start_date, end_date)
-    legal_summary = get_legal_scorecard_summary(user_id, period, start_date, end_date)
+    metrics = _cached_or_compute(
+        metrics_key, cached.get(metrics_key),
+        lambda: _compute_scorecard_metrics(user_id, period, start_date, end_date),
+        is_empty=_has_no_calls,
+    )
+    summaries = _cached_or_compute(
+        summaries_key, cached.get(summaries_key),
+        lambda: _compute_scorecard_summaries(user_id, period, start_date, end_date),
+        is_empty=_has_no_scored_calls,
+    )
+    return metrics, summaries
 
-    # Calculate deltas - TEMPORARILY DISABLED for performance
-    # TODO: Re-enable after optimizing delta calculation queries
-    compliance_delta = 0.0  # _calculate_scorecard_delta(compliance_summary, period, 'compliance', user_id, start_date, end_date)
-    servicing_delta = 0.0  # _calculate_scorecard_delta(servicing_summary, period, 'servicing', user_id, start_date, end_date)
-    collections_delta = 0.0  # _calculate_scorecard_delta(collections_summary, period, 'collections', user_id, start_date, end_date)
-    legal_delta = 0.0  # _calculate_scorecard_delta(legal_summary, period, 'legal', user_id, start_date, end_date)
+
+def _compute_scorecard_summaries(user_id: Optional[Any], period: str, start_date: Optional[str], end_date: Optional[str]) -> Dict[str, Any]:
+    """Run the scorecard summary queries (uncached)."""
+    # One round trip for all categories when the combined RPC is available;
+    # otherwise each category's summary and delta come from one query, in parallel
+    summaries = get_scorecard_summaries_with_delta(user_id, period, start_date, end_date) or _run_concurrently({
+        category.value: (lambda category=category: get_scorecard_summary_with_delta(category, user_id, period, start_date, end_date))
+        for category in ScorecardCategory
+    })
 
     # Build response with pass percentages
-    def build_summary(summary, delta):
+    def build_summary(summary):
         total = summary["total_count"]
         pass_count = summary["pass_count"]
         fail_count = summary["fail_count"]
@@ -178,13 +362,7 @@ def get_scorecard_summaries(user, period: str, start_date: Optional[str] = None,
             "fail_count": fail_count,
             "total_count": total,
             "pass_percentage": pass_percentage,
-            "delta_percentage": delta,
+            "delta_percentage": summary["delta_percentage"],
         }
 
-    return {
-        "compliance": build_summary(compliance_summary, compliance_delta),
-        "servicing": build_summary(servicing_summary, servicing_delta),
-        "collections": build_summary(collections_summary, collections_delta),
-        "legal": build_summary(legal_summary, legal_delta),
-    }
-
+    return {name: build_summary(summary) for name, summary in summaries.items()}
@@ -1,9 +1,14 @@
 """
 Redis caching helpers for analytics data.
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+import hashlib
 import json
 import logging
+import threading
+import time
+
+from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
@@ -15,32 +20,122 @@ except ImportError:
     REDIS_AVAILABLE = False
     logger.warning("Redis not available - caching disabled")
 
+# Cache hit/miss/error metrics, only when prometheus_client is installed
+try:
+    from prometheus_client import Counter, Histogram
+
+    _CACHE_HITS = Counter('analytics_cache_hits_total', 'Analytics cache hits', ['kind'])
+    _CACHE_MISSES = Counter('analytics_cache_misses_total', 'Analytics cache misses', ['kind'])
+    _CACHE_ERRORS = Counter('analytics_cache_errors_total', 'Analytics cache errors', ['kind'])
+    _CACHE_GET_SECONDS = Histogram('analytics_cache_get_seconds', 'Analytics cache read latency', ['kind'])
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+# Prefer orjson for (de)serializing cached payloads, fall back to stdlib json
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+# Compress large cached payloads (long trend series) when zstandard is installed
+try:
+    import zstandard
+
+    _ZSTD_COMPRESSOR = zstandard.ZstdCompressor(level=3)
+    _ZSTD_DECOMPRESSOR = zstandard.ZstdDecompressor()
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Payloads above this size are stored zstd-compressed behind a 1-byte marker;
+# JSON never starts with that byte, so plain payloads read back unchanged
+_COMPRESS_MIN_BYTES = 1024
+_ZSTD_MAGIC = b"\x01"
+
+
+def _encode(data: Any) -> bytes:
+    """Serialize a payload for Redis, compressing it when large."""
+    payload = _dumps(data)
+    if isinstance(payload, str):
+        payload = payload.encode()
+    if ZSTD_AVAILABLE and len(payload) > _COMPRESS_MIN_BYTES:
+        return _ZSTD_MAGIC + _ZSTD_COMPRESSOR.compress(payload)
+    return payload
+
+
+def _decode(cached: bytes) -> Any:
+    """Deserialize a payload written by _encode()."""
+    if cached[:1] == _ZSTD_MAGIC:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("zstd-compressed cache entry but zstandard is not installed")
+        cached = _ZSTD_DECOMPRESSOR.decompress(cached[1:])
+    return _loads(cached)
+
+
+_redis_client = None
+_redis_client_lock = threading.Lock()
+
 
 def get_redis_client():
     """
-    Get Redis client instance.
+    Get the shared Redis client instance.
+    
+    The client (and its connection pool) is created once per process from
+    the Redis URL configured for Channels, then reused. If creation fails,
+    the next call tries again.
     
     Returns:
         Optional[redis.Redis]: Redis client or None if not available
     """
+    global _redis_client
+    
     if not REDIS_AVAILABLE:
         return None
     
-    try:
-        from django.conf import settings
-        from channels_redis.core import connection
-        
-        # Use the same Redis connection as Channels
-        # This reuses the connection pool configured in CHANNEL_LAYERS
-        return connection.get_connection()
-    except Exception as e:
-        logger.warning(f"Failed to get Redis client: {e}")
-        return None
+    if _redis_client is not None:
+        return _redis_client
+    
+    with _redis_client_lock:
+        if _redis_client is None:
+            try:
+                # Use the same Redis server as Channels
+                redis_url = settings.CHANNEL_LAYERS['default']['CONFIG']['hosts'][0]
+                _redis_client = redis.Redis.from_url(redis_url)
+            except Exception as e:
+                logger.warning(f"Failed to get Redis client: {e}")
+                return None
+    
+    return _redis_client
 
 
-def get_cached_scorecard(cache_key: str) -> Optional[Dict[str, Any]]:
+def _cache_kind(cache_key: str) -> str:
+    """Metric label for a cache key: its first segment (scorecard, trends, analytics...)."""
+    return cache_key.split(':', 1)[0]
+
+
+def _record_read(cache_key: str, hit: bool, started: float):
+    """Record a cache read outcome and latency."""
+    if not METRICS_AVAILABLE:
+        return
+    kind = _cache_kind(cache_key)
+    _CACHE_GET_SECONDS.labels(kind).observe(time.perf_counter() - started)
+    (_CACHE_HITS if hit else _CACHE_MISSES).labels(kind).inc()
+
+
+def _record_error(cache_key: str):
+    """Record a failed cache operation."""
+    if METRICS_AVAILABLE:
+        _CACHE_ERRORS.labels(_cache_kind(cache_key)).inc()
+
+
+def cache_get(cache_key: str) -> Optional[Dict[str, Any]]:
     """
-    Get cached scorecard data.
+    Get cached analytics data.
     
     Args:
         cache_key: Cache key string
@@ -52,19 +147,54 @@ def get_cached_scorecard(cache_key: str) -> Optional[Dict[str, Any]]:
     if not redis_client:
         return None
     
+    started = time.perf_counter()
     try:
         cached = redis_client.get(cache_key)
+        _record_read(cache_key, bool(cached), started)
         if cached:
-            return json.loads(cached)
+            return _decode(cached)
     except Exception as e:
+        _record_error(cache_key)
         logger.warning(f"Error reading from cache: {e}")
     
     return None
 
 
-def cache_scorecard(cache_key: str, data: Dict[str, Any], ttl: int = 300):
+def get_cached_bulk(cache_keys: List[str]) -> Dict[str, Any]:
+    """
+    Get several cached entries in one Redis round trip (MGET).
+    
+    Args:
+        cache_keys: Cache key strings
+        
+    Returns:
+        dict: Cached data keyed by cache key; misses are omitted
+    """
+    redis_client = get_redis_client()
+    if not redis_client or not cache_keys:
+        return {}
+    
+    started = time.perf_counter()
+    try:
+        values = redis_client.mget(cache_keys)
+        for key, cached in zip(cache_keys, values):
+            _record_read(key, bool(cached), started)
+        return {
+            key: _decode(cached)
+            for key, cached in zip(cache_keys, values)
+            if cached
+        }
+    except Exception as e:
+        for key in cache_keys:
+            _record_error(key)
+        logger.warning(f"Error reading from cache: {e}")
+    
+    return {}
+
+
+def cache_set(cache_key: str, data: Dict[str, Any], ttl: int = 300):
     """
-    Cache scorecard data.
+    Cache analytics data.
     
     Args:
         cache_key: Cache key string
@@ -76,65 +206,77 @@ def cache_scorecard(cache_key: str, data: Dict[str, Any], ttl: int = 300):
         return
     
     try:
-        redis_client.setex(
-            cache_key,
-            ttl,
-            json.dumps(data)
-        )
+        redis_client.setex(cache_key, ttl, _encode(data))
     except Exception as e:
+        _record_error(cache_key)
         logger.warning(f"Error writing to cache: {e}")
 
 
-def get_cached_trends(cache_key: str) -> Optional[Dict[str, Any]]:
+# Per-day (total_calls, accepted_calls) hashes for completed days. They are
+# not under the analytics: prefix so call writes (which only touch today)
+# do not wipe them.
+_DAY_COUNTS_PREFIX = "agg:day:"
+_DAY_COUNTS_TTL = 24 * 3600  # seconds
+
+
+def get_cached_day_counts(days: List[str]) -> Dict[str, Tuple[int, int]]:
     """
-    Get cached trends data.
+    Get per-day call and accepted counts for several days in one round trip.
     
     Args:
-        cache_key: Cache key string
+        days: Day strings ("YYYY-MM-DD")
         
     Returns:
-        Optional[dict]: Cached data or None if not found
+        dict: {day: (total_calls, accepted_calls)} for the days that are cached
     """
     redis_client = get_redis_client()
-    if not redis_client:
-        return None
+    if not redis_client or not days:
+        return {}
     
     try:
-        cached = redis_client.get(cache_key)
-        if cached:
-            return json.loads(cached)
+        pipe = redis_client.pipeline(transaction=False)
+        for day in days:
+            pipe.hmget(f"{_DAY_COUNTS_PREFIX}{day}", "total_calls", "accepted_calls")
+        return {
+            day: (int(total), int(accepted))
+            for day, (total, accepted) in zip(days, pipe.execute())
+            if total is not None and accepted is not None
+        }
     except Exception as e:
-        logger.warning(f"Error reading from cache: {e}")
+        logger.warning(f"Error reading day counts from cache: {e}")
     
-    return None
+    return {}
 
 
-def cache_trends(cache_key: str, data: Dict[str, Any], ttl: int = 300):
+def cache_day_counts(day_counts: Dict[str, Tuple[int, int]], ttl: int = _DAY_COUNTS_TTL):
     """
-    Cache trends data.
+    Store per-day call and accepted counts as Redis hashes.
     
     Args:
-        cache_key: Cache key string
-        data: Data to cache
-        ttl: Time to live in seconds (default: 5 minutes)
+        day_counts: {day: (total_calls, accepted_calls)} for completed days
+        ttl: Time to live in seconds (default: 1 day)
     """
     redis_client = get_redis_client()
-    if not redis_client:
+    if not redis_client or not day_counts:
         return
     
     try:
-        redis_client.setex(
-            cache_key,
-            ttl,
-            json.dumps(data)
-        )
+        pipe = redis_client.pipeline(transaction=False)
+        for day, (total, accepted) in day_counts.items():
+            key = f"{_DAY_COUNTS_PREFIX}{day}"
+            pipe.hset(key, mapping={"total_calls": total, "accepted_calls": accepted})
+            pipe.expire(key, ttl)
+        pipe.execute()
     except Exception as e:
-        logger.warning(f"Error writing to cache: {e}")
+        logger.warning(f"Error writing day counts to cache: {e}")
 
 
-def get_cached_health(cache_key: str) -> Optional[Dict[str, Any]]:
+def get_cached_scorecard(cache_key: str) -> Optional[Dict[str, Any]]:
     """
-    Get cached health metrics.
+    Get cached scorecard data.
+    
+    Scorecards are stored as a Redis hash with one serialized value per
+    top-level field.
     
     Args:
         cache_key: Cache key string
@@ -146,19 +288,57 @@ def get_cached_health(cache_key: str) -> Optional[Dict[str, Any]]:
     if not redis_client:
         return None
     
+    started = time.perf_counter()
     try:
-        cached = redis_client.get(cache_key)
+        cached = redis_client.hgetall(cache_key)
+        _record_read(cache_key, bool(cached), started)
         if cached:
-            return json.loads(cached)
+            return {field.decode(): _loads(value) for field, value in cached.items()}
     except Exception as e:
+        _record_error(cache_key)
         logger.warning(f"Error reading from cache: {e}")
     
     return None
 
 
-def cache_health(cache_key: str, data: Dict[str, Any], ttl: int = 300):
+def get_scorecard_fields(cache_key: str, fields: List[str]) -> Optional[Dict[str, Any]]:
     """
-    Cache health metrics.
+    Get selected top-level fields of a cached scorecard (HMGET).
+    
+    Args:
+        cache_key: Cache key string
+        fields: Top-level scorecard fields to read
+        
+    Returns:
+        Optional[dict]: The requested fields, or None if the scorecard is not
+        cached. Fields the scorecard does not have are omitted.
+    """
+    redis_client = get_redis_client()
+    if not redis_client or not fields:
+        return None
+    
+    started = time.perf_counter()
+    try:
+        # Every cached scorecard has a period field, so a missing one means a miss
+        values = redis_client.hmget(cache_key, ["period", *fields])
+        _record_read(cache_key, values[0] is not None, started)
+        if values[0] is None:
+            return None
+        return {
+            field: _loads(value)
+            for field, value in zip(fields, values[1:])
+            if value is not None
+        }
+    except Exception as e:
+        _record_error(cache_key)
+        logger.warning(f"Error reading from cache: {e}")
+    
+    return None
+
+
+def cache_scorecard(cache_key: str, data: Dict[str, Any], ttl: int = 300):
+    """
+    Cache scorecard data as a Redis hash of serialized top-level fields.
     
     Args:
         cache_key: Cache key string
@@ -170,11 +350,125 @@ def cache_health(cache_key: str, data: Dict[str, Any], ttl: int = 300):
         return
     
     try:
-        redis_client.setex(
-            cache_key,
-            ttl,
-            json.dumps(data)
-        )
+        pipe = redis_client.pipeline()
+        pipe.delete(cache_key)
+        pipe.hset(cache_key, mapping={field: _dumps(value) for field, value in data.items()})
+        pipe.expire(cache_key, ttl)
+        pipe.execute()
     except Exception as e:
+        _record_error(cache_key)
         logger.warning(f"Error writing to cache: {e}")
 
+
+def get_cached_trends(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Get cached trends data."""
+    return cache_get(cache_key)
+
+
+def cache_trends(cache_key: str, data: Dict[str, Any], ttl: int = 300):
+    """Cache trends data."""
+    cache_set(cache_key, data, ttl)
+
+
+def get_cached_health(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Get cached health metrics."""
+    return cache_get(cache_key)
+
+
+def cache_health(cache_key: str, data: Dict[str, Any], ttl: int = 300):
+    """Cache health metrics."""
+    cache_set(cache_key, data, ttl)
+
+
+# Key prefixes written by the analytics services and views
+_ANALYTICS_KEY_PATTERNS = ("analytics:*", "scorecard:*", "trends:*")
+
+# Counter bumped by invalidate_analytics(). It is outside the prefixes above
+# so it is never wiped and only grows; a reset could repeat an old version
+_DATA_VERSION_KEY = "agg:version"
+
+# ETags also roll over on this window, so a session written outside this
+# service (which does not bump the version) is picked up within the same hour
+# that bounds cached aggregates
+_ETAG_WINDOW = 3600  # seconds
+
+
+def get_data_version() -> Optional[int]:
+    """
+    Get the analytics data version bumped by invalidate_analytics().
+    
+    Returns:
+        Optional[int]: Current version, or None if Redis is not available
+    """
+    redis_client = get_redis_client()
+    if not redis_client:
+        return None
+    
+    try:
+        return int(redis_client.get(_DATA_VERSION_KEY) or 0)
+    except Exception as e:
+        logger.warning(f"Error reading analytics version: {e}")
+        return None
+
+
+def get_analytics_etag(*parts: Any) -> Optional[str]:
+    """
+    Build an ETag for an analytics response from the current data version.
+    
+    The version changes whenever invalidate_analytics() runs, which every
+    session write analytics depend on does: the upload and SPY call inserts,
+    the Twilio call duration and recording updates, the transcribed update
+    and the AI analysis writes. The ETag also changes every _ETAG_WINDOW
+    seconds, so clients polling an unchanged dashboard get 304 Not Modified
+    and writes made elsewhere are not hidden for longer than the cache TTL.
+    
+    Args:
+        parts: Values identifying the response (cache key, period bounds...)
+        
+    Returns:
+        Optional[str]: Quoted ETag, or None if Redis is not available
+    """
+    version = get_data_version()
+    if version is None:
+        return None
+    
+    window = int(time.time() // _ETAG_WINDOW)
+    digest = hashlib.sha1(":".join(map(str, (version, window, *parts))).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def invalidate_analytics() -> int:
+    """
+    Drop all cached analytics so dashboards reflect newly written calls.
+    
+    Also bumps the data version, which changes every analytics ETag.
+    
+    Analytics are not tenant-scoped yet, so any session change affects
+    every user's cached results. Keys are found with SCAN and removed with
+    UNLINK, neither of which blocks Redis.
+    
+    Returns:
+        int: Number of keys removed
+    """
+    redis_client = get_redis_client()
+    if not redis_client:
+        return 0
+    
+    removed = 0
+    try:
+        # Bump the version first so ETags change even if deleting keys fails
+        redis_client.incr(_DATA_VERSION_KEY)
+        for pattern in _ANALYTICS_KEY_PATTERNS:
+            batch = []
+            for key in redis_client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    removed += redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                removed += redis_client.unlink(*batch)
+        logger.info(f"Invalidated {removed} analytics cache keys")
+    except Exception as e:
+        logger.warning(f"Error invalidating analytics cache: {e}")
+    
+    return removed
@@ -2,71 +2,132 @@
 Raw SQL queries and database access for analytics.
 Uses Supabase Postgres for data retrieval.
 """
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any, Tuple
 from datetime import datetime, timedelta, timezone
-from collections import defaultdict
+from collections import Counter, defaultdict
+from itertools import chain
 from apps.core.services.supabase import get_supabase_client
-from apps.ai.constants import SCORECARD_THRESHOLDS
+from apps.ai.constants import ScorecardCategory
+from apps.analytics.services.cache import cache_get, cache_set, get_cached_day_counts, cache_day_counts
 from django.conf import settings
+import functools
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 
-def fetch_all_records(query, page_size: int = 1000) -> List[Dict[str, Any]]:
+@functools.cache
+def _supabase_config():
+    """Supabase settings (sessions table name etc.), resolved once per process."""
+    return settings.APP_SETTINGS.supabase
+
+
+def iter_records(query_factory: Callable[[], Any], order_col: str = "id", page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """
+    Yield all records from a Supabase query page by page (keyset pagination).
+
+    Supabase has a default limit of 1000 records per query. Pages are
+    ordered by order_col and each starts after the last value seen, so
+    every page is an index seek rather than an OFFSET that re-skips all
+    earlier rows. Only one page is held in memory at a time. order_col
+    must be unique (ties at a page boundary would be skipped) and included
+    in the selected columns.
+
+    Args:
+        query_factory: Returns a fresh query with filters applied (no order
+            or limit); PostgREST builders mutate in place, so one is built per page
+        order_col: Unique column to paginate on (default: "id")
+        page_size: Number of records to fetch per page (default: 1000)
+
+    Yields:
+        dict: One record at a time
     """
-    Fetch all records from a Supabase query using pagination.
+    fetched = 0
+    last_seen = None
+
+    while True:
+        try:
+            query = query_factory()
+            if last_seen is not None:
+                query = query.gt(order_col, last_seen)
+            page_data = query.order(order_col).limit(page_size).execute().data
+        except Exception as e:
+            logger.error(f"Error fetching page after {last_seen}: {e}")
+            # Stop with what we have so far rather than failing completely
+            break
+
+        logger.debug(f"Fetched {len(page_data)} records (after {last_seen})")
+        fetched += len(page_data)
+        yield from page_data
+
+        # If we got fewer records than page_size, we've reached the end
+        if len(page_data) < page_size:
+            break
+
+        last_seen = page_data[-1][order_col]
+
+    logger.info(f"Fetched total of {fetched} records using pagination")
+
 
-    Supabase has a default limit of 1000 records per query. This helper
-    fetches data in chunks until all records are retrieved.
+def fetch_all_records(query_factory: Callable[[], Any], order_col: str = "id", page_size: int = 1000) -> List[Dict[str, Any]]:
+    """
+    Fetch all records from a Supabase query into a list (see iter_records).
 
     Args:
-        query: Supabase query object (already built with filters)
+        query_factory: Returns a fresh query with filters applied
+        order_col: Unique column to paginate on (default: "id")
         page_size: Number of records to fetch per page (default: 1000)
 
     Returns:
         list: All records combined from all pages
     """
-    all_data = []
-    offset = 0
+    return list(iter_records(query_factory, order_col, page_size))
 
-    while True:
-        # Calculate range for this page (inclusive on both ends)
-        start = offset
-        end = offset + page_size - 1
 
-        try:
-            # Clone the query and add range for this page
-            # Note: We need to reconstruct the query with range
-            # Since Supabase query objects aren't easily cloneable,
-            # we'll fetch and check if we got less than page_size
-            paginated_query = query.range(start, end)
-            response = paginated_query.execute()
+@functools.lru_cache(maxsize=256)
+def _to_query_str(dt: datetime) -> str:
+    """
+    Format a datetime as the UTC ISO string used in Supabase filters and RPC params.
 
-            page_data = response.data
-            all_data.extend(page_data)
+    Memoized: get_period_dates() returns the same datetimes to every query of
+    a request, so each bound is only formatted once.
 
-            logger.debug(f"Fetched {len(page_data)} records (offset {offset})")
+    Args:
+        dt: Timezone-aware datetime
 
-            # If we got fewer records than page_size, we've reached the end
-            if len(page_data) < page_size:
-                break
+    Returns:
+        str: e.g. "2025-12-13T21:10:36Z" (no microseconds)
+    """
+    return dt.astimezone(timezone.utc).replace(tzinfo=None).isoformat(timespec='seconds') + 'Z'
 
-            offset += page_size
 
-        except Exception as e:
-            logger.error(f"Error fetching page at offset {offset}: {e}")
-            # Return what we have so far rather than failing completely
-            break
+def _parse_iso(value: str) -> datetime:
+    """
+    Parse an ISO 8601 date or datetime string as a timezone-aware datetime.
+
+    datetime.fromisoformat accepts a trailing "Z" and date-only strings
+    (midnight) on Python 3.11+; naive values are taken as UTC.
 
-    logger.info(f"Fetched total of {len(all_data)} records using pagination")
-    return all_data
+    Args:
+        value: ISO string, e.g. "2025-12-13", "2025-12-13T21:10:36Z"
+
+    Returns:
+        datetime: Parsed datetime (UTC if no offset was given)
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
 
 
 def get_period_dates(period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Tuple[datetime, datetime]:
     """
     Get start and end dates for a given period.
     
+    Results are memoized per minute: every metric query of a request
+    resolves the same period, and preset periods only depend on today's date.
+    
     Args:
         period: Time period string (e.g., "last_7_days", "last_30_days", "custom")
         start_date_str: Optional ISO date string for custom range
@@ -75,30 +136,21 @@ def get_period_dates(period: str, start_date_str: Optional[str] = None, end_date
     Returns:
         tuple: (start_date, end_date) as timezone-aware datetime objects (UTC)
     """
+    return _period_dates(period, start_date_str, end_date_str, int(time.time() // 60))
+
+
+@functools.lru_cache(maxsize=256)
+def _period_dates(period: str, start_date_str: Optional[str], end_date_str: Optional[str], minute: int) -> Tuple[datetime, datetime]:
+    """Compute get_period_dates(); minute only keys the cache."""
     # Handle custom date range - check if dates are provided (even if period isn't exactly "custom")
     if start_date_str and end_date_str:
         try:
-            # Handle both date-only strings (YYYY-MM-DD) and full ISO strings
-            # Date inputs send YYYY-MM-DD format
-            if len(start_date_str) == 10 and start_date_str.count('-') == 2:
-                # Date-only format: set to start of day
-                start_date = datetime.strptime(start_date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-            else:
-                # Full ISO string format
-                start_date = datetime.fromisoformat(start_date_str.replace("Z", "+00:00"))
-                if start_date.tzinfo is None:
-                    start_date = start_date.replace(tzinfo=timezone.utc)
-            
-            if len(end_date_str) == 10 and end_date_str.count('-') == 2:
-                # Date-only format: set to end of day (23:59:59)
-                end_date = datetime.strptime(end_date_str, "%Y-%m-%d").replace(
-                    hour=23, minute=59, second=59, tzinfo=timezone.utc
-                )
-            else:
-                # Full ISO string format
-                end_date = datetime.fromisoformat(end_date_str.replace("Z", "+00:00"))
-                if end_date.tzinfo is None:
-                    end_date = end_date.replace(tzinfo=timezone.utc)
+            # Date inputs send YYYY-MM-DD (start of day); full ISO strings are used as-is
+            start_date = _parse_iso(start_date_str)
+            end_date = _parse_iso(end_date_str)
+            if len(end_date_str) == 10:
+                # Date-only end date: include the whole day (up to 23:59:59)
+                end_date = end_date.replace(hour=23, minute=59, second=59)
             
             logger.info(f"Parsed custom date range (period={period}): {start_date} to {end_date}")
             return start_date, end_date
@@ -130,7 +182,30 @@ def get_period_dates(period: str, start_date_str: Optional[str] = None, end_date
     return start_date, end_date
 
 
-def get_sessions_count(user_id: Optional[str], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> int:
+@functools.lru_cache(maxsize=256)
+def _previous_period(start_date: datetime, end_date: datetime) -> Tuple[datetime, datetime]:
+    """
+    Get the comparison period for period-over-period deltas.
+
+    Args:
+        start_date: Current period start
+        end_date: Current period end
+
+    Returns:
+        tuple: (prev_start, prev_end), same length in days, ending where current starts
+    """
+    period_length = (end_date - start_date).days
+    prev_end = start_date - timedelta(seconds=1)
+    prev_start = prev_end - timedelta(days=period_length)
+    return prev_start, prev_end
+
+
+# Ranges longer than this many days get a planner estimate instead of an exact count
+_EXACT_COUNT_MAX_DAYS = 30
+_EXACT_COUNT_CACHE_TTL = 60  # seconds
+
+
+def get_sessions_count(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> int:
     """
     Get total number of sessions in the given period.
     
@@ -148,14 +223,36 @@ def get_sessions_count(user_id: Optional[str], period: str, start_date_str: Opti
     
     try:
         start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
-        config = settings.APP_SETTINGS.supabase
+        config = _supabase_config()
         
         # Format dates as ISO strings for Supabase (without microseconds)
-        query_start_str = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        query_end_str = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        query_start_str = _to_query_str(start_date)
+        query_end_str = _to_query_str(end_date)
         
         logger.info(f"Fetching sessions count for period {period}: {query_start_str} to {query_end_str}")
 
+        # Wide ranges use the planner's row estimate instead of an exact count
+        if (end_date - start_date).days > _EXACT_COUNT_MAX_DAYS:
+            try:
+                response = supabase.rpc(
+                    'estimate_sessions_count',
+                    {
+                        'start_date_param': query_start_str,
+                        'end_date_param': query_end_str
+                    }
+                ).execute()
+                count = int(response.data or 0)
+                logger.info(f"Estimated {count} sessions for period {period} (via RPC)")
+                return count
+            except Exception as rpc_error:
+                logger.warning(f"RPC failed, falling back to exact count: {rpc_error}")
+
+        # Under analytics: so invalidate_analytics() drops it when sessions change
+        cache_key = f"analytics:sessions_count:{query_start_str}:{query_end_str}"
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return cached["count"]
+
         # Use count="exact" with head=True to get count without fetching data
         # This avoids the 1000 record limit since we're only getting the count
         query = (
@@ -170,16 +267,17 @@ def get_sessions_count(user_id: Optional[str], period: str, start_date_str: Opti
         # This requires understanding the tenant/user relationship in your schema
 
         response = query.execute()
-        # Use count attribute directly - it should be accurate with count="exact"
-        count = response.count if hasattr(response, 'count') and response.count is not None else 0
+        # APIResponse always has .count; it is None only if no count was requested
+        count = response.count or 0
         logger.info(f"Found {count} sessions for period {period}")
+        cache_set(cache_key, {"count": count}, ttl=_EXACT_COUNT_CACHE_TTL)
         return count
     except Exception as e:
         logger.error(f"Error fetching sessions count: {e}", exc_info=True)
         return 0
 
 
-def get_acceptance_rate(user_id: Optional[str], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> float:
+def get_acceptance_rate(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> float:
     """
     Calculate acceptance rate (percentage of accepted calls).
     
@@ -197,26 +295,44 @@ def get_acceptance_rate(user_id: Optional[str], period: str, start_date_str: Opt
     
     try:
         start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
-        config = settings.APP_SETTINGS.supabase
+        config = _supabase_config()
         
         # Format dates as ISO strings for Supabase (without microseconds)
-        query_start_str = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        query_end_str = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        query_start_str = _to_query_str(start_date)
+        query_end_str = _to_query_str(end_date)
         
         logger.info(f"Fetching acceptance rate for period {period}: {query_start_str} to {query_end_str}")
 
+        # Count accepted calls in the database instead of fetching metadata
+        try:
+            response = supabase.rpc(
+                'get_acceptance_counts',
+                {
+                    'start_date_param': query_start_str,
+                    'end_date_param': query_end_str
+                }
+            ).execute()
+            row = response.data[0] if response.data else {}
+            total = int(row.get('total_calls') or 0)
+            accepted = int(row.get('accepted_calls') or 0)
+            logger.info(f"Acceptance counts: {accepted}/{total} (via RPC)")
+            return accepted / total if total > 0 else 0.0
+        except Exception as rpc_error:
+            logger.warning(f"RPC failed, falling back to pagination: {rpc_error}")
+
         # Fetch sessions with metadata that might contain acceptance status
         # This is a placeholder - adjust based on your actual schema
-        query = (
-            supabase.table(config.sessions_table)
-            .select("id, metadata")
-            .gte("call_start_time", query_start_str)
-            .lte("call_start_time", query_end_str)
-            .eq("IS_FALSE", False)  # Only include valid calls (is_false=FALSE)
-        )
+        def build_query():
+            return (
+                supabase.table(config.sessions_table)
+                .select("id, metadata")
+                .gte("call_start_time", query_start_str)
+                .lte("call_start_time", query_end_str)
+                .eq("IS_FALSE", False)  # Only include valid calls (is_false=FALSE)
+            )
 
         # Use pagination to fetch all records
-        all_sessions = fetch_all_records(query)
+        all_sessions = fetch_all_records(build_query)
         logger.info(f"Found {len(all_sessions)} sessions for acceptance rate calculation")
 
         if not all_sessions:
@@ -240,7 +356,7 @@ def get_acceptance_rate(user_id: Optional[str], period: str, start_date_str: Opt
         return 0.0
 
 
-def get_avg_handle_time(user_id: Optional[str], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> float:
+def get_avg_handle_time(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> float:
     """
     Calculate average handle time in seconds using database aggregation (RPC).
 
@@ -262,11 +378,19 @@ def get_avg_handle_time(user_id: Optional[str], period: str, start_date_str: Opt
         start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
 
         # Format dates as ISO strings for Supabase (without microseconds)
-        query_start_str = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        query_end_str = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        query_start_str = _to_query_str(start_date)
+        query_end_str = _to_query_str(end_date)
 
         logger.info(f"Fetching avg handle time for period {period}: {query_start_str} to {query_end_str}")
 
+        try:
+            totals = _get_period_totals(supabase, start_date, end_date)
+            avg_duration = totals["sum_handle_time"] / totals["n_handle_time"] if totals["n_handle_time"] else 0.0
+            logger.info(f"Average handle time: {avg_duration:.2f} seconds (via daily rollup)")
+            return avg_duration
+        except Exception as rollup_error:
+            logger.warning(f"Daily rollup totals failed, falling back to RPC: {rollup_error}")
+
         # Use database-level aggregation via RPC for better performance
         response = supabase.rpc(
             'get_avg_call_duration',
@@ -285,7 +409,7 @@ def get_avg_handle_time(user_id: Optional[str], period: str, start_date_str: Opt
         return 0.0
 
 
-def get_total_call_time(user_id: Optional[str], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> int:
+def get_total_call_time(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> int:
     """
     Calculate total call time (sum of all call durations) in seconds using database aggregation (RPC).
 
@@ -307,11 +431,18 @@ def get_total_call_time(user_id: Optional[str], period: str, start_date_str: Opt
         start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
 
         # Format dates as ISO strings for Supabase (without microseconds)
-        query_start_str = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        query_end_str = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        query_start_str = _to_query_str(start_date)
+        query_end_str = _to_query_str(end_date)
 
         logger.info(f"Fetching total call time for period {period}: {query_start_str} to {query_end_str}")
 
+        try:
+            total_seconds = _get_period_totals(supabase, start_date, end_date)["sum_handle_time"]
+            logger.info(f"Total call time: {total_seconds} seconds ({total_seconds / 3600:.2f} hours) (via daily rollup)")
+            return total_seconds
+        except Exception as rollup_error:
+            logger.warning(f"Daily rollup totals failed, falling back to RPC: {rollup_error}")
+
         # Use database-level aggregation via RPC for better performance
         response = supabase.rpc(
             'get_total_call_duration',
@@ -330,17 +461,113 @@ def get_total_call_time(user_id: Optional[str], period: str, start_date_str: Opt
         return 0
 
 
-def get_daily_metrics(user_id: Optional[str], period: str, metric: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, List]:
+def _aggregates_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the scorecard aggregates from a get_scorecard_aggregates-style row.
+
+    Args:
+        row: total_calls, accepted_calls, avg_duration, total_duration,
+             prev_total_calls and prev_accepted_calls
+
+    Returns:
+        dict: Same shape as get_scorecard_aggregates()
+    """
+    total_calls = int(row.get('total_calls') or 0)
+    accepted_calls = int(row.get('accepted_calls') or 0)
+    prev_total_calls = int(row.get('prev_total_calls') or 0)
+    prev_accepted_calls = int(row.get('prev_accepted_calls') or 0)
+
+    acceptance_rate = accepted_calls / total_calls if total_calls > 0 else 0.0
+    if total_calls > 0 and prev_total_calls > 0:
+        conversion_delta = round(acceptance_rate - prev_accepted_calls / prev_total_calls, 4)
+    else:
+        # No meaningful comparison without calls in both periods
+        conversion_delta = 0.0
+
+    return {
+        "total_calls": total_calls,
+        "acceptance_rate": acceptance_rate,
+        "avg_handle_time_sec": float(row.get('avg_duration') or 0.0),
+        "total_call_time_sec": int(row.get('total_duration') or 0),
+        "conversion_delta": conversion_delta,
+    }
+
+
+def get_scorecard_aggregates(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get total calls, acceptance rate, handle times and conversion delta in one query.
+
+    Calls the get_scorecard_aggregates RPC (apps/analytics/sql/), which computes
+    the current period's values and the previous period's call/accepted counts
+    in a single scan. The conversion delta is the change in acceptance rate
+    versus the previous period of the same length. Falls back to the
+    individual metric queries (with a zero delta) if the RPC is unavailable.
+
+    Args:
+        user_id: User ID for tenant filtering (optional)
+        period: Time period string
+        start_date_str: Optional ISO date string for custom range
+        end_date_str: Optional ISO date string for custom range
+
+    Returns:
+        dict: {"total_calls": int, "acceptance_rate": float,
+               "avg_handle_time_sec": float, "total_call_time_sec": int,
+               "conversion_delta": float}
+    """
+    supabase = get_supabase_client()
+    if not supabase:
+        logger.warning("Supabase client not available")
+        return {"total_calls": 0, "acceptance_rate": 0.0, "avg_handle_time_sec": 0.0, "total_call_time_sec": 0, "conversion_delta": 0.0}
+
+    try:
+        start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
+
+        query_start_str = _to_query_str(start_date)
+        query_end_str = _to_query_str(end_date)
+
+        logger.info(f"Fetching scorecard aggregates for period {period}: {query_start_str} to {query_end_str}")
+
+        prev_start, prev_end = _previous_period(start_date, end_date)
+
+        response = supabase.rpc(
+            'get_scorecard_aggregates',
+            {
+                'start_date_param': query_start_str,
+                'end_date_param': query_end_str,
+                'prev_start_date_param': _to_query_str(prev_start),
+                'prev_end_date_param': _to_query_str(prev_end)
+            }
+        ).execute()
+
+        aggregates = _aggregates_from_row(response.data[0] if response.data else {})
+        logger.info(f"Scorecard aggregates: {aggregates} (via RPC)")
+        return aggregates
+    except Exception as rpc_error:
+        logger.warning(f"RPC failed, falling back to individual metric queries: {rpc_error}")
+        return {
+            "total_calls": get_sessions_count(user_id, period, start_date_str, end_date_str),
+            "acceptance_rate": get_acceptance_rate(user_id, period, start_date_str, end_date_str),
+            "avg_handle_time_sec": get_avg_handle_time(user_id, period, start_date_str, end_date_str),
+            "total_call_time_sec": get_total_call_time(user_id, period, start_date_str, end_date_str),
+            "conversion_delta": 0.0,
+        }
+
+
+def get_daily_metrics(user_id: Optional[Any], period: str, metric: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, Any]:
     """
     Get daily aggregated metrics for trend visualization.
     
+    Per-day counts are grouped in the database (one row per day); the
+    get_daily_call_counts RPC serves total_calls and get_daily_acceptance_rate
+    serves acceptance_rate.
+    
     Args:
         user_id: User ID for tenant filtering (optional)
         period: Time period string
         metric: Metric name (e.g., "acceptance_rate", "total_calls")
         
     Returns:
-        dict: {"x": [dates], "y": [values]}
+        dict: {"x": [dates], "y": [values], "granularity": str}
     """
     supabase = get_supabase_client()
     if not supabase:
@@ -349,160 +576,413 @@ def get_daily_metrics(user_id: Optional[str], period: str, metric: str, start_da
     
     try:
         start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
-        config = settings.APP_SETTINGS.supabase
+        config = _supabase_config()
         
         # Format dates as ISO strings for Supabase (without microseconds)
-        query_start_str = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        query_end_str = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        query_start_str = _to_query_str(start_date)
+        query_end_str = _to_query_str(end_date)
         
         logger.info(f"Fetching daily metrics for {metric}, period {period}: {query_start_str} to {query_end_str}")
 
-        # Use database-level aggregation for total_calls (much faster)
-        if metric == "total_calls":
-            try:
-                # Use RPC for efficient daily call counts
+        rpc_params = {
+            'start_date_param': query_start_str,
+            'end_date_param': query_end_str
+        }
+
+        # Per-day (call_count, accepted_count), grouped in the database
+        day_counts = {}
+        try:
+            if metric == "acceptance_rate":
+                # Rows come back already bucketed (one per chart point)
                 response = supabase.rpc(
-                    'get_daily_call_counts',
-                    {
-                        'start_date_param': query_start_str,
-                        'end_date_param': query_end_str
-                    }
+                    'get_daily_acceptance_rate',
+                    {**rpc_params, 'bucket_param': _trend_granularity(start_date, end_date)}
                 ).execute()
-
-                # Convert RPC response to the expected format
-                date_groups = {}
                 for row in (response.data or []):
-                    date_str = row['call_date']
-                    date_groups[date_str] = [None] * row['call_count']  # Dummy list for count
-
-                logger.info(f"Fetched {len(date_groups)} days of data via RPC for {metric}")
-
-                # Process the date_groups as before (below)
-                all_sessions = []  # Not needed for RPC path
-            except Exception as rpc_error:
-                logger.warning(f"RPC failed, falling back to pagination: {rpc_error}")
-                # Fallback to pagination if RPC fails
-                query = (
+                    day_counts[row['call_date']] = (int(row['total_count']), int(row['accepted_count']))
+            else:
+                response = supabase.rpc('get_daily_call_counts', rpc_params).execute()
+                for row in (response.data or []):
+                    day_counts[row['call_date']] = (int(row['call_count']), 0)
+            logger.info(f"Fetched {len(day_counts)} days of data via RPC for {metric}")
+        except Exception as rpc_error:
+            logger.warning(f"RPC failed, falling back to pagination: {rpc_error}")
+            # Use call_start_time for accurate date aggregation (not created_at which is ingestion time).
+            # Select only the columns used below: metadata is only read for acceptance
+            columns = "id, call_start_time, metadata" if metric == "acceptance_rate" else "id, call_start_time"
+
+            def build_query():
+                return (
                     supabase.table(config.sessions_table)
-                    .select("call_start_time, metadata")
+                    .select(columns)
                     .gte("call_start_time", query_start_str)
                     .lte("call_start_time", query_end_str)
-                    .eq("IS_FALSE", False)
+                    .eq("IS_FALSE", False)  # Only include valid calls (IS_FALSE=FALSE)
                 )
-                all_sessions = fetch_all_records(query)
-                logger.info(f"Fetched {len(all_sessions)} sessions with pagination for {metric}")
-                date_groups = None  # Will be built below
-        else:
-            # For acceptance_rate and other metrics, use pagination
-            # Fetch all data in the date range in a single query with pagination
-            # Use call_start_time for accurate date aggregation (not created_at which is ingestion time)
-            query = (
-                supabase.table(config.sessions_table)
-                .select("call_start_time, metadata")
-                .gte("call_start_time", query_start_str)
-                .lte("call_start_time", query_end_str)
-                .eq("IS_FALSE", False)  # Only include valid calls (IS_FALSE=FALSE)
-            )
 
-            # Use pagination to fetch all records (fixes 1000 record cap)
-            all_sessions = fetch_all_records(query)
+            all_sessions = fetch_all_records(build_query)
             logger.info(f"Fetched {len(all_sessions)} sessions with pagination for {metric}")
-            date_groups = None  # Will be built below
-        
-        # FIX 7: Downsample for long periods to reduce payload size
-        # For periods > 30 days, use weekly aggregation instead of daily
-        days_in_period = (end_date - start_date).days
-        aggregation_interval = 7 if days_in_period > 30 else 1  # Weekly if > 30 days, daily otherwise
-
-        # Build date_groups if not already built (from RPC)
-        if date_groups is None:
-            # Simple approach: Group sessions by date string (YYYY-MM-DD)
-            # This avoids all timezone complexity
-            date_groups = defaultdict(list)
 
+            # Group by the date part (YYYY-MM-DD) of the ISO timestamp
+            date_groups = defaultdict(lambda: [0, 0])
             for session in all_sessions:
                 call_start_time_str = session.get("call_start_time")
                 if not call_start_time_str:
                     continue
-
-                try:
-                    # Extract just the date part (YYYY-MM-DD) from ISO string
-                    # Supabase returns: "2025-12-13T21:10:36.123+00:00" or "2025-12-13T21:10:36Z"
-                    date_part = call_start_time_str.split("T")[0]  # Get "2025-12-13"
-                    date_groups[date_part].append(session)
-                except Exception as e:
-                    logger.warning(f"Error extracting date from {call_start_time_str}: {e}")
-                    continue
-
-            logger.info(f"Grouped {len(all_sessions)} sessions into {len(date_groups)} date groups")
-        
-        # Generate date range and aggregate values
-        dates = []
-        values = []
-        
-        # Generate all dates in the range
-        # Normalize start_date to beginning of day
-        current = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # Normalize end_date to beginning of its day for the loop
-        # (we'll include all sessions from that day since we query up to end_date which includes the full day)
-        end_date_only = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        while current <= end_date_only:
-            date_str = current.strftime("%Y-%m-%d")
-
-            # For weekly aggregation, only include dates at interval boundaries
-            if aggregation_interval == 1 or (current - start_date.replace(hour=0, minute=0, second=0, microsecond=0)).days % aggregation_interval == 0:
-                # For weekly aggregation, sum up all sessions from the entire week
-                if aggregation_interval == 7:
-                    # Get sessions for the entire week (7 days starting from current date)
-                    week_sessions = []
-                    for day_offset in range(7):
-                        week_date = current + timedelta(days=day_offset)
-                        if week_date > end_date_only:
-                            break
-                        week_date_str = week_date.strftime("%Y-%m-%d")
-                        week_sessions.extend(date_groups.get(week_date_str, []))
-                    sessions_for_date = week_sessions
-                else:
-                    # For daily aggregation, just get sessions for this specific date
-                    sessions_for_date = date_groups.get(date_str, [])
-
-                if metric == "total_calls":
-                    values.append(len(sessions_for_date))
-                elif metric == "acceptance_rate":
-                    accepted = sum(
-                        1 for s in sessions_for_date
-                        if isinstance(s.get("metadata", {}), dict) and
-                        (s.get("metadata", {}).get("accepted") or
-                         s.get("metadata", {}).get("status") == "accepted")
-                    )
-                    rate = accepted / len(sessions_for_date) if sessions_for_date else 0.0
-                    values.append(rate)
-                else:
-                    values.append(0)
-
-                dates.append(date_str)
-
-            current += timedelta(days=1)
-        
-        # FIX 7: Limit to max 60 points to keep payloads small
-        if len(dates) > 60:
-            # Downsample by taking every Nth point
-            step = len(dates) // 60
-            dates = dates[::step]
-            values = values[::step]
-        
-        logger.info(f"Returning {len(dates)} data points for {metric}, total values sum: {sum(values)}")
-        if len(dates) == 0:
+                counts = date_groups[call_start_time_str[:10]]
+                counts[0] += 1
+                metadata = session.get("metadata")
+                if isinstance(metadata, dict) and (metadata.get("accepted") or metadata.get("status") == "accepted"):
+                    counts[1] += 1
+            day_counts = {day: tuple(counts) for day, counts in date_groups.items()}
+
+        series = _bucket_daily_counts(start_date, end_date, day_counts, [metric])[metric]
+        logger.info(f"Returning {len(series['x'])} data points for {metric}")
+        if not series["x"]:
             logger.warning(f"No dates generated for {metric} - check date range logic")
-        return {"x": dates, "y": values}
+        return series
     except Exception as e:
         logger.error(f"Error fetching daily metrics: {e}", exc_info=True)
         return {"x": [], "y": []}
 
 
-def get_call_intents(user_id: Optional[str], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
+def _trend_granularity(start_date: datetime, end_date: datetime) -> str:
+    """
+    Pick the coarsest bucket size that still gives a readable trend.
+
+    Args:
+        start_date: Period start
+        end_date: Period end
+
+    Returns:
+        str: "day" for up to 31 days, "week" for up to 180 days, else "month"
+    """
+    days_in_period = (end_date - start_date).days
+    if days_in_period <= 31:
+        return "day"
+    if days_in_period <= 180:
+        return "week"
+    return "month"
+
+
+def _bucket_daily_counts(start_date: datetime, end_date: datetime, day_counts: Dict[str, Tuple[int, int]], metrics: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Turn per-day (call_count, accepted_count) pairs into chart series.
+
+    Buckets are daily, weekly (7-day windows from the period start) or
+    calendar-monthly depending on the period length; each point is labeled
+    with the first date of its bucket inside the period. Counts already
+    bucketed by an RPC (keyed by that label) pass through unchanged.
+
+    Args:
+        start_date: Period start
+        end_date: Period end
+        day_counts: Mapping of "YYYY-MM-DD" to (call_count, accepted_count)
+        metrics: Metric names to build series for
+
+    Returns:
+        dict: {metric: {"x": [dates], "y": [values], "granularity": str}}
+    """
+    granularity = _trend_granularity(start_date, end_date)
+
+    first_day = start_date.date()
+    days = [first_day + timedelta(days=offset) for offset in range((end_date.date() - first_day).days + 1)]
+    labels = [day.isoformat() for day in days]
+    daily = [day_counts.get(label, (0, 0)) for label in labels]
+
+    # Index of the first day of each bucket
+    if granularity == "day":
+        bucket_starts = list(range(len(days)))
+    elif granularity == "week":
+        bucket_starts = list(range(0, len(days), 7))
+    else:
+        bucket_starts = [index for index, day in enumerate(days) if index == 0 or day.day == 1]
+
+    dates = [labels[index] for index in bucket_starts]
+    if granularity == "day":
+        bucket_counts = daily
+    else:
+        bucket_counts = []
+        for bucket_start, bucket_end in zip(bucket_starts, bucket_starts[1:] + [len(days)]):
+            window = daily[bucket_start:bucket_end]
+            bucket_counts.append((sum(calls for calls, _ in window), sum(accepted for _, accepted in window)))
+
+    # Limit to max 60 points to keep payloads small
+    if len(dates) > 60:
+        step = len(dates) // 60
+        dates = dates[::step]
+        bucket_counts = bucket_counts[::step]
+
+    series = {}
+    for metric in metrics:
+        if metric == "total_calls":
+            values = [total for total, _ in bucket_counts]
+        elif metric == "acceptance_rate":
+            values = [accepted / total if total else 0.0 for total, accepted in bucket_counts]
+        else:
+            values = [0] * len(bucket_counts)
+        series[metric] = {"x": list(dates), "y": values, "granularity": granularity}
+    return series
+
+
+# Pre-aggregated per-day metrics (apps/analytics/sql/analytics_daily_rollup.sql)
+_DAILY_ROLLUP_TABLE = "analytics_daily_rollup"
+
+
+def _fetch_rollup_day_counts(supabase, first_day: datetime, last_day: datetime) -> Optional[Dict[str, Tuple[int, int]]]:
+    """
+    Read per-day (call_count, accepted_count) pairs from the daily rollup.
+
+    The refresh writes a row for every day, including days without calls, so
+    a missing row means the range has not been rolled up yet.
+
+    Args:
+        supabase: Supabase client
+        first_day: First day to read (midnight UTC)
+        last_day: Last day to read (midnight UTC)
+
+    Returns:
+        Optional[dict]: Mapping of "YYYY-MM-DD" to counts, or None if the
+        rollup does not fully cover the range
+    """
+    expected_days = (last_day - first_day).days + 1
+    response = (
+        supabase.table(_DAILY_ROLLUP_TABLE)
+        .select("day, total_calls, accepted_calls")
+        .gte("day", first_day.strftime("%Y-%m-%d"))
+        .lte("day", last_day.strftime("%Y-%m-%d"))
+        .limit(expected_days)
+        .execute()
+    )
+    rows = response.data or []
+    if len(rows) < expected_days:
+        logger.info(f"Daily rollup covers {len(rows)}/{expected_days} days, using live query")
+        return None
+    return {
+        row["day"]: (int(row["total_calls"]), int(row["accepted_calls"]))
+        for row in rows
+    }
+
+
+_PERIOD_TOTAL_FIELDS = ("total_calls", "accepted_calls", "sum_handle_time", "n_handle_time")
+
+
+def _get_period_totals(supabase, start_date: datetime, end_date: datetime) -> Dict[str, int]:
+    """
+    Get call, acceptance and handle-time totals for a period.
+
+    Completed days are summed from the daily rollup when it covers them;
+    the remainder (always including today) comes from the
+    get_period_totals RPC.
+
+    Args:
+        supabase: Supabase client
+        start_date: Period start
+        end_date: Period end
+
+    Returns:
+        dict: total_calls, accepted_calls, sum_handle_time (seconds) and
+        n_handle_time (calls with a positive duration)
+    """
+    totals = dict.fromkeys(_PERIOD_TOTAL_FIELDS, 0)
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    live_start = start_date
+
+    if start_date < today and start_date == start_date.replace(hour=0, minute=0, second=0, microsecond=0):
+        last_rolled_day = min(end_date.replace(hour=0, minute=0, second=0, microsecond=0), today - timedelta(days=1))
+        expected_days = (last_rolled_day - start_date).days + 1
+        response = (
+            supabase.table(_DAILY_ROLLUP_TABLE)
+            .select(", ".join(_PERIOD_TOTAL_FIELDS))
+            .gte("day", start_date.strftime("%Y-%m-%d"))
+            .lte("day", last_rolled_day.strftime("%Y-%m-%d"))
+            .limit(expected_days)
+            .execute()
+        )
+        rows = response.data or []
+        if len(rows) == expected_days:
+            for row in rows:
+                for field in _PERIOD_TOTAL_FIELDS:
+                    totals[field] += int(row[field])
+            live_start = last_rolled_day + timedelta(days=1)
+
+    if live_start <= end_date:
+        response = supabase.rpc(
+            'get_period_totals',
+            {
+                'start_date_param': _to_query_str(live_start),
+                'end_date_param': _to_query_str(end_date)
+            }
+        ).execute()
+        row = response.data[0] if response.data else {}
+        for field in _PERIOD_TOTAL_FIELDS:
+            totals[field] += int(row.get(field) or 0)
+
+    return totals
+
+
+def refresh_daily_rollup(days: int = 2) -> int:
+    """
+    Recompute the daily rollup for the last N days (including today).
+
+    Args:
+        days: Number of days to refresh, ending today (UTC)
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    supabase = get_supabase_client()
+    if not supabase:
+        raise RuntimeError("Supabase client not available")
+
+    end_day = datetime.now(timezone.utc).date()
+    start_day = end_day - timedelta(days=max(days, 1) - 1)
+
+    logger.info(f"Refreshing daily rollup from {start_day} to {end_day}")
+    response = supabase.rpc(
+        'refresh_analytics_daily_rollup',
+        {
+            'start_day_param': start_day.isoformat(),
+            'end_day_param': end_day.isoformat()
+        }
+    ).execute()
+
+    rows = int(response.data or 0)
+    logger.info(f"Daily rollup refreshed: {rows} days written")
+    return rows
+
+
+def get_daily_metrics_multi(user_id: Optional[Any], period: str, metrics: List[str], start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Get daily trend series for several metrics from a single query.
+
+    Completed days are read from the analytics_daily_rollup table when it
+    covers the range; the rest (always including today) comes from the
+    get_daily_metrics_multi RPC, which returns per-day call and acceptance
+    counts that every supported metric is derived from. Falls back to one
+    get_daily_metrics call per metric if the RPC is unavailable.
+
+    Args:
+        user_id: User ID for tenant filtering (optional)
+        period: Time period string
+        metrics: Metric names (e.g., ["acceptance_rate", "total_calls"])
+        start_date_str: Optional ISO date string for custom range
+        end_date_str: Optional ISO date string for custom range
+
+    Returns:
+        dict: {metric: {"x": [dates], "y": [values], "granularity": str}}
+    """
+    supabase = get_supabase_client()
+    if not supabase:
+        logger.warning("Supabase client not available")
+        return {metric: {"x": [], "y": []} for metric in metrics}
+
+    try:
+        start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
+
+        query_start_str = _to_query_str(start_date)
+        query_end_str = _to_query_str(end_date)
+
+        logger.info(f"Fetching daily metrics {metrics}, period {period}: {query_start_str} to {query_end_str}")
+
+        # Completed days come from Redis day hashes, then the daily rollup,
+        # when either covers them; today (and anything both are missing) is
+        # computed live
+        day_counts = {}
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        live_start = start_date
+        completed_days = []
+        if start_date < today and start_date == start_date.replace(hour=0, minute=0, second=0, microsecond=0):
+            last_rolled_day = min(end_date.replace(hour=0, minute=0, second=0, microsecond=0), today - timedelta(days=1))
+            completed_days = [
+                (start_date + timedelta(days=offset)).strftime("%Y-%m-%d")
+                for offset in range((last_rolled_day - start_date).days + 1)
+            ]
+            completed_counts = get_cached_day_counts(completed_days)
+            if len(completed_counts) < len(completed_days):
+                try:
+                    completed_counts = _fetch_rollup_day_counts(supabase, start_date, last_rolled_day)
+                except Exception as rollup_error:
+                    logger.warning(f"Daily rollup read failed, using live query: {rollup_error}")
+                    completed_counts = None
+                if completed_counts is not None:
+                    cache_day_counts(completed_counts)
+            if completed_counts is not None:
+                day_counts.update(completed_counts)
+                live_start = last_rolled_day + timedelta(days=1)
+                completed_days = []
+
+        if live_start <= end_date:
+            response = supabase.rpc(
+                'get_daily_metrics_multi',
+                {
+                    'start_date_param': _to_query_str(live_start),
+                    'end_date_param': query_end_str
+                }
+            ).execute()
+
+            for row in (response.data or []):
+                day_counts[row['call_date']] = (int(row['call_count']), int(row['accepted_count']))
+
+            # Fold completed days computed live into Redis for next time
+            if completed_days:
+                cache_day_counts({day: day_counts.get(day, (0, 0)) for day in completed_days})
+        logger.info(f"Fetched {len(day_counts)} days of data for {metrics}")
+
+        return _bucket_daily_counts(start_date, end_date, day_counts, metrics)
+    except Exception as rpc_error:
+        logger.warning(f"RPC failed, falling back to per-metric daily queries: {rpc_error}")
+        return {
+            metric: get_daily_metrics(user_id, period, metric, start_date_str, end_date_str)
+            for metric in metrics
+        }
+
+
+def _fetch_value_counts(supabase, rpc_name: str, query_start_str: str, query_end_str: str, user_id: Optional[Any] = None) -> Dict[str, int]:
+    """
+    Call one of the jsonb array counting RPCs (apps/analytics/sql/get_value_counts.sql).
+
+    Args:
+        supabase: Supabase client
+        rpc_name: get_intent_counts, get_action_code_counts or get_result_code_counts
+        query_start_str: Period start (ISO string)
+        query_end_str: Period end (ISO string)
+        user_id: Only count this user's sessions (optional)
+
+    Returns:
+        dict: {value: count}
+    """
+    params = {
+        'start_date_param': query_start_str,
+        'end_date_param': query_end_str
+    }
+    if user_id:
+        params['user_id_param'] = str(user_id)
+    response = supabase.rpc(rpc_name, params).execute()
+    return {row['value']: int(row['count']) for row in (response.data or [])}
+
+
+def _count_list_values(records: Iterable[Dict[str, Any]], column: str, key: str) -> Dict[str, int]:
+    """
+    Count the string values of a list stored under a JSON column's key.
+
+    Args:
+        records: Rows fetched from Supabase (any iterable, e.g. iter_records())
+        column: JSON column name (e.g. "call_summary")
+        key: Key holding the list (e.g. "action_codes")
+
+    Returns:
+        dict: {value: count}; rows without a dict column or list value are skipped
+    """
+    values = chain.from_iterable(
+        record[column][key]
+        for record in records
+        if isinstance(record.get(column), dict) and isinstance(record[column].get(key), list)
+    )
+    return dict(Counter(value for value in values if isinstance(value, str)))
+
+
+def get_call_intents(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
     """
     Get aggregated call intents count.
     
@@ -520,37 +1000,33 @@ def get_call_intents(user_id: Optional[str], period: str, start_date_str: Option
     
     try:
         start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
-        config = settings.APP_SETTINGS.supabase
+        config = _supabase_config()
         
         # Format dates as ISO strings for Supabase (without microseconds)
-        query_start_str = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        query_end_str = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        query_start_str = _to_query_str(start_date)
+        query_end_str = _to_query_str(end_date)
         
         logger.info(f"Fetching call intents for period {period}: {query_start_str} to {query_end_str}")
 
-        query = (
-            supabase.table(config.sessions_table)
-            .select("call_scorecard")
-            .gte("call_start_time", query_start_str)
-            .lte("call_start_time", query_end_str)
-            .eq("IS_FALSE", False)  # Only include valid calls (IS_FALSE=FALSE)
-            .not_.is_("call_scorecard", "null")
-        )
-
-        # Use pagination to fetch all records
-        all_sessions = fetch_all_records(query)
-        logger.info(f"Found {len(all_sessions)} sessions with scorecard data for intents")
-
-        intent_counts = {}
+        try:
+            intent_counts = _fetch_value_counts(supabase, 'get_intent_counts', query_start_str, query_end_str)
+            logger.info(f"Found {len(intent_counts)} unique intents (via RPC)")
+            return intent_counts
+        except Exception as rpc_error:
+            logger.warning(f"RPC failed, falling back to pagination: {rpc_error}")
+
+        def build_query():
+            return (
+                supabase.table(config.sessions_table)
+                .select("id, call_scorecard")
+                .gte("call_start_time", query_start_str)
+                .lte("call_start_time", query_end_str)
+                .eq("IS_FALSE", False)  # Only include valid calls (IS_FALSE=FALSE)
+                .not_.is_("call_scorecard", "null")
+            )
 
-        for session in all_sessions:
-            scorecard_data = session.get("call_scorecard", {})
-            if isinstance(scorecard_data, dict):
-                detected_intents = scorecard_data.get("detected_intents", [])
-                if isinstance(detected_intents, list):
-                    for intent in detected_intents:
-                        if isinstance(intent, str):
-                            intent_counts[intent] = intent_counts.get(intent, 0) + 1
+        # Stream pages through the counter instead of holding every row
+        intent_counts = _count_list_values(iter_records(build_query), "call_scorecard", "detected_intents")
 
         return intent_counts
     except Exception as e:
@@ -558,7 +1034,7 @@ def get_call_intents(user_id: Optional[str], period: str, start_date_str: Option
         return {}
 
 
-def get_action_codes(user_id: Optional[str], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
+def get_action_codes(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
     """
     Get aggregated action codes count from call summaries.
 
@@ -580,40 +1056,37 @@ def get_action_codes(user_id: Optional[str], period: str, start_date_str: Option
             return {}
 
         start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
-        query_start_str = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        query_end_str = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        query_start_str = _to_query_str(start_date)
+        query_end_str = _to_query_str(end_date)
 
         logger.info(f"Fetching action codes for period {period}")
 
-        # Query sessions with call_summary data
-        config = settings.APP_SETTINGS.supabase
-        query = (
-            supabase.table(config.sessions_table)
-            .select("call_summary")
-            .gte("call_start_time", query_start_str)
-            .lte("call_start_time", query_end_str)
-            .eq("IS_FALSE", False)  # Only include valid calls (IS_FALSE=FALSE)
-            .not_.is_("call_summary", "null")
-        )
-
-        # Add user filtering if provided
-        if user_id:
-            query = query.eq("user_id", user_id)
+        try:
+            action_counts = _fetch_value_counts(supabase, 'get_action_code_counts', query_start_str, query_end_str, user_id)
+            logger.info(f"Found {len(action_counts)} unique action codes (via RPC)")
+            return action_counts
+        except Exception as rpc_error:
+            logger.warning(f"RPC failed, falling back to pagination: {rpc_error}")
 
-        # Use pagination to fetch all records
-        all_sessions = fetch_all_records(query)
-        logger.info(f"Found {len(all_sessions)} sessions with call_summary data for action codes")
+        # Query sessions with call_summary data
+        config = _supabase_config()
+        def build_query():
+            query = (
+                supabase.table(config.sessions_table)
+                .select("id, call_summary")
+                .gte("call_start_time", query_start_str)
+                .lte("call_start_time", query_end_str)
+                .eq("IS_FALSE", False)  # Only include valid calls (IS_FALSE=FALSE)
+                .not_.is_("call_summary", "null")
+            )
 
-        action_counts = {}
+            # Add user filtering if provided
+            if user_id:
+                query = query.eq("user_id", user_id)
+            return query
 
-        for session in all_sessions:
-            summary_data = session.get("call_summary", {})
-            if isinstance(summary_data, dict):
-                action_codes = summary_data.get("action_codes", [])
-                if isinstance(action_codes, list):
-                    for code in action_codes:
-                        if isinstance(code, str):
-                            action_counts[code] = action_counts.get(code, 0) + 1
+        # Stream pages through the counter instead of holding every row
+        action_counts = _count_list_values(iter_records(build_query), "call_summary", "action_codes")
 
         logger.info(f"Found {len(action_counts)} unique action codes")
         return action_counts
@@ -622,7 +1095,7 @@ def get_action_codes(user_id: Optional[str], period: str, start_date_str: Option
         return {}
 
 
-def get_result_codes(user_id: Optional[str], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
+def get_result_codes(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
     """
     Get aggregated result/outcome codes count from call summaries.
 
@@ -644,40 +1117,37 @@ def get_result_codes(user_id: Optional[str], period: str, start_date_str: Option
             return {}
 
         start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
-        query_start_str = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        query_end_str = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        query_start_str = _to_query_str(start_date)
+        query_end_str = _to_query_str(end_date)
 
         logger.info(f"Fetching result codes for period {period}")
 
-        # Query sessions with call_summary data
-        config = settings.APP_SETTINGS.supabase
-        query = (
-            supabase.table(config.sessions_table)
-            .select("call_summary")
-            .gte("call_start_time", query_start_str)
-            .lte("call_start_time", query_end_str)
-            .eq("IS_FALSE", False)  # Only include valid calls (IS_FALSE=FALSE)
-            .not_.is_("call_summary", "null")
-        )
-
-        # Add user filtering if provided
-        if user_id:
-            query = query.eq("user_id", user_id)
+        try:
+            result_counts = _fetch_value_counts(supabase, 'get_result_code_counts', query_start_str, query_end_str, user_id)
+            logger.info(f"Found {len(result_counts)} unique result codes (via RPC)")
+            return result_counts
+        except Exception as rpc_error:
+            logger.warning(f"RPC failed, falling back to pagination: {rpc_error}")
 
-        # Use pagination to fetch all records
-        all_sessions = fetch_all_records(query)
-        logger.info(f"Found {len(all_sessions)} sessions with call_summary data for result codes")
+        # Query sessions with call_summary data
+        config = _supabase_config()
+        def build_query():
+            query = (
+                supabase.table(config.sessions_table)
+                .select("id, call_summary")
+                .gte("call_start_time", query_start_str)
+                .lte("call_start_time", query_end_str)
+                .eq("IS_FALSE", False)  # Only include valid calls (IS_FALSE=FALSE)
+                .not_.is_("call_summary", "null")
+            )
 
-        result_counts = {}
+            # Add user filtering if provided
+            if user_id:
+                query = query.eq("user_id", user_id)
+            return query
 
-        for session in all_sessions:
-            summary_data = session.get("call_summary", {})
-            if isinstance(summary_data, dict):
-                result_codes = summary_data.get("result_codes", [])
-                if isinstance(result_codes, list):
-                    for code in result_codes:
-                        if isinstance(code, str):
-                            result_counts[code] = result_counts.get(code, 0) + 1
+        # Stream pages through the counter instead of holding every row
+        result_counts = _count_list_values(iter_records(build_query), "call_summary", "result_codes")
 
         logger.info(f"Found {len(result_counts)} unique result codes")
         return result_counts
@@ -686,7 +1156,7 @@ def get_result_codes(user_id: Optional[str], period: str, start_date_str: Option
         return {}
 
 
-def get_sentiment_distribution(user_id: Optional[str], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
+def get_sentiment_distribution(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
     """
     Get sentiment distribution with shift tracking.
 
@@ -721,54 +1191,48 @@ def get_sentiment_distribution(user_id: Optional[str], period: str, start_date_s
 
     try:
         start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
-        config = settings.APP_SETTINGS.supabase
+        config = _supabase_config()
 
         # Format dates as ISO strings for Supabase (without microseconds)
-        query_start_str = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        query_end_str = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        query_start_str = _to_query_str(start_date)
+        query_end_str = _to_query_str(end_date)
 
         logger.info(f"Fetching sentiment distribution for period {period}: {query_start_str} to {query_end_str}")
 
-        query = (
-            supabase.table(config.sessions_table)
-            .select("call_scorecard")
-            .gte("call_start_time", query_start_str)
-            .lte("call_start_time", query_end_str)
-            .eq("IS_FALSE", False)  # Only include valid calls (IS_FALSE=FALSE)
-            .not_.is_("call_scorecard", "null")
-        )
-
-        # Use pagination to fetch all records
-        all_sessions = fetch_all_records(query)
-        logger.info(f"Found {len(all_sessions)} sessions with scorecard data for sentiment")
-
-        # Initialize counters for all 7 categories
-        sentiment_counts = {
-            "positive": 0,
-            "neutral": 0,
-            "negative": 0,
-            "negative_to_positive": 0,
-            "neutral_to_positive": 0,
-            "neutral_to_negative": 0,
-            "positive_to_negative": 0,
-        }
+        try:
+            response = supabase.rpc(
+                'get_sentiment_shift',
+                {
+                    'start_date_param': query_start_str,
+                    'end_date_param': query_end_str
+                }
+            ).execute()
+            shift_counts = {row['category']: int(row['count']) for row in (response.data or [])}
+            sentiment_counts = {category: shift_counts.get(category, 0) for category in _SENTIMENT_CATEGORIES}
+            logger.info(f"Sentiment distribution: {sentiment_counts} (via RPC)")
+            return sentiment_counts
+        except Exception as rpc_error:
+            logger.warning(f"RPC failed, falling back to pagination: {rpc_error}")
+
+        def build_query():
+            return (
+                supabase.table(config.sessions_table)
+                # Project the one scorecard field instead of the whole JSONB
+                .select("id, cat:call_scorecard->>sentiment_shift_category")
+                .gte("call_start_time", query_start_str)
+                .lte("call_start_time", query_end_str)
+                .eq("IS_FALSE", False)  # Only include valid calls (IS_FALSE=FALSE)
+                .not_.is_("call_scorecard", "null")
+            )
 
-        for session in all_sessions:
-            scorecard_data = session.get("call_scorecard", {})
-            if isinstance(scorecard_data, dict):
-                # Get the pre-calculated sentiment shift category
-                sentiment_category = scorecard_data.get("sentiment_shift_category")
-
-                # If the field exists and is valid, increment the counter
-                if sentiment_category and sentiment_category in sentiment_counts:
-                    sentiment_counts[sentiment_category] += 1
-                # Handle legacy data without sentiment_shift_category
-                # (fallback to old logic for backward compatibility)
-                elif not sentiment_category:
-                    logger.debug(f"Session missing sentiment_shift_category, using legacy calculation")
-                    # This is legacy data - optionally you could recalculate here
-                    # For now, we'll just skip it or count as neutral
-                    sentiment_counts["neutral"] += 1
+        # Stream pages through the counter instead of holding every row.
+        # Scorecards carry a pre-calculated sentiment_shift_category; legacy
+        # scorecards without one count as neutral, unknown values are ignored
+        shift_counts = Counter(
+            row.get("cat") or "neutral"
+            for row in iter_records(build_query)
+        )
+        sentiment_counts = {category: shift_counts.get(category, 0) for category in _SENTIMENT_CATEGORIES}
 
         logger.info(f"Sentiment distribution: {sentiment_counts}")
         return sentiment_counts
@@ -785,80 +1249,143 @@ def get_sentiment_distribution(user_id: Optional[str], period: str, start_date_s
         }
 
 
-def get_compliance_scorecard_summary(user_id: Optional[str], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
+_SENTIMENT_CATEGORIES = (
+    "positive",
+    "neutral",
+    "negative",
+    "negative_to_positive",
+    "neutral_to_positive",
+    "neutral_to_negative",
+    "positive_to_negative",
+)
+
+
+def get_analytics_bundle(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
-    Get compliance scorecard pass/fail summary using database aggregation (RPC).
+    Get every scorecard dashboard metric from a single RPC.
 
-    Works for both:
-    - New calls: Uses stored 'pass' field in categories.compliance
-    - Existing calls: Calculates pass/fail from score using threshold (>= 80)
+    Calls get_analytics_bundle (apps/analytics/sql/), which computes the
+    headline aggregates, per-day counts, intents, action/result codes and
+    sentiment distribution over one filtered scan and returns them as one
+    JSON object.
 
     Args:
         user_id: User ID for tenant filtering (optional)
         period: Time period string
+        start_date_str: Optional ISO date string for custom range
+        end_date_str: Optional ISO date string for custom range
 
     Returns:
-        dict: {"pass_count": int, "fail_count": int, "total_count": int}
+        Optional[dict]: {"aggregates", "acceptance_trend", "call_intents",
+        "action_codes", "result_codes", "sentiment_dist"} in the shapes of
+        the per-metric functions, or None if the RPC is unavailable
     """
     supabase = get_supabase_client()
     if not supabase:
         logger.warning("Supabase client not available")
-        return {"pass_count": 0, "fail_count": 0, "total_count": 0}
+        return None
 
     try:
         start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
+        prev_start, prev_end = _previous_period(start_date, end_date)
 
-        query_start_str = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        query_end_str = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        logger.info(f"Fetching analytics bundle for period {period}: {start_date} to {end_date}")
 
-        logger.info(f"Fetching compliance scorecard summary for period {period}")
+        params = {
+            'start_date_param': _to_query_str(start_date),
+            'end_date_param': _to_query_str(end_date),
+            'prev_start_date_param': _to_query_str(prev_start),
+            'prev_end_date_param': _to_query_str(prev_end)
+        }
+        if user_id:
+            params['user_id_param'] = str(user_id)
+        # Bucket the trend in the database so only the points shown travel the wire
+        params['bucket_param'] = _trend_granularity(start_date, end_date)
+        bundle = supabase.rpc('get_analytics_bundle', params).execute().data or {}
+
+        day_counts = {
+            row['call_date']: (int(row['call_count']), int(row['accepted_count']))
+            for row in (bundle.get('daily') or [])
+        }
+        sentiment = bundle.get('sentiment') or {}
 
-        # Use database-level aggregation via RPC for better performance
-        threshold = SCORECARD_THRESHOLDS['compliance']
-        logger.info(f"DEBUG: Using compliance threshold = {threshold}")
-        response = supabase.rpc(
-            'get_compliance_summary',
-            {
-                'start_date_param': query_start_str,
-                'end_date_param': query_end_str,
-                'threshold_param': threshold
-            }
-        ).execute()
+        return {
+            "aggregates": _aggregates_from_row(bundle),
+            "acceptance_trend": _bucket_daily_counts(start_date, end_date, day_counts, ["acceptance_rate"])["acceptance_rate"],
+            "call_intents": bundle.get('call_intents') or {},
+            "action_codes": bundle.get('action_codes') or {},
+            "result_codes": bundle.get('result_codes') or {},
+            "sentiment_dist": {category: int(sentiment.get(category, 0)) for category in _SENTIMENT_CATEGORIES},
+        }
+    except Exception as rpc_error:
+        logger.warning(f"RPC failed, falling back to individual metric queries: {rpc_error}")
+        return None
 
-        # RPC returns a single row with pass_count, fail_count, total_count
-        if response.data and len(response.data) > 0:
-            result = response.data[0]
-            pass_count = int(result['pass_count'])
-            fail_count = int(result['fail_count'])
-            total_count = int(result['total_count'])
-        else:
-            pass_count = 0
-            fail_count = 0
-            total_count = 0
 
-        logger.info(f"Compliance summary: {pass_count} passes, {fail_count} fails out of {total_count} total (via RPC)")
+# Summary counts for windows that ended before yesterday no longer change
+# except through invalidate_analytics(); open windows are kept briefly
+_OPEN_SUMMARY_CACHE_TTL = 60  # seconds
+_CLOSED_SUMMARY_CACHE_TTL = 7 * 24 * 3600  # seconds
 
-        return {
-            "pass_count": pass_count,
-            "fail_count": fail_count,
-            "total_count": total_count,
+
+def _fetch_scorecard_summary(supabase, rpc_name: str, start_date: datetime, end_date: datetime, threshold: int) -> Dict[str, int]:
+    """
+    Call a per-category scorecard summary RPC, caching the counts in Redis.
+
+    Args:
+        supabase: Supabase client
+        rpc_name: get_compliance_summary, get_servicing_summary, ...
+        start_date: Period start
+        end_date: Period end
+        threshold: Pass threshold for the category
+
+    Returns:
+        dict: {"pass_count": int, "fail_count": int, "total_count": int}
+    """
+    query_start_str = _to_query_str(start_date)
+    query_end_str = _to_query_str(end_date)
+
+    # analytics:* keys are dropped by invalidate_analytics() when calls change
+    cache_key = f"analytics:summary:{rpc_name}:{query_start_str}:{query_end_str}:{threshold}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    response = supabase.rpc(
+        rpc_name,
+        {
+            'start_date_param': query_start_str,
+            'end_date_param': query_end_str,
+            'threshold_param': threshold
         }
-    except Exception as e:
-        logger.error(f"Error fetching compliance scorecard summary: {e}", exc_info=True)
-        return {"pass_count": 0, "fail_count": 0, "total_count": 0}
+    ).execute()
 
+    # RPC returns a single row with pass_count, fail_count, total_count
+    row = response.data[0] if response.data else {}
+    summary = {
+        "pass_count": int(row.get('pass_count') or 0),
+        "fail_count": int(row.get('fail_count') or 0),
+        "total_count": int(row.get('total_count') or 0),
+    }
 
-def get_servicing_scorecard_summary(user_id: Optional[str], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
+    is_closed = end_date < datetime.now(timezone.utc) - timedelta(days=1)
+    cache_set(cache_key, summary, ttl=_CLOSED_SUMMARY_CACHE_TTL if is_closed else _OPEN_SUMMARY_CACHE_TTL)
+    return summary
+
+
+def _get_scorecard_summary(category: ScorecardCategory, rpc_name: str, user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
     """
-    Get servicing scorecard pass/fail summary using database aggregation (RPC).
+    Get a scorecard category's pass/fail summary using database aggregation (RPC).
 
-    Works for both:
-    - New calls: Uses stored 'pass' field in categories.servicing
-    - Existing calls: Calculates pass/fail from score using threshold (>= 70)
+    Shared body of the get_<category>_scorecard_summary functions.
 
     Args:
+        category: Scorecard category (supplies the pass threshold)
+        rpc_name: Name of the category's summary RPC
         user_id: User ID for tenant filtering (optional)
         period: Time period string
+        start_date_str: Optional ISO date string for custom range
+        end_date_str: Optional ISO date string for custom range
 
     Returns:
         dict: {"pass_count": int, "fail_count": int, "total_count": int}
@@ -871,52 +1398,30 @@ def get_servicing_scorecard_summary(user_id: Optional[str], period: str, start_d
     try:
         start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
 
-        query_start_str = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        query_end_str = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-
-        logger.info(f"Fetching servicing scorecard summary for period {period}")
+        logger.info(f"Fetching {category.value} scorecard summary for period {period}")
 
         # Use database-level aggregation via RPC for better performance
-        threshold = SCORECARD_THRESHOLDS['servicing']
-        response = supabase.rpc(
-            'get_servicing_summary',
-            {
-                'start_date_param': query_start_str,
-                'end_date_param': query_end_str,
-                'threshold_param': threshold
-            }
-        ).execute()
-
-        # RPC returns a single row with pass_count, fail_count, total_count
-        if response.data and len(response.data) > 0:
-            result = response.data[0]
-            pass_count = int(result['pass_count'])
-            fail_count = int(result['fail_count'])
-            total_count = int(result['total_count'])
-        else:
-            pass_count = 0
-            fail_count = 0
-            total_count = 0
+        summary = _fetch_scorecard_summary(supabase, rpc_name, start_date, end_date, category.threshold)
 
-        logger.info(f"Servicing summary: {pass_count} passes, {fail_count} fails out of {total_count} total (via RPC)")
+        logger.info(f"{category.value} summary: {summary['pass_count']} passes, {summary['fail_count']} fails out of {summary['total_count']} total (via RPC)")
 
         return {
-            "pass_count": pass_count,
-            "fail_count": fail_count,
-            "total_count": total_count,
+            "pass_count": summary["pass_count"],
+            "fail_count": summary["fail_count"],
+            "total_count": summary["total_count"],
         }
     except Exception as e:
-        logger.error(f"Error fetching servicing scorecard summary: {e}", exc_info=True)
+        logger.error(f"Error fetching {category.value} scorecard summary: {e}", exc_info=True)
         return {"pass_count": 0, "fail_count": 0, "total_count": 0}
 
 
-def get_collections_scorecard_summary(user_id: Optional[str], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
+def get_compliance_scorecard_summary(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
     """
-    Get collections scorecard pass/fail summary using database aggregation (RPC).
+    Get compliance scorecard pass/fail summary using database aggregation (RPC).
 
     Works for both:
-    - New calls: Uses stored 'pass' field in categories.collections
-    - Existing calls: Calculates pass/fail from score using threshold (>= 75)
+    - New calls: Uses stored 'pass' field in categories.compliance
+    - Existing calls: Calculates pass/fail from score using the category pass threshold (SCORECARD_THRESHOLDS, currently >= 40)
 
     Args:
         user_id: User ID for tenant filtering (optional)
@@ -925,54 +1430,46 @@ def get_collections_scorecard_summary(user_id: Optional[str], period: str, start
     Returns:
         dict: {"pass_count": int, "fail_count": int, "total_count": int}
     """
-    supabase = get_supabase_client()
-    if not supabase:
-        logger.warning("Supabase client not available")
-        return {"pass_count": 0, "fail_count": 0, "total_count": 0}
+    return _get_scorecard_summary(ScorecardCategory.COMPLIANCE, 'get_compliance_summary', user_id, period, start_date_str, end_date_str)
 
-    try:
-        start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
 
-        query_start_str = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        query_end_str = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+def get_servicing_scorecard_summary(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
+    """
+    Get servicing scorecard pass/fail summary using database aggregation (RPC).
 
-        logger.info(f"Fetching collections scorecard summary for period {period}")
+    Works for both:
+    - New calls: Uses stored 'pass' field in categories.servicing
+    - Existing calls: Calculates pass/fail from score using the category pass threshold (SCORECARD_THRESHOLDS, currently >= 40)
 
-        # Use database-level aggregation via RPC for better performance
-        threshold = SCORECARD_THRESHOLDS['collections']
-        response = supabase.rpc(
-            'get_collections_summary',
-            {
-                'start_date_param': query_start_str,
-                'end_date_param': query_end_str,
-                'threshold_param': threshold
-            }
-        ).execute()
+    Args:
+        user_id: User ID for tenant filtering (optional)
+        period: Time period string
 
-        # RPC returns a single row with pass_count, fail_count, total_count
-        if response.data and len(response.data) > 0:
-            result = response.data[0]
-            pass_count = int(result['pass_count'])
-            fail_count = int(result['fail_count'])
-            total_count = int(result['total_count'])
-        else:
-            pass_count = 0
-            fail_count = 0
-            total_count = 0
+    Returns:
+        dict: {"pass_count": int, "fail_count": int, "total_count": int}
+    """
+    return _get_scorecard_summary(ScorecardCategory.SERVICING, 'get_servicing_summary', user_id, period, start_date_str, end_date_str)
 
-        logger.info(f"Collections summary: {pass_count} passes, {fail_count} fails out of {total_count} total (via RPC)")
 
-        return {
-            "pass_count": pass_count,
-            "fail_count": fail_count,
-            "total_count": total_count,
-        }
-    except Exception as e:
-        logger.error(f"Error fetching collections scorecard summary: {e}", exc_info=True)
-        return {"pass_count": 0, "fail_count": 0, "total_count": 0}
+def get_collections_scorecard_summary(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
+    """
+    Get collections scorecard pass/fail summary using database aggregation (RPC).
+
+    Works for both:
+    - New calls: Uses stored 'pass' field in categories.collections
+    - Existing calls: Calculates pass/fail from score using the category pass threshold (SCORECARD_THRESHOLDS, currently >= 40)
 
+    Args:
+        user_id: User ID for tenant filtering (optional)
+        period: Time period string
 
-def get_legal_scorecard_summary(user_id: Optional[str], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
+    Returns:
+        dict: {"pass_count": int, "fail_count": int, "total_count": int}
+    """
+    return _get_scorecard_summary(ScorecardCategory.COLLECTIONS, 'get_collections_summary', user_id, period, start_date_str, end_date_str)
+
+
+def get_legal_scorecard_summary(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, int]:
     """
     Get legal scorecard pass/fail summary using database aggregation (RPC).
 
@@ -989,110 +1486,144 @@ def get_legal_scorecard_summary(user_id: Optional[str], period: str, start_date_
     Returns:
         dict: {"pass_count": int, "fail_count": int, "total_count": int}
     """
+    return _get_scorecard_summary(ScorecardCategory.LEGAL, 'get_legal_summary', user_id, period, start_date_str, end_date_str)
+
+
+# Per-category summary functions, used when the combined RPC is unavailable
+_SUMMARY_FUNCS = {
+    ScorecardCategory.COMPLIANCE: get_compliance_scorecard_summary,
+    ScorecardCategory.SERVICING: get_servicing_scorecard_summary,
+    ScorecardCategory.COLLECTIONS: get_collections_scorecard_summary,
+    ScorecardCategory.LEGAL: get_legal_scorecard_summary,
+}
+
+
+def get_scorecard_summary_with_delta(category: ScorecardCategory, user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get a scorecard pass/fail summary and its period-over-period delta in one query.
+
+    Calls the get_scorecard_summary_with_delta RPC (apps/analytics/sql/), which
+    aggregates the current and previous period in a single scan. If the RPC is
+    not deployed, falls back to the per-category summary with a zero delta.
+
+    Args:
+        category: Scorecard category
+        user_id: User ID for tenant filtering (optional)
+        period: Time period string
+        start_date_str: Optional ISO date string for custom range
+        end_date_str: Optional ISO date string for custom range
+
+    Returns:
+        dict: {"pass_count": int, "fail_count": int, "total_count": int, "delta_percentage": float}
+    """
     supabase = get_supabase_client()
     if not supabase:
         logger.warning("Supabase client not available")
-        return {"pass_count": 0, "fail_count": 0, "total_count": 0}
+        return {"pass_count": 0, "fail_count": 0, "total_count": 0, "delta_percentage": 0.0}
 
     try:
-        start_date, end_date = get_period_dates(period, start_date_str, end_date_str)
-
-        query_start_str = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        query_end_str = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-
-        logger.info(f"Fetching legal scorecard summary for period {period}")
+        current_start, current_end = get_period_dates(period, start_date_str, end_date_str)
+        prev_start, prev_end = _previous_period(current_start, current_end)
 
-        # Use database-level aggregation via RPC for better performance
-        threshold = SCORECARD_THRESHOLDS['legal']  # 0, not used but included for consistency
         response = supabase.rpc(
-            'get_legal_summary',
+            'get_scorecard_summary_with_delta',
             {
-                'start_date_param': query_start_str,
-                'end_date_param': query_end_str,
-                'threshold_param': threshold
+                'category_param': category.value,
+                'start_date_param': _to_query_str(current_start),
+                'end_date_param': _to_query_str(current_end),
+                'prev_start_date_param': _to_query_str(prev_start),
+                'prev_end_date_param': _to_query_str(prev_end),
+                'threshold_param': category.threshold,
             }
         ).execute()
 
-        # RPC returns a single row with pass_count, fail_count, total_count
-        if response.data and len(response.data) > 0:
-            result = response.data[0]
-            pass_count = int(result['pass_count'])
-            fail_count = int(result['fail_count'])
-            total_count = int(result['total_count'])
-        else:
-            pass_count = 0
-            fail_count = 0
-            total_count = 0
+        row = response.data[0] if response.data else {}
+        summary = _summary_with_delta_from_row(row)
 
-        logger.info(f"Legal summary: {pass_count} passes (no legal risk), {fail_count} fails (legal risk detected) out of {total_count} total (via RPC)")
+        logger.info(f"{category.value} summary: {summary['pass_count']}/{summary['total_count']} passes, delta {summary['delta_percentage']}% (via RPC)")
 
-        return {
-            "pass_count": pass_count,
-            "fail_count": fail_count,
-            "total_count": total_count,
-        }
-    except Exception as e:
-        logger.error(f"Error fetching legal scorecard summary: {e}", exc_info=True)
-        return {"pass_count": 0, "fail_count": 0, "total_count": 0}
+        return summary
+    except Exception as rpc_error:
+        logger.warning(f"RPC failed, falling back to {category.value} summary without delta: {rpc_error}")
+        summary = _SUMMARY_FUNCS[category](user_id, period, start_date_str, end_date_str)
+        return {**summary, "delta_percentage": 0.0}
 
 
-def _calculate_scorecard_delta(current_summary: Dict[str, int], period: str, scorecard_type: str, user_id: Optional[str], start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> float:
+def get_scorecard_summaries_with_delta(user_id: Optional[Any], period: str, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None) -> Optional[Dict[str, Dict[str, Any]]]:
     """
-    Calculate period-over-period delta for scorecard pass counts.
+    Get every scorecard category's summary and delta in one round trip.
+
+    Calls the get_scorecard_summaries_with_delta RPC (apps/analytics/sql/),
+    which reads the current and previous period once for all categories.
 
     Args:
-        current_summary: Current period summary with pass_count, fail_count
-        period: Time period string (used to calculate previous period)
-        scorecard_type: Type of scorecard ('compliance', 'servicing', 'collections')
-        user_id: User ID for tenant filtering
-        start_date_str: Optional start date for custom periods
-        end_date_str: Optional end date for custom periods
+        user_id: User ID for tenant filtering (optional)
+        period: Time period string
+        start_date_str: Optional ISO date string for custom range
+        end_date_str: Optional ISO date string for custom range
 
     Returns:
-        float: Delta percentage (negative = decline, positive = improvement)
+        Optional[dict]: {category: {"pass_count", "fail_count", "total_count",
+        "delta_percentage"}} for every ScorecardCategory, or None if the RPC
+        is unavailable (callers then query the categories individually)
     """
-    if current_summary["total_count"] == 0:
-        return 0.0
+    supabase = get_supabase_client()
+    if not supabase:
+        logger.warning("Supabase client not available")
+        return None
 
     try:
-        # Calculate previous period dates
         current_start, current_end = get_period_dates(period, start_date_str, end_date_str)
-        period_length = (current_end - current_start).days
-
-        # Previous period is same length, ending where current starts
-        prev_end = current_start - timedelta(seconds=1)
-        prev_start = prev_end - timedelta(days=period_length)
-
-        # Format dates for previous period query
-        prev_start_str = prev_start.strftime("%Y-%m-%d")
-        prev_end_str = prev_end.strftime("%Y-%m-%d")
-
-        logger.info(f"Calculating delta: current period {current_start.date()} to {current_end.date()}, previous period {prev_start.date()} to {prev_end.date()}")
+        prev_start, prev_end = _previous_period(current_start, current_end)
 
-        # Get previous period summary
-        if scorecard_type == 'compliance':
-            prev_summary = get_compliance_scorecard_summary(user_id, "custom", prev_start_str, prev_end_str)
-        elif scorecard_type == 'servicing':
-            prev_summary = get_servicing_scorecard_summary(user_id, "custom", prev_start_str, prev_end_str)
-        elif scorecard_type == 'collections':
-            prev_summary = get_collections_scorecard_summary(user_id, "custom", prev_start_str, prev_end_str)
-        else:
-            return 0.0
+        response = supabase.rpc(
+            'get_scorecard_summaries_with_delta',
+            {
+                'start_date_param': _to_query_str(current_start),
+                'end_date_param': _to_query_str(current_end),
+                'prev_start_date_param': _to_query_str(prev_start),
+                'prev_end_date_param': _to_query_str(prev_end),
+                'thresholds_param': {category.value: category.threshold for category in ScorecardCategory},
+            }
+        ).execute()
+    except Exception as rpc_error:
+        logger.warning(f"RPC failed, falling back to per-category summaries: {rpc_error}")
+        return None
 
-        current_pass = current_summary["pass_count"]
-        prev_pass = prev_summary["pass_count"]
+    # Categories without scored calls have no row
+    rows = {row['category']: row for row in (response.data or [])}
+    summaries = {
+        category.value: _summary_with_delta_from_row(rows.get(category.value, {}))
+        for category in ScorecardCategory
+    }
+    logger.info(f"Scorecard summaries for period {period}: {summaries} (via RPC)")
+    return summaries
 
-        if prev_pass == 0:
-            # If no previous data, return 0 (no meaningful comparison)
-            return 0.0
 
-        # Calculate percentage change
-        delta = ((current_pass - prev_pass) / prev_pass) * 100
+def _summary_with_delta_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a summary with delta from a two-period summary RPC row.
 
-        logger.info(f"{scorecard_type} delta: current {current_pass} vs previous {prev_pass} = {delta:.2f}%")
+    Args:
+        row: Row with current_pass, current_fail, current_total and
+            previous_pass (missing values count as zero)
 
-        return round(delta, 2)
-    except Exception as e:
-        logger.error(f"Error calculating scorecard delta: {e}", exc_info=True)
-        return 0.0
+    Returns:
+        dict: {"pass_count": int, "fail_count": int, "total_count": int, "delta_percentage": float}
+    """
+    current_pass = int(row.get('current_pass') or 0)
+    current_total = int(row.get('current_total') or 0)
+    previous_pass = int(row.get('previous_pass') or 0)
 
+    # No previous data (or no current data) means no meaningful comparison
+    if current_total == 0 or previous_pass == 0:
+        delta = 0.0
+    else:
+        delta = round(((current_pass - previous_pass) / previous_pass) * 100, 2)
+
+    return {
+        "pass_count": current_pass,
+        "fail_count": int(row.get('current_fail') or 0),
+        "total_count": current_total,
+        "delta_percentage": delta,
+    }
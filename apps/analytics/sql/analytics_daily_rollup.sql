@@ -0,0 +1,75 @@
+-- Pre-aggregated per-day call metrics for trend charts and period totals.
+--
+-- Trend queries and the handle-time metrics read completed days from
+-- analytics_daily_rollup instead of scanning transcription_sessions (see
+-- apps.analytics.services.queries.get_daily_metrics_multi and
+-- _get_period_totals). The current day is always computed live, so the
+-- rollup only needs to be current up to yesterday.
+--
+-- refresh_analytics_daily_rollup writes one row per day in the range,
+-- including zero rows for days without calls, so readers can tell a
+-- quiet day from a day that has not been rolled up yet. Run it from
+-- `python manage.py refresh_analytics_rollup` (e.g. hourly via Cloud
+-- Scheduler).
+--
+-- Apply with: psql "$DATABASE_URL" -f apps/analytics/sql/analytics_daily_rollup.sql
+
+CREATE TABLE IF NOT EXISTS analytics_daily_rollup (
+    day date PRIMARY KEY,
+    total_calls bigint NOT NULL DEFAULT 0,
+    accepted_calls bigint NOT NULL DEFAULT 0,
+    sum_handle_time bigint NOT NULL DEFAULT 0,
+    n_handle_time bigint NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION refresh_analytics_daily_rollup(
+    start_day_param date,
+    end_day_param date
+)
+RETURNS integer
+LANGUAGE sql
+VOLATILE
+AS $$
+    WITH days AS (
+        SELECT generate_series(start_day_param, end_day_param, interval '1 day')::date AS day
+    ),
+    daily AS (
+        SELECT
+            (s.call_start_time AT TIME ZONE 'UTC')::date AS day,
+            COUNT(*) AS total_calls,
+            COUNT(*) FILTER (
+                WHERE s.metadata ->> 'accepted' = 'true'
+                   OR s.metadata ->> 'status' = 'accepted'
+            ) AS accepted_calls,
+            COALESCE(SUM(s.duration) FILTER (WHERE s.duration > 0), 0) AS sum_handle_time,
+            COUNT(*) FILTER (WHERE s.duration > 0) AS n_handle_time
+        FROM transcription_sessions s
+        WHERE s.call_start_time >= start_day_param::timestamp AT TIME ZONE 'UTC'
+          AND s.call_start_time < (end_day_param + 1)::timestamp AT TIME ZONE 'UTC'
+          AND s."IS_FALSE" = false
+        GROUP BY 1
+    ),
+    upserted AS (
+        INSERT INTO analytics_daily_rollup AS r (
+            day, total_calls, accepted_calls, sum_handle_time, n_handle_time, updated_at
+        )
+        SELECT
+            d.day,
+            COALESCE(daily.total_calls, 0),
+            COALESCE(daily.accepted_calls, 0),
+            COALESCE(daily.sum_handle_time, 0),
+            COALESCE(daily.n_handle_time, 0),
+            now()
+        FROM days d
+        LEFT JOIN daily ON daily.day = d.day
+        ON CONFLICT (day) DO UPDATE SET
+            total_calls = EXCLUDED.total_calls,
+            accepted_calls = EXCLUDED.accepted_calls,
+            sum_handle_time = EXCLUDED.sum_handle_time,
+            n_handle_time = EXCLUDED.n_handle_time,
+            updated_at = EXCLUDED.updated_at
+        RETURNING 1
+    )
+    SELECT COUNT(*)::integer FROM upserted;
+$$;
@@ -0,0 +1,31 @@
+-- Partial indexes matching the analytics query predicates.
+--
+-- Every analytics query (PostgREST fallbacks and RPCs in
+-- apps.analytics.services.queries) filters valid calls with
+-- "IS_FALSE" = false and a call_start_time range; the intent, code and
+-- sentiment queries additionally skip rows without a scorecard or summary.
+-- These partial B-trees let those range scans touch only matching rows.
+-- A B-tree serves both scan directions, so call_start_time is ascending.
+--
+-- The scorecard index is required by get_scorecard_summary_with_delta and
+-- the get_<category>_summary RPCs; the sentiment RPC carries its own
+-- covering index (get_sentiment_shift.sql). Apply this file first.
+--
+-- CONCURRENTLY avoids locking writes on transcription_sessions, so run
+-- the statements outside a transaction (plain psql -f does that). Check
+-- the plans with EXPLAIN ANALYZE on a KPI query afterwards; they should
+-- show index or bitmap index scans instead of a sequential scan.
+--
+-- Apply with: psql "$DATABASE_URL" -f apps/analytics/sql/analytics_indexes.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS transcription_sessions_valid_call_start_time_idx
+    ON transcription_sessions (call_start_time)
+    WHERE "IS_FALSE" = false;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS transcription_sessions_scorecard_call_start_time_idx
+    ON transcription_sessions (call_start_time)
+    WHERE "IS_FALSE" = false AND call_scorecard IS NOT NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS transcription_sessions_summary_call_start_time_idx
+    ON transcription_sessions (call_start_time)
+    WHERE "IS_FALSE" = false AND call_summary IS NOT NULL;
@@ -0,0 +1,29 @@
+-- Planner estimate of the number of valid sessions in a time range.
+--
+-- Used by apps.analytics.services.queries.get_sessions_count for ranges
+-- longer than 30 days, where an exact count(*) has to visit every matching
+-- row. The estimate is the "Plan Rows" of the query plan, so it is only as
+-- fresh as the table statistics (ANALYZE / autovacuum).
+--
+-- Apply with: psql "$DATABASE_URL" -f apps/analytics/sql/estimate_sessions_count.sql
+
+CREATE OR REPLACE FUNCTION estimate_sessions_count(
+    start_date_param timestamptz,
+    end_date_param timestamptz
+)
+RETURNS bigint
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    plan jsonb;
+BEGIN
+    EXECUTE format(
+        'EXPLAIN (FORMAT JSON) SELECT 1 FROM transcription_sessions '
+        'WHERE call_start_time >= %L AND call_start_time <= %L AND "IS_FALSE" = false',
+        start_date_param,
+        end_date_param
+    ) INTO plan;
+    RETURN (plan -> 0 -> 'Plan' ->> 'Plan Rows')::bigint;
+END;
+$$;
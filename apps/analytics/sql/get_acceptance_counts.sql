@@ -0,0 +1,36 @@
+-- Total and accepted call counts for a period.
+--
+-- Used by apps.analytics.services.queries.get_acceptance_rate, which
+-- previously paged every session's metadata to the API server to check
+-- acceptance in Python. Acceptance is metadata.accepted = true or
+-- metadata.status = 'accepted'; the expression index covers both keys for
+-- valid calls.
+--
+-- Apply with: psql "$DATABASE_URL" -f apps/analytics/sql/get_acceptance_counts.sql
+
+CREATE INDEX IF NOT EXISTS transcription_sessions_accepted_idx
+    ON transcription_sessions ((metadata ->> 'accepted'), (metadata ->> 'status'))
+    WHERE "IS_FALSE" = false;
+
+CREATE OR REPLACE FUNCTION get_acceptance_counts(
+    start_date_param timestamptz,
+    end_date_param timestamptz
+)
+RETURNS TABLE (
+    total_calls bigint,
+    accepted_calls bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        COUNT(*),
+        COUNT(*) FILTER (
+            WHERE s.metadata ->> 'accepted' = 'true'
+               OR s.metadata ->> 'status' = 'accepted'
+        )
+    FROM transcription_sessions s
+    WHERE s.call_start_time >= start_date_param
+      AND s.call_start_time <= end_date_param
+      AND s."IS_FALSE" = false;
+$$;
@@ -0,0 +1,146 @@
+-- Every scorecard dashboard metric for a period as one JSON object.
+--
+-- Used by apps.analytics.services.queries.get_analytics_bundle, replacing
+-- the separate aggregate, daily-count, intent, action/result code and
+-- sentiment round trips. All of them read the same filtered rows (the
+-- base CTE); the previous period's counts feed the conversion delta.
+--
+-- Semantics mirror the per-metric RPCs and Python fallbacks:
+--   * acceptance: metadata.accepted = true or metadata.status = 'accepted'
+--   * avg_duration only counts calls with a positive duration
+--   * only string array elements are counted; action and result codes are
+--     filtered by user_id_param when given, intents are not
+--   * scorecards without sentiment_shift_category count as neutral
+--   * daily rows are per bucket_param ('day', 'week' or 'month'), as in
+--     get_daily_acceptance_rate, so long periods return a few rows
+--
+-- Apply with: psql "$DATABASE_URL" -f apps/analytics/sql/get_analytics_bundle.sql
+
+DROP FUNCTION IF EXISTS get_analytics_bundle(timestamptz, timestamptz, timestamptz, timestamptz, text);
+
+CREATE OR REPLACE FUNCTION get_analytics_bundle(
+    start_date_param timestamptz,
+    end_date_param timestamptz,
+    prev_start_date_param timestamptz,
+    prev_end_date_param timestamptz,
+    user_id_param text DEFAULT NULL,
+    bucket_param text DEFAULT 'day'
+)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    WITH base AS (
+        SELECT
+            s.user_id,
+            s.duration,
+            s.call_scorecard,
+            s.call_summary,
+            to_char(
+                CASE bucket_param
+                    WHEN 'week' THEN date_bin(
+                        '7 days',
+                        s.call_start_time AT TIME ZONE 'UTC',
+                        date_trunc('day', start_date_param AT TIME ZONE 'UTC')
+                    )
+                    WHEN 'month' THEN GREATEST(
+                        date_trunc('month', s.call_start_time AT TIME ZONE 'UTC'),
+                        date_trunc('day', start_date_param AT TIME ZONE 'UTC')
+                    )
+                    ELSE date_trunc('day', s.call_start_time AT TIME ZONE 'UTC')
+                END,
+                'YYYY-MM-DD'
+            ) AS call_date,
+            (s.metadata ->> 'accepted' = 'true' OR s.metadata ->> 'status' = 'accepted') AS accepted
+        FROM transcription_sessions s
+        WHERE s.call_start_time >= start_date_param
+          AND s.call_start_time <= end_date_param
+          AND s."IS_FALSE" = false
+    ),
+    totals AS (
+        SELECT
+            COUNT(*) AS total_calls,
+            COUNT(*) FILTER (WHERE accepted) AS accepted_calls,
+            COALESCE(AVG(duration) FILTER (WHERE duration > 0), 0) AS avg_duration,
+            COALESCE(SUM(duration), 0)::bigint AS total_duration
+        FROM base
+    ),
+    prev AS (
+        SELECT
+            COUNT(*) AS total_calls,
+            COUNT(*) FILTER (
+                WHERE s.metadata ->> 'accepted' = 'true'
+                   OR s.metadata ->> 'status' = 'accepted'
+            ) AS accepted_calls
+        FROM transcription_sessions s
+        WHERE s.call_start_time >= prev_start_date_param
+          AND s.call_start_time <= prev_end_date_param
+          AND s."IS_FALSE" = false
+    ),
+    daily AS (
+        SELECT call_date, COUNT(*) AS call_count, COUNT(*) FILTER (WHERE accepted) AS accepted_count
+        FROM base
+        GROUP BY 1
+    ),
+    intents AS (
+        SELECT e.value #>> '{}' AS value, COUNT(*) AS count
+        FROM base b,
+             jsonb_array_elements(
+                 CASE WHEN jsonb_typeof(b.call_scorecard -> 'detected_intents') = 'array'
+                      THEN b.call_scorecard -> 'detected_intents' ELSE '[]'::jsonb END
+             ) AS e(value)
+        WHERE jsonb_typeof(e.value) = 'string'
+        GROUP BY 1
+    ),
+    action_codes AS (
+        SELECT e.value #>> '{}' AS value, COUNT(*) AS count
+        FROM base b,
+             jsonb_array_elements(
+                 CASE WHEN jsonb_typeof(b.call_summary -> 'action_codes') = 'array'
+                      THEN b.call_summary -> 'action_codes' ELSE '[]'::jsonb END
+             ) AS e(value)
+        WHERE jsonb_typeof(e.value) = 'string'
+          AND (user_id_param IS NULL OR b.user_id::text = user_id_param)
+        GROUP BY 1
+    ),
+    result_codes AS (
+        SELECT e.value #>> '{}' AS value, COUNT(*) AS count
+        FROM base b,
+             jsonb_array_elements(
+                 CASE WHEN jsonb_typeof(b.call_summary -> 'result_codes') = 'array'
+                      THEN b.call_summary -> 'result_codes' ELSE '[]'::jsonb END
+             ) AS e(value)
+        WHERE jsonb_typeof(e.value) = 'string'
+          AND (user_id_param IS NULL OR b.user_id::text = user_id_param)
+        GROUP BY 1
+    ),
+    sentiment AS (
+        SELECT
+            COALESCE(NULLIF(call_scorecard ->> 'sentiment_shift_category', ''), 'neutral') AS category,
+            COUNT(*) AS count
+        FROM base
+        WHERE jsonb_typeof(call_scorecard) = 'object'
+        GROUP BY 1
+    )
+    SELECT jsonb_build_object(
+        'total_calls', t.total_calls,
+        'accepted_calls', t.accepted_calls,
+        'avg_duration', t.avg_duration,
+        'total_duration', t.total_duration,
+        'prev_total_calls', p.total_calls,
+        'prev_accepted_calls', p.accepted_calls,
+        'daily', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'call_date', call_date,
+                'call_count', call_count,
+                'accepted_count', accepted_count
+            ) ORDER BY call_date)
+            FROM daily
+        ), '[]'::jsonb),
+        'call_intents', COALESCE((SELECT jsonb_object_agg(value, count) FROM intents), '{}'::jsonb),
+        'action_codes', COALESCE((SELECT jsonb_object_agg(value, count) FROM action_codes), '{}'::jsonb),
+        'result_codes', COALESCE((SELECT jsonb_object_agg(value, count) FROM result_codes), '{}'::jsonb),
+        'sentiment', COALESCE((SELECT jsonb_object_agg(category, count) FROM sentiment), '{}'::jsonb)
+    )
+    FROM totals t, prev p;
+$$;
@@ -0,0 +1,59 @@
+-- Per-day accepted and total call counts for the acceptance-rate trend.
+--
+-- Used by apps.analytics.services.queries.get_daily_metrics for the
+-- acceptance_rate metric, replacing the paginated fetch of every session's
+-- metadata and the grouping by date in Python.
+--
+-- Rows are per bucket_param: 'day' (UTC calendar days of call_start_time),
+-- 'week' (7-day windows from the period's first day) or 'month' (calendar
+-- months), each labeled with its first day inside the period, the same
+-- buckets _bucket_daily_counts builds. Acceptance mirrors
+-- get_acceptance_rate: metadata.accepted is true or metadata.status =
+-- 'accepted'. The range scan uses the partial index from
+-- analytics_indexes.sql.
+--
+-- Apply with: psql "$DATABASE_URL" -f apps/analytics/sql/get_daily_acceptance_rate.sql
+
+DROP FUNCTION IF EXISTS get_daily_acceptance_rate(timestamptz, timestamptz);
+
+CREATE OR REPLACE FUNCTION get_daily_acceptance_rate(
+    start_date_param timestamptz,
+    end_date_param timestamptz,
+    bucket_param text DEFAULT 'day'
+)
+RETURNS TABLE (
+    call_date text,
+    accepted_count bigint,
+    total_count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        to_char(
+            CASE bucket_param
+                WHEN 'week' THEN date_bin(
+                    '7 days',
+                    s.call_start_time AT TIME ZONE 'UTC',
+                    date_trunc('day', start_date_param AT TIME ZONE 'UTC')
+                )
+                WHEN 'month' THEN GREATEST(
+                    date_trunc('month', s.call_start_time AT TIME ZONE 'UTC'),
+                    date_trunc('day', start_date_param AT TIME ZONE 'UTC')
+                )
+                ELSE date_trunc('day', s.call_start_time AT TIME ZONE 'UTC')
+            END,
+            'YYYY-MM-DD'
+        ) AS call_date,
+        COUNT(*) FILTER (
+            WHERE s.metadata ->> 'accepted' = 'true'
+               OR s.metadata ->> 'status' = 'accepted'
+        ) AS accepted_count,
+        COUNT(*) AS total_count
+    FROM transcription_sessions s
+    WHERE s.call_start_time >= start_date_param
+      AND s.call_start_time <= end_date_param
+      AND s."IS_FALSE" = false
+    GROUP BY 1
+    ORDER BY 1;
+$$;
@@ -0,0 +1,37 @@
+-- Per-day call and acceptance counts for trend charts in one scan.
+--
+-- Used by apps.analytics.services.queries.get_daily_metrics_multi, which
+-- derives every supported trend metric (total_calls, acceptance_rate) from
+-- these two counts instead of issuing one query per metric.
+--
+-- Days are UTC calendar days of call_start_time, matching the date prefix
+-- the Python fallback groups by. Acceptance mirrors get_acceptance_rate.
+--
+-- Apply with: psql "$DATABASE_URL" -f apps/analytics/sql/get_daily_metrics_multi.sql
+
+CREATE OR REPLACE FUNCTION get_daily_metrics_multi(
+    start_date_param timestamptz,
+    end_date_param timestamptz
+)
+RETURNS TABLE (
+    call_date text,
+    call_count bigint,
+    accepted_count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        to_char(s.call_start_time AT TIME ZONE 'UTC', 'YYYY-MM-DD') AS call_date,
+        COUNT(*) AS call_count,
+        COUNT(*) FILTER (
+            WHERE s.metadata ->> 'accepted' = 'true'
+               OR s.metadata ->> 'status' = 'accepted'
+        ) AS accepted_count
+    FROM transcription_sessions s
+    WHERE s.call_start_time >= start_date_param
+      AND s.call_start_time <= end_date_param
+      AND s."IS_FALSE" = false
+    GROUP BY 1
+    ORDER BY 1;
+$$;
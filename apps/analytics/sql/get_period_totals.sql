@@ -0,0 +1,36 @@
+-- Call, acceptance and handle-time totals for a (partial-day) time range.
+--
+-- Used by apps.analytics.services.queries._get_period_totals for the part
+-- of a period the daily rollup does not cover (always the current day).
+-- Columns match analytics_daily_rollup so the two can be summed: handle
+-- time only counts calls with a positive duration, as in
+-- get_avg_call_duration.
+--
+-- Apply with: psql "$DATABASE_URL" -f apps/analytics/sql/get_period_totals.sql
+
+CREATE OR REPLACE FUNCTION get_period_totals(
+    start_date_param timestamptz,
+    end_date_param timestamptz
+)
+RETURNS TABLE (
+    total_calls bigint,
+    accepted_calls bigint,
+    sum_handle_time bigint,
+    n_handle_time bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        COUNT(*),
+        COUNT(*) FILTER (
+            WHERE s.metadata ->> 'accepted' = 'true'
+               OR s.metadata ->> 'status' = 'accepted'
+        ),
+        COALESCE(SUM(s.duration) FILTER (WHERE s.duration > 0), 0)::bigint,
+        COUNT(*) FILTER (WHERE s.duration > 0)
+    FROM transcription_sessions s
+    WHERE s.call_start_time >= start_date_param
+      AND s.call_start_time <= end_date_param
+      AND s."IS_FALSE" = false;
+$$;
@@ -0,0 +1,53 @@
+-- Headline scorecard metrics for a period in one scan.
+--
+-- Used by apps.analytics.services.queries.get_scorecard_aggregates.
+-- Replaces the separate count, acceptance-rate, get_avg_call_duration and
+-- get_total_call_duration round trips, which all filter the same rows.
+--
+-- Acceptance mirrors get_acceptance_rate: metadata.accepted is true or
+-- metadata.status = 'accepted'. Durations are in seconds.
+--
+-- The previous period's call and accepted counts come from the same scan
+-- (FILTER clauses) so the conversion delta needs no extra round trip.
+--
+-- Apply with: psql "$DATABASE_URL" -f apps/analytics/sql/get_scorecard_aggregates.sql
+
+DROP FUNCTION IF EXISTS get_scorecard_aggregates(timestamptz, timestamptz);
+
+CREATE OR REPLACE FUNCTION get_scorecard_aggregates(
+    start_date_param timestamptz,
+    end_date_param timestamptz,
+    prev_start_date_param timestamptz,
+    prev_end_date_param timestamptz
+)
+RETURNS TABLE (
+    total_calls bigint,
+    accepted_calls bigint,
+    avg_duration numeric,
+    total_duration bigint,
+    prev_total_calls bigint,
+    prev_accepted_calls bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH periods AS (
+        SELECT
+            s.duration,
+            s.call_start_time >= start_date_param AND s.call_start_time <= end_date_param AS is_current,
+            s.call_start_time >= prev_start_date_param AND s.call_start_time <= prev_end_date_param AS is_previous,
+            (s.metadata ->> 'accepted' = 'true' OR s.metadata ->> 'status' = 'accepted') AS accepted
+        FROM transcription_sessions s
+        WHERE s.call_start_time >= LEAST(start_date_param, prev_start_date_param)
+          AND s.call_start_time <= GREATEST(end_date_param, prev_end_date_param)
+          AND s."IS_FALSE" = false
+    )
+    SELECT
+        COUNT(*) FILTER (WHERE is_current),
+        COUNT(*) FILTER (WHERE is_current AND accepted),
+        COALESCE(AVG(duration) FILTER (WHERE is_current AND duration > 0), 0),
+        COALESCE(SUM(duration) FILTER (WHERE is_current), 0)::bigint,
+        COUNT(*) FILTER (WHERE is_previous),
+        COUNT(*) FILTER (WHERE is_previous AND accepted)
+    FROM periods;
+$$;
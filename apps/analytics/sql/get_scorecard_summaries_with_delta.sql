@@ -0,0 +1,83 @@
+-- Pass/fail counts for every scorecard category, current and previous
+-- period, in one scan.
+--
+-- Used by apps.analytics.services.queries.get_scorecard_summaries_with_delta,
+-- replacing one get_scorecard_summary_with_delta round trip (and table
+-- scan) per category. The period rows are read once and fanned out over
+-- the categories in thresholds_param ({"compliance": 40, ...}), so adding
+-- a category needs no SQL change. Categories without scored calls return
+-- no row.
+--
+-- Pass rule (matches get_scorecard_summary_with_delta):
+--   compliance / servicing / collections: stored categories.<name>.pass,
+--     else categories.<name>.score >= the category's threshold
+--   legal: call_scorecard.legal_issues_detected is false
+--
+-- Requires transcription_sessions_scorecard_call_start_time_idx from
+-- analytics_indexes.sql (same predicate as the base CTE).
+--
+-- Apply with: psql "$DATABASE_URL" -f apps/analytics/sql/get_scorecard_summaries_with_delta.sql
+
+CREATE OR REPLACE FUNCTION get_scorecard_summaries_with_delta(
+    start_date_param timestamptz,
+    end_date_param timestamptz,
+    prev_start_date_param timestamptz,
+    prev_end_date_param timestamptz,
+    thresholds_param jsonb
+)
+RETURNS TABLE (
+    category text,
+    current_pass bigint,
+    current_fail bigint,
+    current_total bigint,
+    previous_pass bigint,
+    previous_fail bigint,
+    previous_total bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH base AS (
+        SELECT
+            s.call_start_time >= start_date_param AS is_current,
+            s.call_scorecard
+        FROM transcription_sessions s
+        WHERE s.call_start_time >= prev_start_date_param
+          AND s.call_start_time <= end_date_param
+          AND s."IS_FALSE" = false
+          AND s.call_scorecard IS NOT NULL
+          AND (
+              (s.call_start_time >= start_date_param AND s.call_start_time <= end_date_param)
+              OR (s.call_start_time <= prev_end_date_param)
+          )
+    ),
+    scored AS (
+        SELECT
+            t.name AS scorecard_category,
+            b.is_current,
+            CASE
+                WHEN t.name = 'legal' THEN
+                    NOT COALESCE((b.call_scorecard ->> 'legal_issues_detected')::boolean, false)
+                ELSE
+                    COALESCE(
+                        (b.call_scorecard -> 'categories' -> t.name ->> 'pass')::boolean,
+                        (b.call_scorecard -> 'categories' -> t.name ->> 'score')::numeric >= t.threshold::numeric
+                    )
+            END AS passed
+        FROM base b
+        CROSS JOIN jsonb_each_text(thresholds_param) AS t(name, threshold)
+        WHERE t.name = 'legal'
+           OR b.call_scorecard -> 'categories' ? t.name
+    )
+    SELECT
+        scorecard_category,
+        COUNT(*) FILTER (WHERE is_current AND passed),
+        COUNT(*) FILTER (WHERE is_current AND NOT passed),
+        COUNT(*) FILTER (WHERE is_current),
+        COUNT(*) FILTER (WHERE NOT is_current AND passed),
+        COUNT(*) FILTER (WHERE NOT is_current AND NOT passed),
+        COUNT(*) FILTER (WHERE NOT is_current)
+    FROM scored
+    WHERE passed IS NOT NULL
+    GROUP BY scorecard_category;
+$$;
@@ -0,0 +1,74 @@
+-- Scorecard pass/fail counts for the current and previous period in one scan.
+--
+-- Used by apps.analytics.services.queries.get_scorecard_summary_with_delta.
+-- Replaces the per-period get_<category>_summary calls the delta calculation
+-- needed: both periods are aggregated with FILTER clauses over a single
+-- range scan on call_start_time.
+--
+-- Pass rule (matches the per-category summaries):
+--   compliance / servicing / collections: stored categories.<name>.pass,
+--     else categories.<name>.score >= threshold_param
+--   legal: call_scorecard.legal_issues_detected is false
+--
+-- Requires transcription_sessions_scorecard_call_start_time_idx from
+-- analytics_indexes.sql: the WHERE clause repeats that partial index's
+-- predicate so the two-period scan is an index range scan. Without it
+-- Postgres falls back to a sequential scan of transcription_sessions.
+--
+-- Apply with: psql "$DATABASE_URL" -f apps/analytics/sql/get_scorecard_summary_with_delta.sql
+
+CREATE OR REPLACE FUNCTION get_scorecard_summary_with_delta(
+    category_param text,
+    start_date_param timestamptz,
+    end_date_param timestamptz,
+    prev_start_date_param timestamptz,
+    prev_end_date_param timestamptz,
+    threshold_param numeric
+)
+RETURNS TABLE (
+    current_pass bigint,
+    current_fail bigint,
+    current_total bigint,
+    previous_pass bigint,
+    previous_fail bigint,
+    previous_total bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH scored AS (
+        SELECT
+            s.call_start_time >= start_date_param AS is_current,
+            CASE
+                WHEN category_param = 'legal' THEN
+                    NOT COALESCE((s.call_scorecard ->> 'legal_issues_detected')::boolean, false)
+                ELSE
+                    COALESCE(
+                        (s.call_scorecard -> 'categories' -> category_param ->> 'pass')::boolean,
+                        (s.call_scorecard -> 'categories' -> category_param ->> 'score')::numeric >= threshold_param
+                    )
+            END AS passed
+        FROM transcription_sessions s
+        WHERE s.call_start_time >= prev_start_date_param
+          AND s.call_start_time <= end_date_param
+          AND s."IS_FALSE" = false
+          AND s.call_scorecard IS NOT NULL
+          AND (
+              (s.call_start_time >= start_date_param AND s.call_start_time <= end_date_param)
+              OR (s.call_start_time <= prev_end_date_param)
+          )
+          AND (
+              category_param = 'legal'
+              OR s.call_scorecard -> 'categories' ? category_param
+          )
+    )
+    SELECT
+        COUNT(*) FILTER (WHERE is_current AND passed),
+        COUNT(*) FILTER (WHERE is_current AND NOT passed),
+        COUNT(*) FILTER (WHERE is_current),
+        COUNT(*) FILTER (WHERE NOT is_current AND passed),
+        COUNT(*) FILTER (WHERE NOT is_current AND NOT passed),
+        COUNT(*) FILTER (WHERE NOT is_current)
+    FROM scored
+    WHERE passed IS NOT NULL;
+$$;
@@ -0,0 +1,45 @@
+-- Sentiment shift distribution for a period, grouped in the database.
+--
+-- Used by apps.analytics.services.queries.get_sentiment_distribution,
+-- which previously paged every call_scorecard to Python to read one key.
+-- The shift category (positive, negative_to_positive, ...) is already
+-- classified when the scorecard is generated; the stored generated column
+-- exposes it without detoasting the scorecard jsonb for every row.
+-- Scorecards without a category count as neutral, as in the Python
+-- fallback.
+--
+-- The index below is a prerequisite, not an optimization: it covers the
+-- range filter and the grouped column, so the GROUP BY is answered from
+-- the index (index-only once the visibility map is current).
+--
+-- Apply with: psql "$DATABASE_URL" -f apps/analytics/sql/get_sentiment_shift.sql
+
+ALTER TABLE transcription_sessions
+    ADD COLUMN IF NOT EXISTS sentiment_shift_category text
+    GENERATED ALWAYS AS (call_scorecard ->> 'sentiment_shift_category') STORED;
+
+CREATE INDEX IF NOT EXISTS transcription_sessions_sentiment_shift_idx
+    ON transcription_sessions (call_start_time, sentiment_shift_category)
+    WHERE "IS_FALSE" = false AND call_scorecard IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION get_sentiment_shift(
+    start_date_param timestamptz,
+    end_date_param timestamptz
+)
+RETURNS TABLE (
+    category text,
+    count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        COALESCE(NULLIF(s.sentiment_shift_category, ''), 'neutral') AS category,
+        COUNT(*) AS count
+    FROM transcription_sessions s
+    WHERE s.call_start_time >= start_date_param
+      AND s.call_start_time <= end_date_param
+      AND s."IS_FALSE" = false
+      AND s.call_scorecard IS NOT NULL
+    GROUP BY 1;
+$$;
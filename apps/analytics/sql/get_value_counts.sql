@@ -0,0 +1,93 @@
+-- Counts of the string values in a jsonb array column, per period.
+--
+-- Used by apps.analytics.services.queries get_call_intents,
+-- get_action_codes and get_result_codes (via _fetch_value_counts), which
+-- previously paged every scorecard / summary to Python to count them.
+-- Only string elements are counted and rows where the key is missing or
+-- not an array are skipped, matching the Python fallback. The array check
+-- is inside the set-returning call (not the WHERE clause) because the
+-- planner may evaluate jsonb_array_elements before filtering, and it
+-- raises on non-arrays.
+--
+-- user_id_param is optional; action and result codes are filtered by it
+-- when the caller has a user, intents are not.
+--
+-- Apply with: psql "$DATABASE_URL" -f apps/analytics/sql/get_value_counts.sql
+
+CREATE OR REPLACE FUNCTION get_intent_counts(
+    start_date_param timestamptz,
+    end_date_param timestamptz,
+    user_id_param text DEFAULT NULL
+)
+RETURNS TABLE (
+    value text,
+    count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT e.value #>> '{}', COUNT(*)
+    FROM transcription_sessions s,
+         jsonb_array_elements(
+             CASE WHEN jsonb_typeof(s.call_scorecard -> 'detected_intents') = 'array'
+                  THEN s.call_scorecard -> 'detected_intents' ELSE '[]'::jsonb END
+         ) AS e(value)
+    WHERE s.call_start_time >= start_date_param
+      AND s.call_start_time <= end_date_param
+      AND s."IS_FALSE" = false
+      AND jsonb_typeof(e.value) = 'string'
+      AND (user_id_param IS NULL OR s.user_id::text = user_id_param)
+    GROUP BY 1;
+$$;
+
+CREATE OR REPLACE FUNCTION get_action_code_counts(
+    start_date_param timestamptz,
+    end_date_param timestamptz,
+    user_id_param text DEFAULT NULL
+)
+RETURNS TABLE (
+    value text,
+    count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT e.value #>> '{}', COUNT(*)
+    FROM transcription_sessions s,
+         jsonb_array_elements(
+             CASE WHEN jsonb_typeof(s.call_summary -> 'action_codes') = 'array'
+                  THEN s.call_summary -> 'action_codes' ELSE '[]'::jsonb END
+         ) AS e(value)
+    WHERE s.call_start_time >= start_date_param
+      AND s.call_start_time <= end_date_param
+      AND s."IS_FALSE" = false
+      AND jsonb_typeof(e.value) = 'string'
+      AND (user_id_param IS NULL OR s.user_id::text = user_id_param)
+    GROUP BY 1;
+$$;
+
+CREATE OR REPLACE FUNCTION get_result_code_counts(
+    start_date_param timestamptz,
+    end_date_param timestamptz,
+    user_id_param text DEFAULT NULL
+)
+RETURNS TABLE (
+    value text,
+    count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT e.value #>> '{}', COUNT(*)
+    FROM transcription_sessions s,
+         jsonb_array_elements(
+             CASE WHEN jsonb_typeof(s.call_summary -> 'result_codes') = 'array'
+                  THEN s.call_summary -> 'result_codes' ELSE '[]'::jsonb END
+         ) AS e(value)
+    WHERE s.call_start_time >= start_date_param
+      AND s.call_start_time <= end_date_param
+      AND s."IS_FALSE" = false
+      AND jsonb_typeof(e.value) = 'string'
+      AND (user_id_param IS NULL OR s.user_id::text = user_id_param)
+    GROUP BY 1;
+$$;
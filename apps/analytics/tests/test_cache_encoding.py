@@ -0,0 +1,50 @@
+"""
+Tests for cached payload encoding (_encode / _decode).
+"""
+import json
+from unittest import mock
+
+import pytest
+
+from apps.analytics.services import cache
+from apps.analytics.services.cache import _ZSTD_MAGIC, _decode, _encode
+
+SMALL = {"period": "last_7_days", "metrics": {"total_calls": 12}}
+LARGE = {"x": [f"2025-01-{day % 28 + 1:02d}" for day in range(400)], "y": list(range(400))}
+
+
+def test_small_payload_is_stored_as_plain_json():
+    encoded = _encode(SMALL)
+
+    assert not encoded.startswith(_ZSTD_MAGIC)
+    assert json.loads(encoded) == SMALL
+    assert _decode(encoded) == SMALL
+
+
+@pytest.mark.skipif(not cache.ZSTD_AVAILABLE, reason="zstandard not installed")
+def test_large_payload_round_trips_compressed():
+    encoded = _encode(LARGE)
+
+    assert encoded.startswith(_ZSTD_MAGIC)
+    assert len(encoded) < len(json.dumps(LARGE))
+    assert _decode(encoded) == LARGE
+
+
+def test_large_payload_is_plain_without_zstandard():
+    with mock.patch.object(cache, "ZSTD_AVAILABLE", False):
+        encoded = _encode(LARGE)
+
+    assert not encoded.startswith(_ZSTD_MAGIC)
+    assert _decode(encoded) == LARGE
+
+
+def test_plain_entries_written_before_compression_still_decode():
+    assert _decode(json.dumps(LARGE).encode()) == LARGE
+
+
+@pytest.mark.skipif(not cache.ZSTD_AVAILABLE, reason="zstandard not installed")
+def test_compressed_entry_without_zstandard_raises():
+    encoded = _encode(LARGE)
+
+    with mock.patch.object(cache, "ZSTD_AVAILABLE", False), pytest.raises(ValueError):
+        _decode(encoded)
@@ -0,0 +1,59 @@
+"""
+Tests for caching empty aggregation results (_cached_aggregation).
+"""
+from unittest import mock
+
+from apps.analytics.services import aggregations
+from apps.analytics.services.aggregations import (
+    _AGGREGATION_CACHE_TTL,
+    _EMPTY_AGGREGATION_CACHE_TTL,
+    _EMPTY_MARKER,
+    _cached_aggregation,
+)
+
+EMPTY = {"total_calls": 0}
+NON_EMPTY = {"total_calls": 3}
+
+
+def _is_empty(result):
+    return result["total_calls"] == 0
+
+
+def _run(cached, version, result):
+    """Run _cached_aggregation with the cache mocked; return (value, cache_set mock, compute mock)."""
+    compute = mock.Mock(return_value=dict(result))
+    with mock.patch.object(aggregations, "cache_get", return_value=cached), \
+            mock.patch.object(aggregations, "cache_set") as cache_set, \
+            mock.patch.object(aggregations, "get_data_version", return_value=version):
+        value = _cached_aggregation("scorecard", 1, "last_7_days", None, None, compute, is_empty=_is_empty)
+    return value, cache_set, compute
+
+
+def test_empty_result_is_cached_longer_with_the_data_version():
+    value, cache_set, _ = _run(None, 4, EMPTY)
+
+    assert value == EMPTY
+    cache_set.assert_called_once_with(mock.ANY, {**EMPTY, _EMPTY_MARKER: 4}, ttl=_EMPTY_AGGREGATION_CACHE_TTL)
+    assert _EMPTY_AGGREGATION_CACHE_TTL > _AGGREGATION_CACHE_TTL
+
+
+def test_non_empty_result_uses_the_base_ttl():
+    _, cache_set, _ = _run(None, 4, NON_EMPTY)
+
+    cache_set.assert_called_once_with(mock.ANY, NON_EMPTY, ttl=_AGGREGATION_CACHE_TTL)
+
+
+def test_empty_entry_from_the_current_version_is_served():
+    value, cache_set, compute = _run({**EMPTY, _EMPTY_MARKER: 4}, 4, NON_EMPTY)
+
+    assert value == EMPTY
+    compute.assert_not_called()
+    cache_set.assert_not_called()
+
+
+def test_empty_entry_from_before_an_invalidation_is_recomputed():
+    value, cache_set, compute = _run({**EMPTY, _EMPTY_MARKER: 4}, 5, NON_EMPTY)
+
+    assert value == NON_EMPTY
+    compute.assert_called_once()
+    cache_set.assert_called_once_with(mock.ANY, NON_EMPTY, ttl=_AGGREGATION_CACHE_TTL)
@@ -0,0 +1,58 @@
+"""
+Tests for analytics ETags (get_analytics_etag).
+"""
+from unittest import mock
+
+from apps.analytics.services import cache
+from apps.analytics.services.cache import get_analytics_etag, invalidate_analytics
+
+
+class FakeRedis:
+    """Just enough of redis-py for the version counter."""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def scan_iter(self, match=None, count=None):
+        return iter(())
+
+
+def _etag_at(redis_client, now, *parts):
+    with mock.patch.object(cache, "get_redis_client", return_value=redis_client), \
+            mock.patch.object(cache.time, "time", return_value=now):
+        return get_analytics_etag(*parts)
+
+
+def test_etag_is_stable_while_nothing_changes():
+    redis_client = FakeRedis()
+
+    assert _etag_at(redis_client, 1000.0, "scorecard:1:last_7_days") == _etag_at(redis_client, 1010.0, "scorecard:1:last_7_days")
+    assert _etag_at(redis_client, 1000.0, "scorecard:1:last_7_days") != _etag_at(redis_client, 1000.0, "scorecard:1:last_30_days")
+
+
+def test_etag_changes_when_analytics_are_invalidated():
+    redis_client = FakeRedis()
+    before = _etag_at(redis_client, 1000.0, "trends:1:last_7_days")
+
+    with mock.patch.object(cache, "get_redis_client", return_value=redis_client):
+        invalidate_analytics()
+
+    assert _etag_at(redis_client, 1000.0, "trends:1:last_7_days") != before
+
+
+def test_etag_rolls_over_with_the_window():
+    redis_client = FakeRedis()
+    window = cache._ETAG_WINDOW
+
+    assert _etag_at(redis_client, window * 10.0, "trends:1") != _etag_at(redis_client, window * 11.0, "trends:1")
+
+
+def test_no_etag_without_redis():
+    assert _etag_at(None, 1000.0, "trends:1") is None
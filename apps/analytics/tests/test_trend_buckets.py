@@ -0,0 +1,115 @@
+"""
+Tests for trend bucketing (_bucket_daily_counts).
+
+The trend RPCs (get_daily_acceptance_rate, get_analytics_bundle) bucket in
+SQL and return rows keyed by the bucket label; _bucket_daily_counts must
+label buckets the same way so those rows pass through unchanged.
+"""
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from apps.analytics.services.queries import _bucket_daily_counts, _trend_granularity
+
+
+def _period(start, end):
+    """Preset-style period bounds: start of the first day to end of the last day (UTC)."""
+    return (
+        datetime.combine(start, datetime.min.time(), tzinfo=timezone.utc),
+        datetime.combine(end, datetime.max.time(), tzinfo=timezone.utc),
+    )
+
+
+def _days(start, end):
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def _sql_bucket_label(day, period_start, granularity):
+    """Bucket label as computed by the bucket_param CASE in the trend RPCs."""
+    if granularity == "week":
+        # date_bin('7 days', ts, date_trunc('day', start_date_param))
+        return period_start + timedelta(days=(day - period_start).days // 7 * 7)
+    if granularity == "month":
+        # GREATEST(date_trunc('month', ts), date_trunc('day', start_date_param))
+        return max(day.replace(day=1), period_start)
+    return day
+
+
+def _daily_counts(days):
+    """Distinct, non-zero (calls, accepted) per day."""
+    return {day.isoformat(): (index + 1, index % 2) for index, day in enumerate(days)}
+
+
+def _sql_bucketed(day_counts, period_start, granularity):
+    """Fold per-day counts into SQL-labelled buckets, like the RPC rows."""
+    buckets = {}
+    for label, (calls, accepted) in day_counts.items():
+        key = _sql_bucket_label(date.fromisoformat(label), period_start, granularity).isoformat()
+        total_calls, total_accepted = buckets.get(key, (0, 0))
+        buckets[key] = (total_calls + calls, total_accepted + accepted)
+    return buckets
+
+
+@pytest.mark.parametrize("start, end, granularity", [
+    # Daily, across a month boundary
+    (date(2025, 1, 20), date(2025, 2, 10), "day"),
+    # Weekly, starting mid-week and mid-month, ending in a partial week
+    (date(2025, 1, 15), date(2025, 4, 14), "week"),
+    # Weekly across a leap day
+    (date(2024, 2, 1), date(2024, 5, 1), "week"),
+    # Monthly, starting mid-month and ending mid-month
+    (date(2024, 3, 17), date(2025, 3, 17), "month"),
+    # Monthly, starting on the 1st
+    (date(2024, 1, 1), date(2024, 12, 31), "month"),
+])
+def test_python_buckets_match_sql_labels(start, end, granularity):
+    period_start, period_end = _period(start, end)
+    assert _trend_granularity(period_start, period_end) == granularity
+
+    days = _days(start, end)
+    day_counts = _daily_counts(days)
+    from_days = _bucket_daily_counts(period_start, period_end, day_counts, ["total_calls", "acceptance_rate"])
+    from_sql = _bucket_daily_counts(
+        period_start, period_end, _sql_bucketed(day_counts, start, granularity), ["total_calls", "acceptance_rate"]
+    )
+
+    # Labels are exactly the SQL bucket labels for the period's days
+    expected_labels = sorted({_sql_bucket_label(day, start, granularity).isoformat() for day in days})
+    assert from_days["total_calls"]["x"] == expected_labels
+    # SQL-bucketed rows pass through to the same series as per-day counts
+    assert from_sql == from_days
+    # Nothing is lost at the period edges
+    assert sum(from_days["total_calls"]["y"]) == sum(calls for calls, _ in day_counts.values())
+    assert from_days["total_calls"]["granularity"] == granularity
+
+
+def test_month_buckets_start_at_period_start_then_calendar_months():
+    period_start, period_end = _period(date(2024, 3, 17), date(2024, 9, 30))
+    day_counts = {"2024-03-17": (1, 1), "2024-03-31": (2, 0), "2024-04-01": (4, 2), "2024-06-30": (8, 8)}
+
+    series = _bucket_daily_counts(period_start, period_end, day_counts, ["total_calls", "acceptance_rate"])
+
+    assert series["total_calls"]["granularity"] == "month"
+    assert series["total_calls"]["x"][:4] == ["2024-03-17", "2024-04-01", "2024-05-01", "2024-06-01"]
+    assert series["total_calls"]["y"][:4] == [3, 4, 0, 8]
+    assert series["acceptance_rate"]["y"][:4] == [pytest.approx(1 / 3), 0.5, 0.0, 1.0]
+
+
+def test_week_buckets_are_seven_day_windows_from_period_start():
+    period_start, period_end = _period(date(2025, 1, 29), date(2025, 4, 29))
+    day_counts = {"2025-01-29": (1, 0), "2025-02-04": (2, 1), "2025-02-05": (4, 4)}
+
+    series = _bucket_daily_counts(period_start, period_end, day_counts, ["total_calls"])
+
+    assert series["total_calls"]["x"][:2] == ["2025-01-29", "2025-02-05"]
+    assert series["total_calls"]["y"][:2] == [3, 4]
+
+
+def test_daily_buckets_fill_missing_days_with_zero():
+    period_start, period_end = _period(date(2025, 1, 30), date(2025, 2, 2))
+
+    series = _bucket_daily_counts(period_start, period_end, {"2025-02-01": (5, 5)}, ["total_calls", "acceptance_rate"])
+
+    assert series["total_calls"]["x"] == ["2025-01-30", "2025-01-31", "2025-02-01", "2025-02-02"]
+    assert series["total_calls"]["y"] == [0, 0, 5, 0]
+    assert series["acceptance_rate"]["y"] == [0.0, 0.0, 1.0, 0.0]
@@ -5,8 +5,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from apps.analytics.services.aggregations import get_scorecard_metrics, get_scorecard_summaries
-from apps.analytics.services.cache import get_cached_scorecard, cache_scorecard
+from django.utils.http import parse_etags
+from apps.analytics.services.aggregations import get_scorecard_dashboard
+from apps.analytics.services.cache import get_cached_scorecard, get_scorecard_fields, cache_scorecard, get_analytics_etag
+from apps.analytics.services.queries import get_period_dates
 import logging
 
 logger = logging.getLogger(__name__)
@@ -46,10 +48,13 @@ class ScorecardView(APIView):
             Options: "last_7_days", "last_30_days", "last_90_days", "last_year", "custom"
         - start_date: ISO date string for custom range (required if period="custom")
         - end_date: ISO date string for custom range (required if period="custom")
+        - fields: Optional comma-separated top-level fields to return
+            (e.g. "metrics,call_intents"); defaults to the full scorecard
         """
         period = request.query_params.get('period', 'last_30_days')
         start_date = request.query_params.get('start_date')
         end_date = request.query_params.get('end_date')
+        fields = [f for f in request.query_params.get('fields', '').split(',') if f]
         
         logger.info(f'ScorecardView received: period={period}, start_date={start_date}, end_date={end_date}')
         
@@ -62,22 +67,32 @@ class ScorecardView(APIView):
         if period == 'custom' and start_date and end_date:
             cache_key = f"scorecard:{user_id}:custom:{start_date}:{end_date}"
         
+        # Conditional GET: the ETag only changes when analytics are invalidated,
+        # a preset period rolls over or the hourly ETag window ends, so
+        # unchanged dashboards get a 304
+        period_start, period_end = get_period_dates(period, start_date, end_date)
+        etag = get_analytics_etag(cache_key, ','.join(fields), period_start.isoformat(), period_end.isoformat())
+        etag_headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'} if etag else None
+        if etag and etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=etag_headers)
+        
         # Temporarily disable cache for custom ranges to debug
         cached_data = None
         if period != 'custom':
-            cached_data = get_cached_scorecard(cache_key)
-            if cached_data:
+            if fields:
+                cached_data = get_scorecard_fields(cache_key, fields)
+            else:
+                cached_data = get_cached_scorecard(cache_key)
+            if cached_data is not None:
                 logger.info(f'Returning cached scorecard for period: {period}')
-                return Response(cached_data, status=status.HTTP_200_OK)
+                return Response(cached_data, status=status.HTTP_200_OK, headers=etag_headers)
         
         logger.info(f'Fetching fresh scorecard data for period: {period}, user: {user_id}, dates: {start_date} to {end_date}')
         
         try:
-            # Get metrics from aggregation service
-            metrics_data = get_scorecard_metrics(user, period, start_date, end_date)
-
-            # Get scorecard summaries (compliance, servicing, collections pass/fail)
-            scorecard_summaries = get_scorecard_summaries(user, period, start_date, end_date)
+            # Get metrics and scorecard summaries (compliance, servicing, collections pass/fail)
+            # from the aggregation service; both cache entries are read in one round trip
+            metrics_data, scorecard_summaries = get_scorecard_dashboard(user, period, start_date, end_date)
 
             # Combine both datasets
             metrics_data["scorecard_summaries"] = scorecard_summaries
@@ -87,7 +102,10 @@ class ScorecardView(APIView):
             # Cache the result - 60 seconds TTL for good balance
             cache_scorecard(cache_key, metrics_data, ttl=60)
 
-            return Response(metrics_data, status=status.HTTP_200_OK)
+            if fields:
+                metrics_data = {f: metrics_data[f] for f in fields if f in metrics_data}
+
+            return Response(metrics_data, status=status.HTTP_200_OK, headers=etag_headers)
         except Exception as e:
             logger.error(f'Error fetching scorecard metrics: {e}', exc_info=True)
             return Response(
@@ -5,8 +5,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.utils.http import parse_etags
 from apps.analytics.services.aggregations import get_trend_metrics
-from apps.analytics.services.cache import get_cached_trends, cache_trends
+from apps.analytics.services.cache import get_cached_trends, cache_trends, get_analytics_etag
+from apps.analytics.services.queries import get_period_dates
 import logging
 
 logger = logging.getLogger(__name__)
@@ -59,13 +61,22 @@ class TrendsView(APIView):
         if period == 'custom' and start_date and end_date:
             cache_key = f"trends:{user_id}:custom:{start_date}:{end_date}:{metric or 'all'}"
         
+        # Conditional GET: the ETag only changes when analytics are invalidated,
+        # a preset period rolls over or the hourly ETag window ends, so
+        # unchanged dashboards get a 304
+        period_start, period_end = get_period_dates(period, start_date, end_date)
+        etag = get_analytics_etag(cache_key, period_start.isoformat(), period_end.isoformat())
+        etag_headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'} if etag else None
+        if etag and etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=etag_headers)
+        
         # Temporarily disable cache for custom ranges to debug
         cached_data = None
         if period != 'custom':
             cached_data = get_cached_trends(cache_key)
             if cached_data:
                 logger.info(f'Returning cached trends for period: {period}')
-                return Response(cached_data, status=status.HTTP_200_OK)
+                return Response(cached_data, status=status.HTTP_200_OK, headers=etag_headers)
         
         logger.info(f'Fetching fresh trends data for period: {period}, dates: {start_date} to {end_date}, metric: {metric}, user: {user_id}')
         
@@ -78,7 +89,7 @@ class TrendsView(APIView):
             # Cache the result - 60 seconds TTL
             cache_trends(cache_key, trends_data, ttl=60)
             
-            return Response(trends_data, status=status.HTTP_200_OK)
+            return Response(trends_data, status=status.HTTP_200_OK, headers=etag_headers)
         except Exception as e:
             logger.error(f'Error fetching trend metrics: {e}', exc_info=True)
             return Response(
@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from apps.core.services.supabase import get_supabase_client
+from apps.analytics.services.cache import invalidate_analytics
 from django.conf import settings
 import logging
 from datetime import datetime
@@ -493,12 +494,12 @@ class GenerateSummaryView(APIView):
 
     def post(self, request, session_id):
         try:
-            from apps.ai.services import CallSummaryService
+            from apps.ai.services import get_summary_service
             from apps.core.services.supabase import get_supabase_client
             from apps.core.utils import format_timestamp
 
             # Initialize AI service
-            ai_service = CallSummaryService()
+            ai_service = get_summary_service()
 
             # Generate summary
             summary_data = ai_service.generate_summary(session_id)
@@ -516,6 +517,7 @@ class GenerateSummaryView(APIView):
                         'call_summary_error': None,  # Clear any cached error
                     }).eq('id', session_id).execute()
                     logger.info(f"✅ Updated database with successful summary for session {session_id}")
+                    invalidate_analytics()
                 except Exception as db_error:
                     logger.error(f"Failed to update database for session {session_id}: {db_error}", exc_info=True)
                     # Continue and return the summary even if DB update fails
@@ -541,12 +543,12 @@ class GenerateScorecardView(APIView):
 
     def post(self, request, session_id):
         try:
-            from apps.ai.services import CallSummaryService
+            from apps.ai.services import get_summary_service
             from apps.core.services.supabase import get_supabase_client
             from apps.core.utils import format_timestamp
 
             # Initialize AI service
-            ai_service = CallSummaryService()
+            ai_service = get_summary_service()
 
             # Generate scorecard
             scorecard_data = ai_service.generate_scorecard(session_id)
@@ -564,6 +566,7 @@ class GenerateScorecardView(APIView):
                         'call_scorecard_error': None,  # Clear any cached error
                     }).eq('id', session_id).execute()
                     logger.info(f"✅ Updated database with successful scorecard for session {session_id}")
+                    invalidate_analytics()
                 except Exception as db_error:
                     logger.error(f"Failed to update database for session {session_id}: {db_error}", exc_info=True)
                     # Continue and return the scorecard even if DB update fails
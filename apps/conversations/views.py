@@ -15,6 +15,7 @@ from rest_framework.parsers import MultiPartParser, JSONParser
 from rest_framework.permissions import AllowAny
 from django.conf import settings
 
+from apps.analytics.services.cache import invalidate_analytics
 from apps.core.services.supabase import get_supabase_client
 from apps.core.utils import format_timestamp, retry_on_exception
 
@@ -167,6 +168,8 @@ class UploadView(APIView):
                 }
 
                 supabase.table(table_name).insert(session_data).execute()
+                # New sessions count towards call volume analytics
+                invalidate_analytics()
                 logger.info(
                     f"✅ Created transcription session {session_id} in Supabase"
                 )
@@ -382,6 +385,8 @@ class SimulateView(APIView):
                     }
 
                     response = supabase.table(table_name).insert(session_data).execute()
+                    # New sessions count towards call volume analytics
+                    invalidate_analytics()
 
                     logger.info(
                         f"Created transcription session {session_id} in Supabase"
@@ -10,6 +10,7 @@ from supabase import create_client, Client
 from django.conf import settings
 import logging
 import os
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,7 @@ for var in _proxy_vars:
         del os.environ[var]
 
 _supabase_client: Optional[Client] = None
+_supabase_client_lock = threading.Lock()
 _supabase_auth_client: Optional[Client] = None
 
 
@@ -33,7 +35,8 @@ def get_supabase_client() -> Optional[Client]:
     
     This client has admin privileges and should be used for operations that
     require elevated permissions. Uses singleton pattern to reuse the same
-    client instance across the application.
+    client instance (and its keep-alive HTTP connection pool) across the
+    application; creation is locked so concurrent first calls share it.
     
     Returns:
         Optional[Client]: Supabase client instance, or None if configuration is missing
@@ -53,19 +56,25 @@ def get_supabase_client() -> Optional[Client]:
         logger.warning('Supabase configuration incomplete - missing URL or service role key')
         return None
     
-    try:
-        # Proxy env vars already unset at module load, so create client directly
-        # Service role key automatically bypasses RLS in Supabase v1.2.0
-        _supabase_client = create_client(
-            config.url,
-            config.service_role_key
-        )
-        logger.debug('Supabase client created successfully with service role authorization')
-        return _supabase_client
-    except Exception as e:
-        logger.error(f'Failed to create Supabase client: {e}')
-        # Return None to allow fallback to mock authentication
-        return None
+    # Analytics queries run on worker threads; without the lock each thread
+    # racing the first call would build its own client and connection pool
+    with _supabase_client_lock:
+        if _supabase_client is not None:
+            return _supabase_client
+        
+        try:
+            # Proxy env vars already unset at module load, so create client directly
+            # Service role key automatically bypasses RLS in Supabase v1.2.0
+            _supabase_client = create_client(
+                config.url,
+                config.service_role_key
+            )
+            logger.debug('Supabase client created successfully with service role authorization')
+            return _supabase_client
+        except Exception as e:
+            logger.error(f'Failed to create Supabase client: {e}')
+            # Return None to allow fallback to mock authentication
+            return None
 
 
 def get_supabase_auth_client() -> Optional[Client]:
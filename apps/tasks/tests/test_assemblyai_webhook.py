@@ -0,0 +1,126 @@
+"""
+Tests for the AssemblyAI transcription webhook.
+"""
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from rest_framework.test import APIRequestFactory
+
+from apps.tasks.views import AssemblyAIWebhookView
+
+TRANSCRIPT_ID = 'transcript-123'
+SESSION_ID = 'session-abc'
+
+
+def _supabase_with_session(session):
+    """Supabase mock whose session lookup by transcript ID returns session (or nothing)."""
+    supabase = mock.MagicMock()
+    lookup = supabase.table.return_value.select.return_value.eq.return_value.limit.return_value
+    lookup.execute.return_value.data = [session] if session else []
+    return supabase
+
+
+def _session(status='transcribing'):
+    return {
+        'id': SESSION_ID,
+        'status': status,
+        'metadata': {'assemblyaiTranscriptId': TRANSCRIPT_ID, 'storagePath': 'audio/call.wav'},
+        'audio_storage_path': 'audio/call.wav',
+    }
+
+
+def _post(body, headers=None):
+    request = APIRequestFactory().post('/api/tasks/assemblyai-webhook/', body, format='json', headers=headers)
+    return AssemblyAIWebhookView.as_view()(request)
+
+
+def _failed_updates(supabase):
+    return [
+        call for call in supabase.table.return_value.update.call_args_list
+        if call.args[0] == {'status': 'failed'}
+    ]
+
+
+@pytest.fixture(autouse=True)
+def no_webhook_auth():
+    with mock.patch.object(settings.APP_SETTINGS.ai, 'assemblyai_webhook_auth_header_name', ''), \
+            mock.patch.object(settings.APP_SETTINGS.ai, 'assemblyai_webhook_auth_header_value', ''):
+        yield
+
+
+def test_rejects_missing_or_wrong_auth_header():
+    supabase = _supabase_with_session(_session())
+    with mock.patch.object(settings.APP_SETTINGS.ai, 'assemblyai_webhook_auth_header_name', 'X-Webhook-Secret'), \
+            mock.patch.object(settings.APP_SETTINGS.ai, 'assemblyai_webhook_auth_header_value', 'secret'), \
+            mock.patch('apps.tasks.views.get_supabase_client', return_value=supabase):
+        body = {'transcript_id': TRANSCRIPT_ID, 'status': 'completed'}
+
+        assert _post(body).status_code == 401
+        assert _post(body, headers={'X-Webhook-Secret': 'wrong'}).status_code == 401
+
+    supabase.table.assert_not_called()
+
+
+def test_unknown_transcript_is_acknowledged():
+    supabase = _supabase_with_session(None)
+    with mock.patch('apps.tasks.views.get_supabase_client', return_value=supabase), \
+            mock.patch('apps.tasks.views._process_transcription_turns') as process:
+        response = _post({'transcript_id': 'unknown', 'status': 'completed'})
+
+    assert response.status_code == 200
+    assert response.data['success'] is False
+    process.assert_not_called()
+
+
+def test_error_status_marks_session_failed_without_retry():
+    supabase = _supabase_with_session(_session())
+    with mock.patch('apps.tasks.views.get_supabase_client', return_value=supabase), \
+            mock.patch('apps.tasks.views._process_transcription_turns') as process:
+        response = _post({'transcript_id': TRANSCRIPT_ID, 'status': 'error'})
+
+    # 200 so AssemblyAI does not resend a transcript that cannot succeed
+    assert response.status_code == 200
+    assert response.data['success'] is False
+    assert len(_failed_updates(supabase)) == 1
+    process.assert_not_called()
+
+
+def test_completed_transcript_is_processed():
+    supabase = _supabase_with_session(_session())
+    transcription_service = mock.MagicMock()
+    transcription_service.fetch_transcription.return_value = ['turn-1', 'turn-2']
+    with mock.patch('apps.tasks.views.get_supabase_client', return_value=supabase), \
+            mock.patch('apps.ai.transcription_service.get_transcription_service', return_value=transcription_service), \
+            mock.patch('apps.tasks.views._process_transcription_turns') as process:
+        response = _post({'transcript_id': TRANSCRIPT_ID, 'status': 'completed'})
+
+    assert response.status_code == 200
+    assert response.data['success'] is True
+    assert response.data['turnsCount'] == 2
+    process.assert_called_once_with(supabase, SESSION_ID, 'audio/call.wav', ['turn-1', 'turn-2'])
+
+
+def test_repeated_delivery_for_transcribed_session_is_skipped():
+    supabase = _supabase_with_session(_session(status='transcribed'))
+    with mock.patch('apps.tasks.views.get_supabase_client', return_value=supabase), \
+            mock.patch('apps.tasks.views._process_transcription_turns') as process:
+        response = _post({'transcript_id': TRANSCRIPT_ID, 'status': 'completed'})
+
+    assert response.status_code == 200
+    assert response.data['success'] is True
+    process.assert_not_called()
+    assert _failed_updates(supabase) == []
+
+
+def test_processing_failure_is_retryable():
+    supabase = _supabase_with_session(_session())
+    transcription_service = mock.MagicMock()
+    transcription_service.fetch_transcription.return_value = ['turn-1']
+    with mock.patch('apps.tasks.views.get_supabase_client', return_value=supabase), \
+            mock.patch('apps.ai.transcription_service.get_transcription_service', return_value=transcription_service), \
+            mock.patch('apps.tasks.views._process_transcription_turns', side_effect=RuntimeError('insert failed')):
+        response = _post({'transcript_id': TRANSCRIPT_ID, 'status': 'completed'})
+
+    assert response.status_code == 500
+    assert len(_failed_updates(supabase)) == 1
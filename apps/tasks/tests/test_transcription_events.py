@@ -0,0 +1,47 @@
+"""
+Tests for pruning stale transcription events on reprocessing.
+"""
+from unittest import mock
+
+from apps.tasks import views
+from apps.tasks.views import _delete_stale_events
+
+SESSION_ID = 'session-abc'
+
+
+def _supabase_with_event_pages(*pages):
+    """Supabase mock whose paged event ID reads return pages in order."""
+    supabase = mock.MagicMock()
+    read = supabase.table.return_value.select.return_value.eq.return_value.order.return_value.range.return_value
+    read.execute.side_effect = [mock.Mock(data=[{'id': event_id} for event_id in page]) for page in pages]
+    return supabase
+
+
+def _deleted_batches(supabase):
+    return [call.args[1] for call in supabase.table.return_value.delete.return_value.in_.call_args_list]
+
+
+def test_deletes_events_not_in_the_new_transcript():
+    supabase = _supabase_with_event_pages(['turn-0', 'turn-1', 'turn-2', 'random-id'])
+
+    deleted = _delete_stale_events(supabase, 'transcription_events', SESSION_ID, {'turn-0', 'turn-1'})
+
+    assert deleted == 2
+    assert _deleted_batches(supabase) == [['turn-2', 'random-id']]
+
+
+def test_nothing_deleted_when_reprocessing_the_same_transcript():
+    supabase = _supabase_with_event_pages(['turn-0', 'turn-1'])
+
+    assert _delete_stale_events(supabase, 'transcription_events', SESSION_ID, {'turn-0', 'turn-1'}) == 0
+    supabase.table.return_value.delete.assert_not_called()
+
+
+def test_reads_every_page_and_deletes_in_batches():
+    with mock.patch.object(views, '_EVENT_PAGE_SIZE', 3), mock.patch.object(views, '_EVENT_DELETE_BATCH', 2):
+        supabase = _supabase_with_event_pages(['a', 'b', 'keep'], ['c', 'd'])
+
+        deleted = _delete_stale_events(supabase, 'transcription_events', SESSION_ID, {'keep'})
+
+    assert deleted == 4
+    assert _deleted_batches(supabase) == [['a', 'b'], ['c', 'd']]
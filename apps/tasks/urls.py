@@ -9,6 +9,8 @@ app_name = 'tasks'
 urlpatterns = [
     path('transcribe-audio/', views.TranscribeAudioView.as_view(), name='transcribe-audio'),
     path('transcribe-audio', views.TranscribeAudioView.as_view(), name='transcribe-audio-no-slash'),  # Without trailing slash
+    path('assemblyai-webhook/', views.AssemblyAIWebhookView.as_view(), name='assemblyai-webhook'),
+    path('assemblyai-webhook', views.AssemblyAIWebhookView.as_view(), name='assemblyai-webhook-no-slash'),  # Without trailing slash
     path('generate-ai-analysis/', views.GenerateAIAnalysisView.as_view(), name='generate-ai-analysis'),
     path('generate-ai-analysis', views.GenerateAIAnalysisView.as_view(), name='generate-ai-analysis-no-slash'),  # Without trailing slash
     path('start-spy-call/', views.StartSpyCallView.as_view(), name='start-spy-call'),
@@ -3,6 +3,7 @@ Cloud Tasks handler views for async transcription and AI analysis.
 """
 import sys
 import os
+import hmac
 import logging
 from datetime import datetime, timedelta, timezone
 
@@ -17,9 +18,324 @@ from django.utils.decorators import method_decorator
 
 from apps.core.services.supabase import get_supabase_client
 from apps.core.utils import format_timestamp
+from apps.analytics.services.cache import invalidate_analytics
 
 logger = logging.getLogger(__name__)
 
+# Session statuses reached once a transcript's turns have been stored
+_TRANSCRIBED_STATUSES = ('transcribed', 'analyzing', 'completed')
+
+
+def _mark_session_failed(supabase, table_name, session_id):
+    """Set a session's status to failed, logging (not raising) on error."""
+    try:
+        supabase.table(table_name).update({
+            'status': 'failed',  # Use 'failed' instead of 'error' to match database constraint
+        }).eq('id', session_id).execute()
+    except Exception as update_error:
+        logger.error(f'Failed to update session status to failed: {update_error}')
+
+
+# Page size for reading back a session's event IDs, and batch size for
+# deleting stale ones (IDs go in the URL, so batches stay small)
+_EVENT_PAGE_SIZE = 1000
+_EVENT_DELETE_BATCH = 100
+
+
+def _delete_stale_events(supabase, events_table, session_id, keep_ids):
+    """
+    Delete a session's transcription events whose IDs are not in keep_ids.
+
+    Reprocessing upserts events by deterministic ID, so rows left over from
+    an earlier transcript with more turns (or from sessions first stored
+    with random event IDs) have to be removed separately.
+
+    Returns:
+        int: Number of events deleted
+    """
+    stale_ids = []
+    offset = 0
+    while True:
+        rows = (
+            supabase.table(events_table)
+            .select('id')
+            .eq('session_id', session_id)
+            .order('id')
+            .range(offset, offset + _EVENT_PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        stale_ids.extend(row['id'] for row in rows if row['id'] not in keep_ids)
+        if len(rows) < _EVENT_PAGE_SIZE:
+            break
+        offset += _EVENT_PAGE_SIZE
+
+    for start in range(0, len(stale_ids), _EVENT_DELETE_BATCH):
+        supabase.table(events_table).delete().in_('id', stale_ids[start:start + _EVENT_DELETE_BATCH]).execute()
+    return len(stale_ids)
+
+
+def _process_transcription_turns(supabase, session_id, storage_path, turns):
+    """
+    Persist transcription turns for a session and queue AI analysis.
+
+    Shared by the blocking transcription task and the AssemblyAI webhook:
+    upserts one transcription event per turn (dropping the session's
+    events from any earlier transcript), marks the session as transcribed
+    with a metadata summary, then queues AI analysis.
+
+    Args:
+        supabase: Supabase client
+        session_id: The transcription session ID
+        storage_path: Storage path of the uploaded audio
+        turns: List of ConversationTurn from the transcription service
+    """
+    from apps.core.services.cloud_tasks import enqueue_ai_analysis_task
+    import uuid
+
+    config = settings.APP_SETTINGS.supabase
+    table_name = config.sessions_table
+    events_table = config.events_table
+
+    # Step 3: Fetch session metadata to include in event payloads (matches old backend structure)
+    logger.debug(f'Fetching session metadata for event payloads of session {session_id}')
+    session_metadata_payload = {
+        'source': 'audio-upload',  # Default source
+        'storagePath': storage_path,  # Use storage_path from request
+        'uploadedAt': None,
+        'originalName': None
+    }
+    
+    try:
+        session_response = supabase.table(table_name).select('metadata, audio_storage_path, created_at').eq('id', session_id).execute()
+        if session_response.data and len(session_response.data) > 0:
+            session_data = session_response.data[0]
+            session_metadata = session_data.get('metadata', {})
+            
+            # Extract session metadata fields (same structure as old backend)
+            if isinstance(session_metadata, dict):
+                session_metadata_payload['source'] = session_metadata.get('source', 'audio-upload')
+                session_metadata_payload['storagePath'] = session_metadata.get('storagePath') or session_data.get('audio_storage_path') or storage_path
+                session_metadata_payload['originalName'] = session_metadata.get('originalName')
+                session_metadata_payload['uploadedAt'] = session_metadata.get('uploadedAt') or session_data.get('created_at')
+            
+            logger.debug(f'Fetched session metadata for {session_id}: {session_metadata_payload}')
+    except Exception as e:
+        logger.warning(f'Failed to fetch session metadata: {e} - using defaults')
+    
+    # Step 4: Convert turns to Supabase event format and insert
+    logger.debug(f'Converting {len(turns)} turns to Supabase event format')
+    now = datetime.now(timezone.utc)
+    finalized_at = format_timestamp(now)
+    ended_at = format_timestamp(now)
+    
+    # Build full transcript text (all turns combined)
+    full_transcript_lines = []
+    for turn in turns:
+        if turn.text:
+            full_transcript_lines.append(f"{turn.speaker}: {turn.text}")
+    full_transcript = '\n'.join(full_transcript_lines)
+    
+    events = []
+    
+    for idx, turn in enumerate(turns):
+        # Generate unique turnId for each turn
+        turn_id = str(uuid.uuid4())
+        
+        # Calculate timestamp based on start_time_ms or use sequential timing
+        if turn.start_time_ms:
+            # Use actual timestamp from audio
+            event_time = now + timedelta(milliseconds=turn.start_time_ms)
+        else:
+            # Fallback to sequential timing
+            event_time = now + timedelta(seconds=idx * 5)
+        
+        # Build payload matching old backend structure exactly:
+        # Old backend includes: source, turnId, startTime, endTime, duration, sentiment, confidence,
+        # totalTurns, finalizedAt, endedAt, simulationId, fullTranscript, storagePath, originalName, uploadedAt
+        turn_metadata = turn.metadata  # Contains speaker_label, transcript_id, etc.
+        
+        # Get timing values (convert from _ms to camelCase to match old backend)
+        start_time = turn.start_time_ms
+        end_time = turn.end_time_ms
+        duration = turn.duration_ms
+        
+        event_payload = {
+            # Session metadata (from session record)
+            'source': 'audio-file',  # Old backend uses 'audio-file', not 'audio-upload'
+            'storagePath': session_metadata_payload['storagePath'],
+            'originalName': session_metadata_payload.get('originalName'),
+            'uploadedAt': session_metadata_payload.get('uploadedAt'),
+            # Transcription turn metadata (matching old backend field names)
+            'turnId': turn_id,
+            'startTime': start_time,  # Old backend uses startTime (not start_time_ms)
+            'endTime': end_time,  # Old backend uses endTime (not end_time_ms)
+            'duration': duration,  # Old backend uses duration (not duration_ms)
+            'sentiment': turn.sentiment,
+            'confidence': turn.confidence,
+            # Session-level metadata (same for all turns)
+            'simulationId': session_id,  # session_id is the simulationId
+            'totalTurns': len(turns),
+            'fullTranscript': full_transcript,
+            'finalizedAt': finalized_at,
+            'endedAt': ended_at,
+            # PII and other fields
+            'pii_entities_detected': turn.pii_entities_detected,
+        }
+        
+        # Add turn-specific metadata (speaker_label, transcript_id, etc.) directly to payload
+        # This matches the old backend structure where all metadata is flat
+        if turn_metadata:
+            event_payload.update(turn_metadata)
+        
+        # Remove None values to keep payload clean
+        event_payload = {k: v for k, v in event_payload.items() if v is not None}
+        
+        event = {
+            # Deterministic per session and turn, so reprocessing the same
+            # transcript (webhook retries) upserts rows instead of duplicating them
+            'id': str(uuid.uuid5(uuid.NAMESPACE_URL, f'{session_id}:{idx}')),
+            'session_id': session_id,
+            'speaker': turn.speaker,
+            'text': turn.text,
+            'received_at': format_timestamp(event_time),
+            'payload': event_payload,
+            'pii_redacted': turn.pii_redacted
+        }
+        
+        events.append(event)
+    
+    # Step 5: Batch insert events
+    logger.debug(f'Upserting {len(events)} transcription events into {events_table}')
+    try:
+        result = supabase.table(events_table).upsert(events).execute()
+        logger.info(f'Created {len(events)} transcription events for session {session_id}')
+    except Exception as e:
+        logger.error(f'Failed to insert transcription events: {e}', exc_info=True)
+        raise
+    
+    try:
+        deleted = _delete_stale_events(supabase, events_table, session_id, {event['id'] for event in events})
+        if deleted:
+            logger.info(f'Deleted {deleted} stale transcription events for session {session_id}')
+    except Exception as e:
+        logger.error(f'Failed to delete stale transcription events: {e}', exc_info=True)
+        raise
+    
+    # Step 6: Update session status to transcribed and finalize metadata
+    logger.debug(f'Updating session {session_id} status to transcribed')
+    now = format_timestamp()
+    
+    # Fetch existing session metadata to preserve it
+    try:
+        existing_session = supabase.table(table_name).select('metadata').eq('id', session_id).execute()
+        existing_metadata = {}
+        if existing_session.data and len(existing_session.data) > 0:
+            existing_metadata = existing_session.data[0].get('metadata', {}) or {}
+    except Exception as e:
+        logger.warning(f'Failed to fetch existing session metadata: {e} - will use defaults')
+        existing_metadata = {}
+    
+    # Get last turn data for session metadata (matching old backend structure)
+    # The session metadata includes the last turn's metadata plus session summary
+    last_turn = turns[-1] if turns else None
+    last_turn_id = None
+    last_start_time = None
+    last_end_time = None
+    last_duration = None
+    last_sentiment = None
+    last_confidence = None
+    
+    if last_turn:
+        # Get data from the last event we created (has all the processed fields)
+        if events:
+            last_event_payload = events[-1].get('payload', {})
+            last_turn_id = last_event_payload.get('turnId')
+            last_start_time = last_event_payload.get('startTime')
+            last_end_time = last_event_payload.get('endTime')
+            last_duration = last_event_payload.get('duration')
+            last_sentiment = last_event_payload.get('sentiment')
+            last_confidence = last_event_payload.get('confidence')
+        
+        # Fallback to turn data if not in payload yet
+        if not last_turn_id:
+            last_start_time = last_turn.start_time_ms
+            last_end_time = last_turn.end_time_ms
+            last_duration = last_turn.duration_ms
+            last_sentiment = last_turn.sentiment
+            last_confidence = last_turn.confidence
+    
+    # Calculate duration in seconds from last turn's endTime (if available)
+    duration_seconds = None
+    if last_end_time:
+        duration_seconds = int(last_end_time / 1000)  # Convert ms to seconds
+    elif last_duration:
+        duration_seconds = int(last_duration / 1000)  # duration is already in ms
+    
+    # Update session metadata with transcription summary (matching old backend structure exactly)
+    # Exact order: source, turnId, endTime, endedAt, duration, sentiment, startTime, confidence, totalTurns, finalizedAt, simulationId, fullTranscript
+    # Also preserve existing fields: storagePath, originalName, uploadedAt (will be added after core fields)
+    
+    # Build metadata in exact order specified
+    updated_metadata = {
+        'source': 'audio-file',  # Old backend uses 'audio-file', not 'audio-upload'
+        'turnId': last_turn_id,
+        'endTime': last_end_time,
+        'endedAt': ended_at,
+        'duration': duration_seconds if duration_seconds is not None else last_duration,
+        'sentiment': last_sentiment,
+        'startTime': last_start_time,
+        'confidence': last_confidence,
+        'totalTurns': len(turns),
+        'finalizedAt': finalized_at,
+        'simulationId': session_id,
+        'fullTranscript': full_transcript,
+    }
+    
+    # Preserve existing session metadata fields (storagePath, originalName, uploadedAt) that aren't in core fields
+    preserved_fields = {k: v for k, v in existing_metadata.items() 
+                      if k not in ['source', 'turnId', 'endTime', 'endedAt', 'duration', 'sentiment', 
+                                 'startTime', 'confidence', 'totalTurns', 'finalizedAt', 'simulationId', 'fullTranscript']}
+    updated_metadata.update(preserved_fields)
+    
+    # Remove None values but keep 0, False, and empty strings
+    updated_metadata = {k: v for k, v in updated_metadata.items() if v is not None}
+    
+    result = supabase.table(table_name).update({
+        'status': 'transcribed',
+        'metadata': updated_metadata
+    }).eq('id', session_id).execute()
+    
+    # Transcript metadata (duration, turns) feeds call analytics
+    invalidate_analytics()
+    
+    logger.info(f'Updated session {session_id} status to transcribed with {len(turns)} turns')
+    
+    # Step 7: Queue AI analysis task (Cloud Tasks or local processing)
+    cloud_tasks_config = settings.APP_SETTINGS.cloud_tasks
+
+    if cloud_tasks_config.enabled:
+        # Production/Staging: Use Cloud Tasks
+        service_url = os.getenv('CLOUD_RUN_SERVICE_URL')
+        if not service_url:
+            k_service = os.getenv('K_SERVICE')
+            if k_service:
+                service_url = f'https://verc-app-staging-clw2hnetfa-uk.a.run.app'
+            else:
+                service_url = 'https://verc-app-staging-clw2hnetfa-uk.a.run.app'
+
+        logger.info(f'Using service URL for AI analysis task: {service_url}')
+
+        ai_task_queued = enqueue_ai_analysis_task(session_id, service_url)
+        if ai_task_queued:
+            logger.info(f'✅ AI analysis task queued for session {session_id}')
+        else:
+            logger.warning(f'Failed to queue AI analysis task for session {session_id}')
+    else:
+        # Local development: Use background processing
+        from apps.core.services.background_tasks import process_ai_analysis_locally
+        logger.info(f'🔵 Triggering local AI analysis for session {session_id}')
+        process_ai_analysis_locally(session_id)
+
 
 @method_decorator(csrf_exempt, name='dispatch')
 class TranscribeAudioView(APIView):
@@ -101,13 +417,10 @@ class TranscribeAudioView(APIView):
             )
         
         try:
-            from apps.core.services.cloud_tasks import enqueue_ai_analysis_task
             from apps.ai.transcription_service import get_transcription_service
-            import uuid
             
             config = settings.APP_SETTINGS.supabase
             table_name = config.sessions_table
-            events_table = config.events_table
             bucket = config.audio_bucket
             
             print(f'[TASK] Starting real transcription for session {session_id}, storage_path={storage_path}', file=sys.stderr, flush=True)
@@ -174,6 +487,36 @@ class TranscribeAudioView(APIView):
                 logger.error(error_msg)
                 raise Exception(error_msg)
             
+            # Webhook mode: submit and return; AssemblyAIWebhookView finishes
+            # processing when the transcript is ready, so this request does not
+            # block while AssemblyAI transcribes
+            if transcription_service.webhook_enabled:
+                transcript_id = transcription_service.submit_transcription(signed_url)
+                
+                try:
+                    existing_session = supabase.table(table_name).select('metadata').eq('id', session_id).execute()
+                    existing_metadata = {}
+                    if existing_session.data:
+                        existing_metadata = existing_session.data[0].get('metadata', {}) or {}
+                except Exception as e:
+                    logger.warning(f'Failed to fetch existing session metadata: {e} - will use defaults')
+                    existing_metadata = {}
+                
+                # Persist transcript_id -> session mapping for the webhook
+                existing_metadata['assemblyaiTranscriptId'] = transcript_id
+                existing_metadata.setdefault('storagePath', storage_path)
+                supabase.table(table_name).update({
+                    'metadata': existing_metadata
+                }).eq('id', session_id).execute()
+                
+                logger.info(f'Transcription submitted for session {session_id}: transcript_id={transcript_id}')
+                return Response({
+                    'success': True,
+                    'sessionId': session_id,
+                    'transcriptId': transcript_id,
+                    'message': 'Transcription submitted - results will be processed via webhook'
+                }, status=status.HTTP_202_ACCEPTED)
+            
             # Speaker mapping: A = agent, B = customer (default)
             speaker_mapping = {'A': 'agent', 'B': 'customer'}
             
@@ -197,251 +540,7 @@ class TranscribeAudioView(APIView):
             print(f'[TASK] ✅ Transcription completed: {len(turns)} turns', file=sys.stderr, flush=True)
             logger.info(f'Transcription completed: {len(turns)} turns for session {session_id}')
             
-            # Step 3: Fetch session metadata to include in event payloads (matches old backend structure)
-            print(f'[TASK] Fetching session metadata for event payloads...', file=sys.stderr, flush=True)
-            session_metadata_payload = {
-                'source': 'audio-upload',  # Default source
-                'storagePath': storage_path,  # Use storage_path from request
-                'uploadedAt': None,
-                'originalName': None
-            }
-            
-            try:
-                session_response = supabase.table(table_name).select('metadata, audio_storage_path, created_at').eq('id', session_id).execute()
-                if session_response.data and len(session_response.data) > 0:
-                    session_data = session_response.data[0]
-                    session_metadata = session_data.get('metadata', {})
-                    
-                    # Extract session metadata fields (same structure as old backend)
-                    if isinstance(session_metadata, dict):
-                        session_metadata_payload['source'] = session_metadata.get('source', 'audio-upload')
-                        session_metadata_payload['storagePath'] = session_metadata.get('storagePath') or session_data.get('audio_storage_path') or storage_path
-                        session_metadata_payload['originalName'] = session_metadata.get('originalName')
-                        session_metadata_payload['uploadedAt'] = session_metadata.get('uploadedAt') or session_data.get('created_at')
-                    
-                    logger.debug(f'Fetched session metadata for {session_id}: {session_metadata_payload}')
-            except Exception as e:
-                logger.warning(f'Failed to fetch session metadata: {e} - using defaults')
-            
-            # Step 4: Convert turns to Supabase event format and insert
-            print(f'[TASK] Converting {len(turns)} turns to Supabase event format...', file=sys.stderr, flush=True)
-            now = datetime.now(timezone.utc)
-            finalized_at = format_timestamp(now)
-            ended_at = format_timestamp(now)
-            
-            # Build full transcript text (all turns combined)
-            full_transcript_lines = []
-            for turn in turns:
-                speaker = turn.get('speaker', 'unknown')
-                text = turn.get('text', '')
-                if text:
-                    full_transcript_lines.append(f"{speaker}: {text}")
-            full_transcript = '\n'.join(full_transcript_lines)
-            
-            events = []
-            
-            for idx, turn in enumerate(turns):
-                # Generate unique turnId for each turn
-                turn_id = str(uuid.uuid4())
-                
-                # Calculate timestamp based on start_time_ms or use sequential timing
-                if turn.get('start_time_ms'):
-                    # Use actual timestamp from audio
-                    event_time = now + timedelta(milliseconds=turn['start_time_ms'])
-                else:
-                    # Fallback to sequential timing
-                    event_time = now + timedelta(seconds=idx * 5)
-                
-                # Build payload matching old backend structure exactly:
-                # Old backend includes: source, turnId, startTime, endTime, duration, sentiment, confidence,
-                # totalTurns, finalizedAt, endedAt, simulationId, fullTranscript, storagePath, originalName, uploadedAt
-                turn_metadata = turn.get('metadata', {})  # Contains speaker_label, transcript_id, etc.
-                
-                # Get timing values (convert from _ms to camelCase to match old backend)
-                start_time = turn.get('start_time_ms')
-                end_time = turn.get('end_time_ms')
-                duration = turn.get('duration_ms')
-                
-                event_payload = {
-                    # Session metadata (from session record)
-                    'source': 'audio-file',  # Old backend uses 'audio-file', not 'audio-upload'
-                    'storagePath': session_metadata_payload['storagePath'],
-                    'originalName': session_metadata_payload.get('originalName'),
-                    'uploadedAt': session_metadata_payload.get('uploadedAt'),
-                    # Transcription turn metadata (matching old backend field names)
-                    'turnId': turn_id,
-                    'startTime': start_time,  # Old backend uses startTime (not start_time_ms)
-                    'endTime': end_time,  # Old backend uses endTime (not end_time_ms)
-                    'duration': duration,  # Old backend uses duration (not duration_ms)
-                    'sentiment': turn.get('sentiment'),
-                    'confidence': turn.get('confidence'),
-                    # Session-level metadata (same for all turns)
-                    'simulationId': session_id,  # session_id is the simulationId
-                    'totalTurns': len(turns),
-                    'fullTranscript': full_transcript,
-                    'finalizedAt': finalized_at,
-                    'endedAt': ended_at,
-                    # PII and other fields
-                    'pii_entities_detected': turn.get('pii_entities_detected'),
-                }
-                
-                # Add turn-specific metadata (speaker_label, transcript_id, etc.) directly to payload
-                # This matches the old backend structure where all metadata is flat
-                if turn_metadata:
-                    event_payload.update(turn_metadata)
-                
-                # Remove None values to keep payload clean
-                event_payload = {k: v for k, v in event_payload.items() if v is not None}
-                
-                # Debug: Log first event payload structure for verification
-                if idx == 0:
-                    print(f'[TASK] 📋 First event payload keys: {list(event_payload.keys())}', file=sys.stderr, flush=True)
-                    print(f'[TASK] 📋 First event payload sample: {str(event_payload)[:500]}', file=sys.stderr, flush=True)
-                
-                event = {
-                    'id': str(uuid.uuid4()),
-                    'session_id': session_id,
-                    'speaker': turn.get('speaker', 'unknown'),
-                    'text': turn.get('text', ''),
-                    'received_at': format_timestamp(event_time),
-                    'payload': event_payload,
-                    'pii_redacted': turn.get('pii_redacted', False)
-                }
-                
-                events.append(event)
-            
-            # Step 5: Batch insert events
-            print(f'[TASK] Inserting {len(events)} transcription events into {events_table}...', file=sys.stderr, flush=True)
-            # Debug: Show what's being inserted
-            if events:
-                first_event_payload_keys = list(events[0].get('payload', {}).keys())
-                print(f'[TASK] 📋 First event payload contains {len(first_event_payload_keys)} keys: {first_event_payload_keys}', file=sys.stderr, flush=True)
-            try:
-                result = supabase.table(events_table).insert(events).execute()
-                print(f'[TASK] ✅ Successfully inserted {len(events)} transcription events', file=sys.stderr, flush=True)
-                logger.info(f'Created {len(events)} transcription events for session {session_id}')
-            except Exception as e:
-                print(f'[TASK] ❌ Failed to insert transcription events: {e}', file=sys.stderr, flush=True)
-                import traceback
-                print(f'[TASK] Traceback: {traceback.format_exc()}', file=sys.stderr, flush=True)
-                logger.error(f'Failed to insert transcription events: {e}', exc_info=True)
-                raise
-            
-            # Step 6: Update session status to transcribed and finalize metadata
-            print(f'[TASK] Updating session {session_id} status to transcribed...', file=sys.stderr, flush=True)
-            now = format_timestamp()
-            
-            # Fetch existing session metadata to preserve it
-            try:
-                existing_session = supabase.table(table_name).select('metadata').eq('id', session_id).execute()
-                existing_metadata = {}
-                if existing_session.data and len(existing_session.data) > 0:
-                    existing_metadata = existing_session.data[0].get('metadata', {}) or {}
-            except Exception as e:
-                logger.warning(f'Failed to fetch existing session metadata: {e} - will use defaults')
-                existing_metadata = {}
-            
-            # Get last turn data for session metadata (matching old backend structure)
-            # The session metadata includes the last turn's metadata plus session summary
-            last_turn = turns[-1] if turns else None
-            last_turn_id = None
-            last_start_time = None
-            last_end_time = None
-            last_duration = None
-            last_sentiment = None
-            last_confidence = None
-            
-            if last_turn:
-                # Get data from the last event we created (has all the processed fields)
-                if events:
-                    last_event_payload = events[-1].get('payload', {})
-                    last_turn_id = last_event_payload.get('turnId')
-                    last_start_time = last_event_payload.get('startTime')
-                    last_end_time = last_event_payload.get('endTime')
-                    last_duration = last_event_payload.get('duration')
-                    last_sentiment = last_event_payload.get('sentiment')
-                    last_confidence = last_event_payload.get('confidence')
-                
-                # Fallback to turn data if not in payload yet
-                if not last_turn_id:
-                    last_start_time = last_turn.get('start_time_ms')
-                    last_end_time = last_turn.get('end_time_ms')
-                    last_duration = last_turn.get('duration_ms')
-                    last_sentiment = last_turn.get('sentiment')
-                    last_confidence = last_turn.get('confidence')
-            
-            # Calculate duration in seconds from last turn's endTime (if available)
-            duration_seconds = None
-            if last_end_time:
-                duration_seconds = int(last_end_time / 1000)  # Convert ms to seconds
-            elif last_duration:
-                duration_seconds = int(last_duration / 1000)  # duration is already in ms
-            
-            # Update session metadata with transcription summary (matching old backend structure exactly)
-            # Exact order: source, turnId, endTime, endedAt, duration, sentiment, startTime, confidence, totalTurns, finalizedAt, simulationId, fullTranscript
-            # Also preserve existing fields: storagePath, originalName, uploadedAt (will be added after core fields)
-            
-            # Build metadata in exact order specified
-            updated_metadata = {
-                'source': 'audio-file',  # Old backend uses 'audio-file', not 'audio-upload'
-                'turnId': last_turn_id,
-                'endTime': last_end_time,
-                'endedAt': ended_at,
-                'duration': duration_seconds if duration_seconds is not None else last_duration,
-                'sentiment': last_sentiment,
-                'startTime': last_start_time,
-                'confidence': last_confidence,
-                'totalTurns': len(turns),
-                'finalizedAt': finalized_at,
-                'simulationId': session_id,
-                'fullTranscript': full_transcript,
-            }
-            
-            # Preserve existing session metadata fields (storagePath, originalName, uploadedAt) that aren't in core fields
-            preserved_fields = {k: v for k, v in existing_metadata.items() 
-                              if k not in ['source', 'turnId', 'endTime', 'endedAt', 'duration', 'sentiment', 
-                                         'startTime', 'confidence', 'totalTurns', 'finalizedAt', 'simulationId', 'fullTranscript']}
-            updated_metadata.update(preserved_fields)
-            
-            # Remove None values but keep 0, False, and empty strings
-            updated_metadata = {k: v for k, v in updated_metadata.items() if v is not None}
-            
-            result = supabase.table(table_name).update({
-                'status': 'transcribed',
-                'metadata': updated_metadata
-            }).eq('id', session_id).execute()
-            
-            print(f'[TASK] ✅ Updated session {session_id} status to transcribed with metadata summary', file=sys.stderr, flush=True)
-            logger.info(f'Updated session {session_id} status to transcribed with {len(turns)} turns')
-            
-            # Step 7: Queue AI analysis task (Cloud Tasks or local processing)
-            cloud_tasks_config = settings.APP_SETTINGS.cloud_tasks
-
-            if cloud_tasks_config.enabled:
-                # Production/Staging: Use Cloud Tasks
-                service_url = os.getenv('CLOUD_RUN_SERVICE_URL')
-                if not service_url:
-                    k_service = os.getenv('K_SERVICE')
-                    if k_service:
-                        service_url = f'https://verc-app-staging-clw2hnetfa-uk.a.run.app'
-                    else:
-                        service_url = 'https://verc-app-staging-clw2hnetfa-uk.a.run.app'
-
-                logger.info(f'Using service URL for AI analysis task: {service_url}')
-
-                ai_task_queued = enqueue_ai_analysis_task(session_id, service_url)
-                if ai_task_queued:
-                    logger.info(f'✅ AI analysis task queued for session {session_id}')
-                    print(f'[TASK] ✅ AI analysis task queued', file=sys.stderr, flush=True)
-                else:
-                    logger.warning(f'Failed to queue AI analysis task for session {session_id}')
-                    print(f'[TASK] ⚠️ Failed to queue AI analysis task', file=sys.stderr, flush=True)
-            else:
-                # Local development: Use background processing
-                from apps.core.services.background_tasks import process_ai_analysis_locally
-                logger.info(f'🔵 Triggering local AI analysis for session {session_id}')
-                print(f'[TASK] 🔵 Triggering local AI analysis (Cloud Tasks disabled)', file=sys.stderr, flush=True)
-                process_ai_analysis_locally(session_id)
+            _process_transcription_turns(supabase, session_id, storage_path, turns)
             
             # Return success
             return Response({
@@ -477,6 +576,117 @@ class TranscribeAudioView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@method_decorator(csrf_exempt, name='dispatch')
+class AssemblyAIWebhookView(APIView):
+    """
+    POST /api/tasks/assemblyai-webhook
+    Complete a transcription submitted in webhook mode.
+    
+    Body (sent by AssemblyAI): { transcript_id, status }
+    
+    Note: When ASSEMBLYAI_WEBHOOK_AUTH_HEADER_NAME/VALUE are configured,
+    AssemblyAI sends that header and requests without it are rejected.
+    
+    Deliveries are idempotent: sessions that are already transcribed are
+    acknowledged without reprocessing, and transcription events have
+    deterministic IDs, so a retried delivery never duplicates them. Only
+    unexpected processing errors return 5xx (and are retried by AssemblyAI).
+    """
+    permission_classes = [AllowAny]  # Authenticated via the webhook auth header
+    parser_classes = [JSONParser]
+    
+    def post(self, request):
+        ai_config = settings.APP_SETTINGS.ai
+        header_name = ai_config.assemblyai_webhook_auth_header_name
+        header_value = ai_config.assemblyai_webhook_auth_header_value
+        if header_name and header_value:
+            received = request.headers.get(header_name, '')
+            if not hmac.compare_digest(received, header_value):
+                logger.warning('Rejected AssemblyAI webhook with invalid auth header')
+                return Response({'error': 'Unauthorized'}, status=status.HTTP_401_UNAUTHORIZED)
+        
+        transcript_id = request.data.get('transcript_id')
+        transcript_status = request.data.get('status')
+        
+        logger.info(f'AssemblyAI webhook received: transcript_id={transcript_id}, status={transcript_status}')
+        
+        if not transcript_id:
+            return Response({'error': 'Missing transcript_id'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        supabase = get_supabase_client()
+        if not supabase:
+            logger.error('Supabase client not available for AssemblyAI webhook')
+            return Response({'error': 'Supabase not available'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        
+        config = settings.APP_SETTINGS.supabase
+        table_name = config.sessions_table
+        
+        # Resolve the session this transcript was submitted for
+        session_response = supabase.table(table_name).select(
+            'id, status, metadata, audio_storage_path'
+        ).eq('metadata->>assemblyaiTranscriptId', transcript_id).limit(1).execute()
+        if not session_response.data:
+            logger.warning(f'No session found for AssemblyAI transcript {transcript_id}')
+            # Nothing to retry - acknowledge so AssemblyAI stops resending
+            return Response({'success': False, 'error': 'Unknown transcript'}, status=status.HTTP_200_OK)
+        
+        session = session_response.data[0]
+        session_id = session['id']
+        storage_path = (session.get('metadata') or {}).get('storagePath') or session.get('audio_storage_path')
+        
+        if session.get('status') in _TRANSCRIBED_STATUSES:
+            logger.info(f'Session {session_id} already transcribed - ignoring repeated webhook for transcript {transcript_id}')
+            return Response({
+                'success': True,
+                'sessionId': session_id,
+                'message': 'Transcript already processed'
+            }, status=status.HTTP_200_OK)
+        
+        if transcript_status == 'error':
+            logger.error(f'AssemblyAI transcription failed for transcript {transcript_id} (session {session_id})')
+            _mark_session_failed(supabase, table_name, session_id)
+            # A failed transcript will not succeed on retry - acknowledge it
+            return Response({
+                'success': False,
+                'error': 'Transcription failed',
+                'sessionId': session_id
+            }, status=status.HTTP_200_OK)
+        
+        try:
+            from apps.ai.transcription_service import get_transcription_service
+            
+            transcription_service = get_transcription_service()
+            if not transcription_service:
+                raise Exception('Transcription service not available - check ASSEMBLYAI_API_KEY configuration')
+            
+            turns = transcription_service.fetch_transcription(
+                transcript_id,
+                speaker_mapping={'A': 'agent', 'B': 'customer'}
+            )
+            if not turns:
+                raise Exception('No transcription turns returned from AssemblyAI - transcription may have failed silently')
+            
+            logger.info(f'Transcription completed: {len(turns)} turns for session {session_id}')
+            _process_transcription_turns(supabase, session_id, storage_path, turns)
+            
+            return Response({
+                'success': True,
+                'sessionId': session_id,
+                'message': 'Transcription webhook processed successfully',
+                'turnsCount': len(turns)
+            }, status=status.HTTP_200_OK)
+        
+        except Exception as e:
+            logger.error(f'Error processing AssemblyAI webhook for session {session_id}: {e}', exc_info=True)
+            _mark_session_failed(supabase, table_name, session_id)
+            # Retrying is safe (event IDs are deterministic) and may succeed
+            return Response({
+                'success': False,
+                'error': str(e),
+                'sessionId': session_id
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class GenerateAIAnalysisView(APIView):
     """
@@ -548,11 +758,11 @@ class GenerateAIAnalysisView(APIView):
         # Generate AI summary and scorecard using OpenAI
         if supabase:
             try:
-                from apps.ai.services import CallSummaryService
+                from apps.ai.services import get_summary_service
                 
                 # Initialize AI service (with error handling)
                 try:
-                    ai_service = CallSummaryService()
+                    ai_service = get_summary_service()
                 except ValueError as e:
                     logger.error(f'Failed to initialize AI service: {e}. OpenAI API key may not be configured.')
                     # Fall back to mock data if OpenAI is not configured
@@ -598,43 +808,59 @@ class GenerateAIAnalysisView(APIView):
                         'message': 'AI analysis task processed (mock - OpenAI not configured)'
                     }, status=status.HTTP_200_OK)
                 
-                # Generate summary and scorecard in parallel
                 summary_data = None
                 scorecard_data = None
                 summary_error = None
                 scorecard_error = None
                 
-                # Generate summary
-                try:
-                    logger.info(f'Generating summary for session {session_id}')
-                    summary_data = ai_service.generate_summary(session_id)
-                    logger.info(f'✅ Summary generated successfully for session {session_id}')
-                except Exception as e:
-                    summary_error = str(e)
-                    logger.error(f'❌ Summary generation failed for session {session_id}: {e}', exc_info=True)
-                    # Update status to failed
-                    config = settings.APP_SETTINGS.supabase
-                    table_name = config.sessions_table
-                    supabase.table(table_name).update({
-                        'call_summary_status': 'failed',
-                        'call_summary_error': summary_error,
-                    }).eq('id', session_id).execute()
-                
-                # Generate scorecard
+                # Generate both with a single OpenAI call (one transcript fetch,
+                # one round-trip); fall back to separate calls if it fails
                 try:
-                    logger.info(f'Generating scorecard for session {session_id}')
-                    scorecard_data = ai_service.generate_scorecard(session_id)
-                    logger.info(f'✅ Scorecard generated successfully for session {session_id}')
+                    logger.info(f'Generating summary and scorecard for session {session_id}')
+                    combined = ai_service.generate_summary_and_scorecard(session_id)
+                    summary_data = combined['summary']
+                    scorecard_data = combined['scorecard']
+                    logger.info(f'✅ Summary and scorecard generated successfully for session {session_id}')
                 except Exception as e:
-                    scorecard_error = str(e)
-                    logger.error(f'❌ Scorecard generation failed for session {session_id}: {e}', exc_info=True)
-                    # Update status to failed
+                    logger.warning(
+                        f'Combined AI analysis failed for session {session_id}, '
+                        f'falling back to separate calls: {e}'
+                    )
+
+                # Fall back to separate summary/scorecard calls, run concurrently
+                if summary_data is None or scorecard_data is None:
+                    try:
+                        logger.info(f'Generating summary and scorecard separately for session {session_id}')
+                        results = ai_service.generate_all(session_id)
+                    except Exception as e:
+                        results = {'summary': e, 'scorecard': e}
+
                     config = settings.APP_SETTINGS.supabase
                     table_name = config.sessions_table
-                    supabase.table(table_name).update({
-                        'call_scorecard_status': 'failed',
-                        'call_scorecard_error': scorecard_error,
-                    }).eq('id', session_id).execute()
+
+                    if isinstance(results['summary'], Exception):
+                        summary_error = str(results['summary'])
+                        logger.error(f'❌ Summary generation failed for session {session_id}: {summary_error}')
+                        # Update status to failed
+                        supabase.table(table_name).update({
+                            'call_summary_status': 'failed',
+                            'call_summary_error': summary_error,
+                        }).eq('id', session_id).execute()
+                    else:
+                        summary_data = results['summary']
+                        logger.info(f'✅ Summary generated successfully for session {session_id}')
+
+                    if isinstance(results['scorecard'], Exception):
+                        scorecard_error = str(results['scorecard'])
+                        logger.error(f'❌ Scorecard generation failed for session {session_id}: {scorecard_error}')
+                        # Update status to failed
+                        supabase.table(table_name).update({
+                            'call_scorecard_status': 'failed',
+                            'call_scorecard_error': scorecard_error,
+                        }).eq('id', session_id).execute()
+                    else:
+                        scorecard_data = results['scorecard']
+                        logger.info(f'✅ Scorecard generated successfully for session {session_id}')
                 
                 # Update session with results
                 config = settings.APP_SETTINGS.supabase
@@ -667,6 +893,8 @@ class GenerateAIAnalysisView(APIView):
                     result = supabase.table(table_name).update(update_data).eq('id', session_id).execute()
                     print(f'[AI_TASK] ✅ AI analysis completed for session {session_id}. Result: {result}', file=sys.stderr, flush=True)
                     logger.info(f'✅ AI analysis completed for session {session_id}')
+                    if summary_data or scorecard_data:
+                        invalidate_analytics()
                 else:
                     logger.warning(f'No AI analysis results to save for session {session_id}')
                     
@@ -1040,16 +1268,19 @@ class CleanupSpyCallView(APIView):
                     'sessionId': session_id
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            audio_bytes = download_result['audio_bytes']
+            audio_path = download_result['audio_path']
             content_type = download_result['content_type']
 
             # Step 5: Upload recording to Supabase Storage
             logger.info(f'[CLEANUP-SPY-TASK] Uploading recording to storage - SessionId={session_id}')
-            from apps.twilio.services import upload_recording_to_storage
+            from apps.twilio.services import upload_recording_to_storage, remove_recording_file
 
-            upload_result = upload_recording_to_storage(
-                session_id, recording_sid, audio_bytes, content_type
-            )
+            try:
+                upload_result = upload_recording_to_storage(
+                    session_id, recording_sid, audio_path, content_type
+                )
+            finally:
+                remove_recording_file(audio_path)
 
             if not upload_result['success']:
                 # Check if it's a duplicate error (file already uploaded by recording webhook)
@@ -4,13 +4,32 @@ Twilio service functions for SPY call management.
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioRestException
 from django.conf import settings
+from apps.analytics.services.cache import invalidate_analytics
 from apps.core.services.supabase import get_supabase_client
+import atexit
 import logging
+import os
+import tempfile
 import httpx
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# Recording downloads are streamed to disk in chunks of this size
+_DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MB
+
+# Shared HTTP client so repeated recording downloads from api.twilio.com reuse
+# pooled keep-alive connections instead of a new TCP+TLS handshake each time
+_HTTP_CLIENT = httpx.Client(
+    limits=httpx.Limits(
+        max_keepalive_connections=20,
+        max_connections=100,
+        keepalive_expiry=30.0,
+    ),
+    timeout=120.0,
+)
+atexit.register(_HTTP_CLIENT.close)
+
 
 def initiate_spy_call(extension: str, call_details: dict) -> dict:
     """
@@ -104,6 +123,8 @@ def initiate_spy_call(extension: str, call_details: dict) -> dict:
         result = supabase.table('transcription_sessions').insert(session_data).execute()
 
         if result.data:
+            # New sessions count towards call volume analytics
+            invalidate_analytics()
             session_id = result.data[0]['id']
             logger.info(
                 f"[SPY-CALL] Session created - "
@@ -155,7 +176,9 @@ def download_twilio_recording(recording_sid: str, recording_url: str) -> dict:
     Returns:
         Dict with:
             - success: bool
-            - audio_bytes: Recording audio data (if successful)
+            - audio_path: Temp file holding the recording (if successful);
+              remove it with remove_recording_file() once uploaded
+            - size_bytes: Recording size in bytes (if successful)
             - content_type: Audio MIME type (if successful)
             - error: Error message (if failed)
     """
@@ -185,21 +208,31 @@ def download_twilio_recording(recording_sid: str, recording_url: str) -> dict:
         # Download audio using Twilio credentials for HTTP basic auth
         auth = (settings.APP_SETTINGS.twilio.account_sid, settings.APP_SETTINGS.twilio.auth_token)
 
-        response = httpx.get(download_url, auth=auth, timeout=120.0)
-        response.raise_for_status()
-
-        audio_bytes = response.content
-        content_type = response.headers.get('Content-Type', 'audio/wav')
+        # Stream straight to a temp file so long recordings are never held in memory
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
+            audio_path = temp_file.name
+            try:
+                with _HTTP_CLIENT.stream("GET", download_url, auth=auth) as response:
+                    response.raise_for_status()
+                    content_type = response.headers.get('Content-Type', 'audio/wav')
+                    for chunk in response.iter_bytes(_DOWNLOAD_CHUNK_SIZE):
+                        temp_file.write(chunk)
+                size_bytes = temp_file.tell()
+            except Exception:
+                temp_file.close()
+                remove_recording_file(audio_path)
+                raise
 
         logger.info(
             f"[RECORDING-DOWNLOAD] ✅ Downloaded recording - "
-            f"RecordingSid={recording_sid}, Size={len(audio_bytes)} bytes, "
+            f"RecordingSid={recording_sid}, Size={size_bytes} bytes, "
             f"ContentType={content_type}"
         )
 
         return {
             'success': True,
-            'audio_bytes': audio_bytes,
+            'audio_path': audio_path,
+            'size_bytes': size_bytes,
             'content_type': content_type
         }
 
@@ -225,10 +258,23 @@ def download_twilio_recording(recording_sid: str, recording_url: str) -> dict:
         }
 
 
+def remove_recording_file(audio_path: str) -> None:
+    """
+    Delete a recording temp file created by download_twilio_recording().
+
+    Args:
+        audio_path: Path of the temp file
+    """
+    try:
+        os.unlink(audio_path)
+    except OSError as e:
+        logger.warning(f"[RECORDING-DOWNLOAD] Failed to remove temp file {audio_path}: {e}")
+
+
 def upload_recording_to_storage(
     session_id: int,
     recording_sid: str,
-    audio_bytes: bytes,
+    audio_path: str,
     content_type: str
 ) -> dict:
     """
@@ -237,7 +283,7 @@ def upload_recording_to_storage(
     Args:
         session_id: Transcription session ID
         recording_sid: Twilio recording SID
-        audio_bytes: Audio file bytes
+        audio_path: Path of the downloaded audio file (streamed from disk)
         content_type: Audio MIME type (e.g., 'audio/wav')
 
     Returns:
@@ -264,14 +310,14 @@ def upload_recording_to_storage(
 
         logger.info(
             f"[RECORDING-UPLOAD] Uploading to Supabase Storage - "
-            f"Bucket={bucket}, Path={storage_path}, Size={len(audio_bytes)} bytes"
+            f"Bucket={bucket}, Path={storage_path}, Size={os.path.getsize(audio_path)} bytes"
         )
 
         # Upload to Supabase Storage
         # Supabase Python SDK: storage.from_(bucket).upload(path, file)
         result = supabase.storage.from_(bucket).upload(
             path=storage_path,
-            file=audio_bytes,
+            file=audio_path,
             file_options={
                 'content-type': content_type,
                 'upsert': 'true'  # Allow overwrite if exists
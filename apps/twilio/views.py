@@ -11,6 +11,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from twilio.twiml.voice_response import VoiceResponse
 from apps.core.services.supabase import get_supabase_client
+from apps.analytics.services.cache import invalidate_analytics
 import logging
 
 logger = logging.getLogger(__name__)
@@ -210,6 +211,10 @@ class CallStatusView(APIView):
             # Update session
             supabase.table(sessions_table).update(update_data).eq('id', session_id).execute()
 
+            # Call duration feeds handle-time analytics
+            if 'duration' in update_data:
+                invalidate_analytics()
+
             logger.info(
                 f"[CALL-STATUS] Updated session {session_id} - "
                 f"CallStatus={call_status}, UpdatedFields={list(update_data.keys())}"
@@ -345,18 +350,21 @@ class RecordingView(APIView):
 
             logger.info(
                 f"[RECORDING-WEBHOOK] Downloaded recording - "
-                f"RecordingSid={recording_sid}, Size={len(recording_data['audio_bytes'])} bytes"
+                f"RecordingSid={recording_sid}, Size={recording_data['size_bytes']} bytes"
             )
 
             # Upload to Supabase Storage
-            from apps.twilio.services import upload_recording_to_storage
-
-            upload_result = upload_recording_to_storage(
-                session_id=session_id,
-                recording_sid=recording_sid,
-                audio_bytes=recording_data['audio_bytes'],
-                content_type=recording_data['content_type']
-            )
+            from apps.twilio.services import upload_recording_to_storage, remove_recording_file
+
+            try:
+                upload_result = upload_recording_to_storage(
+                    session_id=session_id,
+                    recording_sid=recording_sid,
+                    audio_path=recording_data['audio_path'],
+                    content_type=recording_data['content_type']
+                )
+            finally:
+                remove_recording_file(recording_data['audio_path'])
 
             if not upload_result['success']:
                 logger.error(
@@ -388,6 +396,9 @@ class RecordingView(APIView):
 
             supabase.table(sessions_table).update(update_data).eq('id', session_id).execute()
 
+            # Call duration feeds handle-time analytics
+            invalidate_analytics()
+
             logger.info(
                 f"[RECORDING-WEBHOOK] Updated session {session_id} - "
                 f"RecordingSid={recording_sid}, StoragePath={storage_path}"
@@ -79,6 +79,10 @@ class AIConfig(BaseModel):
     assemblyai_pii_redaction_enabled: bool = False
     assemblyai_pii_substitution: str = "hash"
     assemblyai_generate_redacted_audio: bool = False
+    # Webhook mode: submit transcriptions and finish processing on callback
+    assemblyai_webhook_url: str = ""
+    assemblyai_webhook_auth_header_name: str = ""
+    assemblyai_webhook_auth_header_value: str = ""
     
     # LandingAI
     landingai_api_key: str = ""
@@ -193,6 +197,9 @@ class AppSettings:
             assemblyai_pii_redaction_enabled=env.bool('ASSEMBLYAI_PII_REDACTION_ENABLED', default=False),
             assemblyai_pii_substitution=env('ASSEMBLYAI_PII_SUBSTITUTION', default='hash'),
             assemblyai_generate_redacted_audio=env.bool('ASSEMBLYAI_GENERATE_REDACTED_AUDIO', default=False),
+            assemblyai_webhook_url=env('ASSEMBLYAI_WEBHOOK_URL', default=''),
+            assemblyai_webhook_auth_header_name=env('ASSEMBLYAI_WEBHOOK_AUTH_HEADER_NAME', default=''),
+            assemblyai_webhook_auth_header_value=env('ASSEMBLYAI_WEBHOOK_AUTH_HEADER_VALUE', default=''),
             landingai_api_key=env('LANDINGAI_API_KEY', default=''),
             primary_provider=env('AI_PRIMARY_PROVIDER', default='openai'),
             fallback_provider=env('AI_FALLBACK_PROVIDER', default=''),
@@ -443,6 +450,24 @@ CORS_ALLOW_HEADERS = [
 ]
 CORS_PREFLIGHT_MAX_AGE = 86400  # 24 hours
 
+# Cache
+# Shared Redis cache when REDIS_URL is configured, so cached analytics and
+# feature flags are consistent across instances; per-process memory otherwise
+if env('REDIS_URL', default=''):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': env('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-snowflake',
+        }
+    }
+
 # Channels (for async/WebSocket support)
 CHANNEL_LAYERS = {
     'default': {
@@ -40,13 +40,7 @@ LOGGING["handlers"]["console"]["formatter"] = "json"
 # -------------------------
 # Caching
 # -------------------------
-# In-memory cache is fine for Cloud Run (per-instance)
-CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "unique-snowflake",
-    }
-}
+# Configured in base: Redis when REDIS_URL is set, per-instance memory otherwise
 
 # -------------------------
 # GCP-specific
@@ -24,12 +24,6 @@ X_FRAME_OPTIONS = 'DENY'
 # Logging
 LOGGING['root']['level'] = 'INFO'
 
-# Cache backend (use in-memory cache to avoid Redis dependency in Cloud Run)
-# Feature flags are cached for 60s and rarely change, so per-instance cache is fine
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-    }
-}
+# Cache backend is configured in base: Redis when REDIS_URL is set, otherwise
+# per-instance memory (no Redis dependency in Cloud Run)
 
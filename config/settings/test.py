@@ -23,6 +23,13 @@ class DisableMigrations:
 
 MIGRATION_MODULES = DisableMigrations()
 
+# Keep tests off any configured Redis
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 # Faster password hashing for tests
 PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.MD5PasswordHasher',